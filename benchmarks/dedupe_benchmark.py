@@ -0,0 +1,72 @@
+"""
+Compares blocked fuzzy deduplication with naive pairwise matching on
+synthetic catalogs of growing size.
+
+    python -m benchmarks.dedupe_benchmark [sizes...]
+"""
+import sys
+import time
+import random
+import string
+import datetime
+from difflib import SequenceMatcher
+from utils.dedupe import ReleaseDeduplicator, normalize_title
+
+# Naive matching is quadratic, so stop timing it past this size
+NAIVE_LIMIT = 5000
+
+def make_catalog(size, duplicate_rate=0.1, seed=42):
+    rng = random.Random(seed)
+    # A few thousand made-up words, roughly the vocabulary of a real release catalog
+    words = sorted({''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))) for _ in range(3000)})
+    start = datetime.date(2024, 1, 1)
+    releases = []
+    for i in range(size):
+        title = ' '.join(rng.choice(words) for _ in range(rng.randint(2, 4))).title()
+        release_date = start + datetime.timedelta(days=rng.randrange(365))
+        releases.append({'id': i, 'title': title, 'release_date': release_date.isoformat(), 'popularity': rng.random() * 100})
+        if rng.random() < duplicate_rate:
+            # Same title from another source, shouted and a day off
+            shifted = release_date + datetime.timedelta(days=rng.choice((-1, 0, 1)))
+            releases.append({'id': -i, 'title': title.upper(), 'release_date': shifted.isoformat(), 'popularity': 1})
+    return releases
+
+def naive_deduplicate(releases, threshold=90, date_tolerance=1):
+    titles = [normalize_title(r['title']) for r in releases]
+    days = [datetime.date.fromisoformat(r['release_date']).toordinal() for r in releases]
+    kept = []
+    comparisons = 0
+    for i in range(len(releases)):
+        duplicate = False
+        for j in kept:
+            if abs(days[i] - days[j]) > date_tolerance:
+                continue
+            comparisons += 1
+            if SequenceMatcher(None, titles[i], titles[j]).ratio() * 100 >= threshold:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(i)
+    return len(kept), comparisons
+
+def run(sizes):
+    deduplicator = ReleaseDeduplicator(threshold=90)
+    print(f"{'releases':>9} {'blocked s':>10} {'compared':>10} {'unique':>8} {'naive s':>10} {'compared':>10}")
+    for size in sizes:
+        releases = make_catalog(size)
+
+        started = time.perf_counter()
+        unique = deduplicator.deduplicate(releases)
+        blocked_time = time.perf_counter() - started
+
+        naive = '-', '-'
+        if len(releases) <= NAIVE_LIMIT:
+            started = time.perf_counter()
+            _, comparisons = naive_deduplicate(releases)
+            naive = f'{time.perf_counter() - started:.3f}', comparisons
+
+        print(f'{len(releases):>9} {blocked_time:>10.3f} {deduplicator.last_comparisons:>10} '
+              f'{len(unique):>8} {naive[0]:>10} {naive[1]:>10}')
+
+if __name__ == '__main__':
+    run([int(size) for size in sys.argv[1:]] or [1000, 2500, 5000, 10000, 25000, 50000])
@@ -0,0 +1,294 @@
+"""
+Load generator for the home page.
+
+Starts the Flask app in its own process, drives GET / from a pool of
+concurrent clients for a fixed time at each concurrency level, and reports
+throughput, latency percentiles and errors.
+
+    python -m benchmarks.load_test --concurrency 50 100 500 --duration 30 --stages
+    python -m benchmarks.load_test --cassette benchmarks/cassette.json --upstream-latency 80
+
+By default the collectors are stubbed with a catalog of --catalog-size
+releases replayed from the benchmark fixtures. With --cassette, the real
+collectors run against a replaying stand-in server instead, so the HTTP
+scheduler and response cache are part of the measurement. The app's usual
+environment variables (SNAPSHOT_TTL, INCREMENTAL_SYNC, ...) apply as they
+would in production; set them before running to compare configurations.
+INCREMENTAL_SYNC=1 needs --cassette, since the sliding-window sync calls
+the collectors directly and would otherwise reach the real upstreams.
+
+The app gets its own release store, response cache and snapshot directory
+in a temporary directory unless RELEASE_STORE_PATH, HTTP_CACHE_PATH or
+SINGLE_FLIGHT_DIR say otherwise, so a run neither reads nor writes the
+files of an app running from the same checkout.
+
+--stages also times each pipeline stage inside the app. snapshot covers
+the whole snapshot lookup, so when a window is rebuilt it includes fetch,
+dedupe, score and filter; filter only runs once per rebuilt snapshot.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import multiprocessing
+import numpy as np
+import requests
+
+DEFAULT_CONCURRENCY = [50, 100, 500]
+STAGES_PATH = '/_load_test/stages'
+
+
+class StageTimer:
+    """Accumulates call counts and wall time for the instrumented functions."""
+
+    def __init__(self):
+        self.totals = {}  # stage -> [calls, seconds]
+        self._lock = threading.Lock()
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    total = self.totals.setdefault(stage, [0, 0.0])
+                    total[0] += 1
+                    total[1] += elapsed
+        return timed
+
+    def snapshot(self):
+        with self._lock:
+            return {stage: list(total) for stage, total in self.totals.items()}
+
+def _instrument(main, timer):
+    # (owner, attribute) for each stage of home(); module functions are looked up by name at call time
+    targets = {
+        'snapshot': (main.snapshot_cache, 'get_view'),
+        'fetch': (main, 'fetch_releases'),
+        'dedupe': (main.release_deduplicator, 'deduplicate_table'),
+        'score': (main.incremental_scorer, 'calculate_scores_table'),
+        'filter': (main, 'filter_releases'),
+        'render': (main, 'render_template'),
+    }
+    for stage, (owner, name) in targets.items():
+        setattr(owner, name, timer.wrap(stage, getattr(owner, name)))
+
+    @main.app.route(STAGES_PATH)
+    def load_test_stages():
+        return timer.snapshot()
+
+def _serve(options, ready):
+    """Runs the app in this process until it is terminated."""
+    # Start cold, and keep the synthetic catalog out of the dev app's store, caches and shared snapshots
+    scratch_dir = tempfile.mkdtemp(prefix='load-test-')
+    os.environ.setdefault('SINGLE_FLIGHT_DIR', os.path.join(scratch_dir, 'single_flight'))
+    os.environ.setdefault('RELEASE_STORE_PATH', os.path.join(scratch_dir, 'releases.sqlite'))
+    os.environ.setdefault('HTTP_CACHE_PATH', os.path.join(scratch_dir, 'http_cache.sqlite'))
+    if options['cassette']:
+        from benchmarks.standin_server import StandInServer
+        standin = StandInServer(options['cassette'], 'replay', port=0, latency=options['upstream_latency'],
+                                jitter=options['upstream_jitter'], error_rate=options['upstream_error_rate'],
+                                throttle_rate=options['upstream_throttle_rate'], seed=0)
+        os.environ.update(standin.start())
+        os.environ.setdefault('IGDB_CLIENT_ID', 'standin')
+        os.environ.setdefault('IGDB_CLIENT_SECRET', 'standin')
+        os.environ.setdefault('IGDB_TOKEN_CACHE', os.path.join(scratch_dir, 'token.json'))
+
+    import main
+    from werkzeug.serving import make_server
+
+    if not options['cassette']:
+        from benchmarks.pipeline_benchmark import PipelineBenchmark, load_fixtures
+        from utils.release_table import ReleaseTable
+        catalog = PipelineBenchmark(load_fixtures()).catalog(options['catalog_size'])
+        main.fetch_releases = lambda start_date, end_date, release_store=None: ReleaseTable.from_releases(catalog)
+
+    if options['stages']:
+        _instrument(main, StageTimer())
+
+    server = make_server(options['host'], options['port'], main.app, threaded=True)
+    ready.put(server.server_port)
+    server.serve_forever()
+
+
+def percentile(latencies, q):
+    return float(np.percentile(latencies, q)) if latencies else None
+
+class LoadGenerator:
+    """
+    Sends GET requests to url from concurrency client threads for duration
+    seconds, each client waiting for its response before sending the next.
+    """
+
+    def __init__(self, url, timeout=30):
+        self.url = url
+        self.timeout = timeout
+
+    def run(self, concurrency, duration):
+        deadline = time.perf_counter() + duration
+        results = [None] * concurrency
+        threads = [
+            threading.Thread(target=self._client, args=(deadline, results, i), name=f'load-{i}', daemon=True)
+            for i in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency for result in results for latency in result[0]]
+        errors = {}
+        for result in results:
+            for kind, count in result[1].items():
+                errors[kind] = errors.get(kind, 0) + count
+        completed = len(latencies)
+        return {
+            'concurrency': concurrency,
+            'duration': round(elapsed, 3),
+            'requests': completed + sum(errors.values()),
+            'throughput': round(completed / elapsed, 2) if elapsed else 0,
+            'latency_ms': {
+                name: round(value * 1000, 2) if value is not None else None
+                for name, value in (('p50', percentile(latencies, 50)), ('p95', percentile(latencies, 95)),
+                                    ('p99', percentile(latencies, 99)), ('max', max(latencies, default=None)))
+            },
+            'errors': errors,
+        }
+
+    def _client(self, deadline, results, index):
+        # Per-client lists, merged after the run, keep the clients from contending on a lock
+        latencies = []
+        errors = {}
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = session.get(self.url, timeout=self.timeout)
+                body = response.text
+            except requests.exceptions.RequestException as e:
+                kind = type(e).__name__
+                errors[kind] = errors.get(kind, 0) + 1
+                continue
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                kind = f'HTTP {response.status_code}'
+                errors[kind] = errors.get(kind, 0) + 1
+            elif 'An error occurred while fetching releases' in body:
+                # home() reports its own failures as a 200 page
+                errors['error page'] = errors.get('error page', 0) + 1
+            else:
+                latencies.append(elapsed)
+        session.close()
+        results[index] = (latencies, errors)
+
+def stage_breakdown(before, after, requests_served):
+    """Per-stage calls, total and mean time between two stage snapshots."""
+    breakdown = {}
+    for stage, (calls, seconds) in after.items():
+        calls -= before.get(stage, [0, 0.0])[0]
+        seconds -= before.get(stage, [0, 0.0])[1]
+        if calls:
+            breakdown[stage] = {
+                'calls': calls,
+                'total_s': round(seconds, 4),
+                'mean_ms': round(seconds / calls * 1000, 3),
+                'ms_per_request': round(seconds / requests_served * 1000, 3) if requests_served else None,
+            }
+    return breakdown
+
+def print_report(result):
+    latency = result['latency_ms']
+    print(f"\nconcurrency {result['concurrency']}: {result['requests']} requests in {result['duration']}s, "
+          f"{result['throughput']} req/s")
+    print(f"  latency ms  p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    errors = ', '.join(f'{kind}: {count}' for kind, count in sorted(result['errors'].items())) or 'none'
+    print(f'  errors      {errors}')
+    for stage, timing in result.get('stages', {}).items():
+        print(f"  {stage:<10}  {timing['calls']:>7} calls  {timing['mean_ms']:>9.3f} ms mean  "
+              f"{timing['ms_per_request']:>9.3f} ms/request")
+
+def check_options(options):
+    if not options['cassette'] and os.getenv('INCREMENTAL_SYNC', '0') == '1':
+        # Only fetch_releases is stubbed; the sync would call the live upstreams
+        raise ValueError('INCREMENTAL_SYNC=1 needs --cassette; the stubbed collectors only replace full fetches')
+
+def run(options, levels, duration, warmup=2, progress=True):
+    """
+    Starts the app with options, runs each concurrency level after a short
+    warmup (which also builds the first snapshot) and returns the results.
+    """
+    check_options(options)
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    server = context.Process(target=_serve, args=(options, ready), daemon=True)
+    server.start()
+    try:
+        port = ready.get(timeout=120)
+        base_url = f"http://{options['host']}:{port}"
+        generator = LoadGenerator(f'{base_url}/')
+        if warmup:
+            generator.run(1, warmup)
+
+        results = []
+        for concurrency in levels:
+            before = requests.get(base_url + STAGES_PATH).json() if options['stages'] else None
+            result = generator.run(concurrency, duration)
+            if options['stages']:
+                after = requests.get(base_url + STAGES_PATH).json()
+                result['stages'] = stage_breakdown(before, after, result['requests'])
+            results.append(result)
+            if progress:
+                print_report(result)
+        return results
+    finally:
+        server.terminate()
+        server.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Drive concurrent requests at the home page and report latency.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per concurrency level')
+    parser.add_argument('--warmup', type=float, default=2, help='Seconds of single-client requests first')
+    parser.add_argument('--stages', action='store_true', help='Also time each pipeline stage in the app')
+    parser.add_argument('--catalog-size', type=int, default=1000, help='Releases returned by the stubbed collectors')
+    parser.add_argument('--cassette', help='Run the real collectors against a stand-in replaying this cassette')
+    parser.add_argument('--upstream-latency', type=float, default=0, help='Stand-in latency in ms')
+    parser.add_argument('--upstream-jitter', type=float, default=0, help='Stand-in jitter in ms')
+    parser.add_argument('--upstream-error-rate', type=float, default=0)
+    parser.add_argument('--upstream-throttle-rate', type=float, default=0)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='App port (default: any free port)')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    options = {
+        'host': args.host,
+        'port': args.port,
+        'stages': args.stages,
+        'catalog_size': args.catalog_size,
+        'cassette': args.cassette,
+        'upstream_latency': args.upstream_latency,
+        'upstream_jitter': args.upstream_jitter,
+        'upstream_error_rate': args.upstream_error_rate,
+        'upstream_throttle_rate': args.upstream_throttle_rate,
+    }
+    try:
+        check_options(options)
+    except ValueError as e:
+        parser.error(str(e))
+    results = run(options, args.concurrency, args.duration, args.warmup)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'options': options, 'duration': args.duration, 'results': results}, f, indent=2)
+        print(f'\nWrote {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+Times each stage of the release pipeline on catalogs replayed from recorded
+upstream payloads, and writes the results to JSON so runs from different
+commits can be compared.
+
+    python -m benchmarks.pipeline_benchmark [--sizes 100 1000 ...] [--stages dedupe render ...]
+    python -m benchmarks.pipeline_benchmark --compare benchmarks/results/<old commit>.json
+
+The fixtures in benchmarks/fixtures hold one captured response per upstream
+(a TMDB discover page for movies and TV, an IGDB /games response, Google
+Trends interest over time and Reddit discussion threads). A catalog of any
+size is built by cycling through them, giving each copy a fresh id, a
+numbered title and a release date inside the current window. The Trends and
+Reddit stages need the history/ dependencies and are skipped without them.
+
+The main stages follow the app's own path: releases are deduplicated as a
+ReleaseTable, scored incrementally, then filtered and exported to the dicts
+the template renders; pipeline runs all three in a row. The older dict-path
+stages are kept as extras, and each table stage is printed against its dict
+equivalent from the same run (TABLE_STAGES).
+"""
+import os
+import io
+import sys
+import json
+import math
+import time
+import argparse
+import datetime
+import platform
+import subprocess
+import contextlib
+import numpy as np
+
+# Replayed payloads never reach the network, so don't create a response cache file
+os.environ.setdefault('HTTP_CACHE_PATH', '')
+
+from flask import Flask, render_template
+from collectors.tmdb_collector import TMDBCollector, TMDB_PAGE_LIMIT
+from collectors.igdb_collector import IGDBCollector
+from calculators.excitement_calculator import ExcitementScoreCalculator
+from score_calculator import ScoreCalculator, IncrementalScoreCalculator
+from utils.dedupe import ReleaseDeduplicator
+from utils.release_table import ReleaseTable
+
+try:
+    from history.excitement_gauge import GoogleTrendsAnalyzer, RedditSentimentAnalyzer, LexiconSentimentScorer
+except ImportError:
+    GoogleTrendsAnalyzer = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+# Stages timing the ReleaseTable path the app uses -> the equivalent dict path
+TABLE_STAGES = {
+    'dedupe_table': 'dedupe',
+    'incremental_scores_table': 'incremental_scores',
+    'incremental_scores_table_warm': 'incremental_scores_warm',
+    'filter_export': 'filter_dicts',
+    'pipeline': 'pipeline_dicts',
+}
+# Every scored row passes, so filter and export handle the whole catalog
+FILTER_THRESHOLD = 0
+# Days either side of today that replayed releases are spread over, like DATE_RANGE_BACKWARD/FORWARD
+WINDOW_DAYS = 7
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    fixtures = {}
+    for name in ('tmdb_movies', 'tmdb_tv', 'igdb_games', 'trends', 'reddit'):
+        with open(os.path.join(fixtures_dir, f'{name}.json'), encoding='utf-8') as f:
+            fixtures[name] = json.load(f)
+    return fixtures
+
+def replay(items, size, title_key, date_key=None, to_date=None):
+    """
+    Returns size copies of the recorded items, cycling through them. Copies
+    after the first round get a new id and a numbered title, and every copy
+    is moved to a date inside the window around today.
+    """
+    today = datetime.date.today()
+    replayed = []
+    for i in range(size):
+        item = dict(items[i % len(items)])
+        cycle = i // len(items)
+        if cycle:
+            item['id'] = item['id'] * 1000003 + cycle
+            item[title_key] = f'{item[title_key]} {cycle}'
+        if date_key is not None:
+            offset = (i * 7919) % (2 * WINDOW_DAYS + 1) - WINDOW_DAYS
+            release_date = today + datetime.timedelta(days=offset)
+            item[date_key] = to_date(release_date) if to_date else release_date.isoformat()
+        replayed.append(item)
+    return replayed
+
+def _timestamp(release_date):
+    return int(time.mktime(release_date.timetuple()))
+
+
+class PipelineBenchmark:
+    """
+    Builds the inputs for each stage once per catalog size, then times the
+    stage repeat times and keeps the fastest run.
+    """
+
+    def __init__(self, fixtures, repeat=3):
+        self.fixtures = fixtures
+        self.repeat = repeat
+        self.app = Flask('main', root_path=REPO_ROOT)
+
+    def stages(self):
+        stages = {
+            'tmdb_parse': self.tmdb_parse,
+            'igdb_parse': self.igdb_parse,
+            'dedupe_table': self.dedupe_table,
+            'incremental_scores_table': self.incremental_scores_table,
+            'incremental_scores_table_warm': self.incremental_scores_table_warm,
+            'filter_export': self.filter_export,
+            'pipeline': self.pipeline,
+            'excitement_score': self.excitement_score,
+            'render': self.render,
+            # Dict-path equivalents, for comparison
+            'dedupe': self.dedupe,
+            'calculate_scores': self.calculate_scores,
+            'incremental_scores': self.incremental_scores,
+            'incremental_scores_warm': self.incremental_scores_warm,
+            'filter_dicts': self.filter_dicts,
+            'pipeline_dicts': self.pipeline_dicts,
+        }
+        if GoogleTrendsAnalyzer is not None:
+            stages['trends_score'] = self.trends_score
+            stages['reddit_score'] = self.reddit_score
+        return stages
+
+    def run(self, sizes, stage_names=None, progress=True):
+        stages = self.stages()
+        if stage_names:
+            unknown = set(stage_names) - set(stages)
+            if unknown:
+                raise ValueError(f"Unknown or unavailable stages: {', '.join(sorted(unknown))}")
+            stages = {name: stages[name] for name in stage_names}
+
+        results = {name: {} for name in stages}
+        for size in sizes:
+            for name, stage in stages.items():
+                seconds = stage(size)
+                results[name][str(size)] = {
+                    'seconds': round(seconds, 6),
+                    'us_per_row': round(seconds / size * 1e6, 3),
+                }
+                if progress:
+                    print(f'{name:>29} {size:>8} {seconds:>10.4f}s {seconds / size * 1e6:>10.2f} us/row')
+        return results
+
+    def _time(self, fn, setup=lambda: None):
+        # setup runs untimed before each repeat so stages that mutate their input start fresh
+        best = math.inf
+        for _ in range(self.repeat):
+            args = setup()
+            started = time.perf_counter()
+            fn(args)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    def catalog(self, size):
+        # The catalog as the collectors would return it: a third each of movies, TV shows and games
+        collector = self._tmdb_collector(size)
+        movies = list(collector.iter_movies())
+        tv_shows = list(collector.iter_tv_shows())
+        games = IGDBCollector.__new__(IGDBCollector)._format_games(self._igdb_payload(size - 2 * (size // 3)))
+        return movies[:size // 3] + tv_shows[:size // 3] + games
+
+    def _tmdb_collector(self, size):
+        # Serves replayed discover pages in place of HTTP, through the collector's own paging
+        page_size = max(20, -(-size // TMDB_PAGE_LIMIT))
+        pages = {}
+        for media_type, fixture, title_key, date_key in (('movie', 'tmdb_movies', 'title', 'release_date'),
+                                                         ('tv', 'tmdb_tv', 'name', 'first_air_date')):
+            results = replay(self.fixtures[fixture]['results'], size // 3, title_key, date_key)
+            chunks = [results[i:i + page_size] for i in range(0, len(results), page_size)] or [[]]
+            pages[media_type] = [
+                {'page': n + 1, 'results': chunk, 'total_pages': len(chunks), 'total_results': len(results)}
+                for n, chunk in enumerate(chunks)
+            ]
+
+        collector = TMDBCollector('', '', max_pages=TMDB_PAGE_LIMIT)
+        collector._fetch_page = lambda url, params, page: pages[url.rsplit('/', 1)[1]][page - 1]
+        return collector
+
+    def _igdb_payload(self, size):
+        return replay(self.fixtures['igdb_games'], size, 'name', 'first_release_date', _timestamp)
+
+    def tmdb_parse(self, size):
+        collector = self._tmdb_collector(size)
+        return self._time(lambda _: (collector.get_movies(), collector.get_tv_shows()))
+
+    def igdb_parse(self, size):
+        payload = self._igdb_payload(size)
+        collector = IGDBCollector.__new__(IGDBCollector)
+        return self._time(lambda _: collector._format_games(payload))
+
+    def dedupe(self, size):
+        releases = self.catalog(size)
+        deduplicator = ReleaseDeduplicator()
+        return self._time(deduplicator.deduplicate, lambda: [dict(release) for release in releases])
+
+    def dedupe_table(self, size):
+        table = ReleaseTable.from_releases(self.catalog(size))
+        return self._time(lambda _: ReleaseDeduplicator().deduplicate_table(table))
+
+    def calculate_scores(self, size):
+        releases = self.catalog(size)
+        calculator = ScoreCalculator()
+        return self._time(calculator.calculate_scores, lambda: [dict(release) for release in releases])
+
+    def incremental_scores(self, size):
+        # Cold: every release is new to the scorer
+        releases = self.catalog(size)
+        return self._time(lambda calculator: calculator.calculate_scores(releases), IncrementalScoreCalculator)
+
+    def incremental_scores_warm(self, size):
+        # Warm: an unchanged refresh, where every score comes from the cache
+        releases = self.catalog(size)
+        calculator = IncrementalScoreCalculator()
+        calculator.calculate_scores(releases)
+        return self._time(lambda _: calculator.calculate_scores(releases))
+
+    def incremental_scores_table(self, size):
+        table = ReleaseTable.from_releases(self.catalog(size))
+        return self._time(lambda calculator: calculator.calculate_scores_table(table), IncrementalScoreCalculator)
+
+    def incremental_scores_table_warm(self, size):
+        table = ReleaseTable.from_releases(self.catalog(size))
+        calculator = IncrementalScoreCalculator()
+        calculator.calculate_scores_table(table)
+        return self._time(lambda _: calculator.calculate_scores_table(table))
+
+    def filter_export(self, size):
+        # What the app derives once per snapshot: rows over the threshold, best first, as dicts
+        table = ScoreCalculator().calculate_scores_table(ReleaseTable.from_releases(self.catalog(size)))
+        return self._time(lambda _: table.top(FILTER_THRESHOLD).to_dicts())
+
+    def filter_dicts(self, size):
+        releases = ScoreCalculator().calculate_scores(self.catalog(size))
+
+        def filter_releases(_):
+            passed = [release for release in releases if release['excitement_score'] >= FILTER_THRESHOLD]
+            return sorted(passed, key=lambda release: release['excitement_score'], reverse=True)
+        return self._time(filter_releases)
+
+    def pipeline(self, size):
+        # A cold snapshot build as collect_releases and the home page view run it, from fetched tables
+        table = ReleaseTable.from_releases(self.catalog(size))
+
+        def build(calculator):
+            unique = ReleaseDeduplicator().deduplicate_table(table)
+            return calculator.calculate_scores_table(unique).top(FILTER_THRESHOLD).to_dicts()
+        return self._time(build, IncrementalScoreCalculator)
+
+    def pipeline_dicts(self, size):
+        releases = self.catalog(size)
+
+        def build(calculator):
+            scored = calculator.calculate_scores(ReleaseDeduplicator().deduplicate(releases))
+            passed = [release for release in scored if release['excitement_score'] >= FILTER_THRESHOLD]
+            return sorted(passed, key=lambda release: release['excitement_score'], reverse=True)
+        return self._time(build, IncrementalScoreCalculator)
+
+    def excitement_score(self, size):
+        releases = self.catalog(size)
+        calculator = ExcitementScoreCalculator()
+        return self._time(lambda _: [calculator.calculate_score(release) for release in releases])
+
+    def render(self, size):
+        releases = ScoreCalculator().calculate_scores(self.catalog(size))
+        releases.sort(key=lambda release: release['excitement_score'], reverse=True)
+
+        def render(_):
+            with self.app.test_request_context('/'):
+                render_template('index.html', releases=releases)
+        return self._time(render)
+
+    def trends_score(self, size):
+        interest = self.fixtures['trends']['interest']
+        keywords = list(interest)
+        series = [(f'{keywords[i % len(keywords)]} {i}', np.array(interest[keywords[i % len(keywords)]]))
+                  for i in range(size)]
+        analyzer = GoogleTrendsAnalyzer.__new__(GoogleTrendsAnalyzer)
+
+        def score(_):
+            # The analyzer reports every keyword on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                return [analyzer._score(keyword, values) for keyword, values in series]
+        return self._time(score)
+
+    def reddit_score(self, size):
+        # One discussion thread per title; comments are made unique so the memo starts cold
+        threads = self.fixtures['reddit']
+        titles = []
+        submissions = []
+        for i in range(size):
+            thread = threads[i % len(threads)]
+            titles.append(f"{thread['title']} {i}")
+            submissions.append({
+                'text': f"{thread['title']} {i} {thread['selftext']}",
+                'score': thread['score'],
+                'num_comments': thread['num_comments'],
+                'comments': [f'{comment} #{i}' for comment in thread['comments']],
+            })
+        analyzer = RedditSentimentAnalyzer.__new__(RedditSentimentAnalyzer)
+
+        def score(sentiment_scorer):
+            texts = [text for submission in submissions for text in [submission['text']] + submission['comments']]
+            polarities = iter(sentiment_scorer.score(texts))
+            with contextlib.redirect_stdout(io.StringIO()):
+                return [
+                    analyzer._score(title, [(submission, [next(polarities) for _ in range(1 + len(submission['comments']))])])
+                    for title, submission in zip(titles, submissions)
+                ]
+        return self._time(score, lambda: LexiconSentimentScorer(processes=0))
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance):
+    """
+    Prints each stage's time against a baseline run and returns the
+    (stage, size) pairs that got slower by more than tolerance.
+    """
+    regressions = []
+    print(f"\n{'stage':>29} {'size':>8} {'baseline s':>11} {'current s':>11} {'ratio':>7}")
+    for name, sizes in results['results'].items():
+        for size, result in sizes.items():
+            old = baseline.get('results', {}).get(name, {}).get(size)
+            if old is None or not old['seconds']:
+                continue
+            ratio = result['seconds'] / old['seconds']
+            flag = ''
+            if ratio > 1 + tolerance:
+                regressions.append((name, int(size)))
+                flag = '  slower'
+            print(f"{name:>29} {size:>8} {old['seconds']:>11.4f} {result['seconds']:>11.4f} {ratio:>7.2f}{flag}")
+    return regressions
+
+def compare_paths(results, tolerance=0.1):
+    """
+    Prints each table-path stage against its dict-path equivalent from the
+    same run and returns the (stage, size) pairs where the table path was
+    slower by more than tolerance.
+    """
+    slower = []
+    print(f"\n{'table stage':>29} {'size':>8} {'dict s':>9} {'table s':>9} {'ratio':>7}")
+    for table_stage, dict_stage in TABLE_STAGES.items():
+        for size, result in results.get(table_stage, {}).items():
+            baseline = results.get(dict_stage, {}).get(size)
+            if baseline is None or not baseline['seconds']:
+                continue
+            ratio = result['seconds'] / baseline['seconds']
+            flag = ''
+            if ratio > 1 + tolerance:
+                slower.append((table_stage, int(size)))
+                flag = '  slower'
+            print(f"{table_stage:>29} {size:>8} {baseline['seconds']:>9.4f} {result['seconds']:>9.4f} {ratio:>7.2f}{flag}")
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time each pipeline stage on replayed catalogs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--stages', nargs='+', help='Stages to run (default: all available)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage and size; the fastest is kept')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Slowdown ratio over 1 that counts as a regression')
+    args = parser.parse_args(argv)
+
+    commit = current_commit()
+    benchmark = PipelineBenchmark(load_fixtures(args.fixtures), repeat=args.repeat)
+    results = {
+        'commit': commit,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'sizes': args.sizes,
+        'results': benchmark.run(args.sizes, args.stages),
+    }
+    compare_paths(results['results'], args.tolerance)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nWrote {output}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Local stand-in for the TMDB, IGDB and Twitch OAuth APIs, for load testing
+without network access or API quota.
+
+In record mode every request is forwarded to the real upstream and the
+response is saved to a cassette file. In replay mode the cassette answers
+instead, optionally slowed down and with injected 5xx errors and 429s, so
+the scheduler's retries, concurrency limits and the response cache can be
+exercised on one box.
+
+    python -m benchmarks.standin_server record --cassette benchmarks/cassette.json
+    python -m benchmarks.standin_server replay --cassette benchmarks/cassette.json \\
+        --latency 80 --jitter 40 --error-rate 0.02 --throttle-rate 0.05
+
+Each upstream gets its own port (TMDB on --port, IGDB on the next one and
+Twitch after that). On start the server prints the environment variables
+that point the app at it, including HTTP_HOST_ALIASES so the stand-in ports
+keep the real hosts' rate limits.
+
+Credentials (api_key, client_id, client_secret and the Authorization
+header) are never written to the cassette or used to match a recording.
+The OAuth token response isn't recorded either; in replay mode a dummy
+token is issued.
+"""
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import requests
+
+UPSTREAMS = {
+    'tmdb': 'https://api.themoviedb.org/3',
+    'igdb': 'https://api.igdb.com/v4',
+    'twitch': 'https://id.twitch.tv/oauth2/token',
+}
+# Where each upstream's URL is configured in the app
+UPSTREAM_ENV = {
+    'tmdb': 'TMDB_BASE_URL',
+    'igdb': 'IGDB_BASE_URL',
+    'twitch': 'TWITCH_TOKEN_URL',
+}
+SECRET_PARAMS = {'api_key', 'client_id', 'client_secret'}
+FORWARD_HEADERS = ('Authorization', 'Client-ID', 'Content-Type', 'Accept')
+DEFAULT_PORT = 8765
+
+
+def request_key(upstream, method, path, query, body):
+    """Identifies a request by everything but its credentials."""
+    params = sorted((k, v) for k, v in query if k not in SECRET_PARAMS)
+    digest = hashlib.sha256(json.dumps([upstream, method, path, params, body]).encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+class Cassette:
+    """Recorded responses keyed by request_key, kept in one JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def record(self, key, entry):
+        with self._lock:
+            self.entries[key] = entry
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class StandInServer:
+    """
+    Serves each upstream from its own local port.
+
+    Args:
+        cassette_path (str): Cassette file to write (record) or read (replay).
+        mode (str): 'record' or 'replay'.
+        latency (float): Milliseconds added to every replayed response.
+        jitter (float): Up to this many extra milliseconds, chosen at random.
+        error_rate (float): Share of replayed API requests answered with a 503.
+        throttle_rate (float): Share answered with a 429 instead.
+        retry_after (float): Retry-After seconds sent with injected 429s; 0 sends none.
+        seed: Seeds the fault injection so runs can be repeated.
+        upstreams (dict): Real base URLs to record from, defaulting to UPSTREAMS.
+    """
+
+    def __init__(self, cassette_path, mode='replay', host='127.0.0.1', port=DEFAULT_PORT, latency=0, jitter=0,
+                 error_rate=0, throttle_rate=0, retry_after=1, seed=None, upstreams=None):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.cassette = Cassette(cassette_path)
+        self.mode = mode
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.upstreams = {**UPSTREAMS, **(upstreams or {})}
+        self.stats = {'requests': 0, 'replayed': 0, 'recorded': 0, 'missing': 0, 'errors': 0, 'throttled': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._servers = {}
+        self._threads = []
+
+    def start(self):
+        """Starts serving in background threads and returns the app's environment overrides."""
+        for offset, upstream in enumerate(UPSTREAM_ENV):
+            # Port 0 lets the OS pick free ports, e.g. in tests
+            port = self.port + offset if self.port else 0
+            server = ThreadingHTTPServer((self.host, port), self._handler(upstream))
+            server.daemon_threads = True
+            self._servers[upstream] = server
+            thread = threading.Thread(target=server.serve_forever, args=(0.1,), name=f'standin-{upstream}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self.environment()
+
+    def stop(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._servers = {}
+        self._threads = []
+
+    def url(self, upstream):
+        return f'http://{self.host}:{self._servers[upstream].server_address[1]}'
+
+    def environment(self):
+        env = {
+            'TMDB_BASE_URL': self.url('tmdb'),
+            'IGDB_BASE_URL': self.url('igdb'),
+            'TWITCH_TOKEN_URL': f"{self.url('twitch')}/oauth2/token",
+        }
+        env['HTTP_HOST_ALIASES'] = ','.join(
+            f"{urlsplit(self.url(upstream)).netloc}={urlsplit(self.upstreams[upstream]).hostname}"
+            for upstream in ('tmdb', 'igdb')
+        )
+        return env
+
+    def _handler(self, upstream):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                standin._handle(self, upstream)
+
+            def do_POST(self):
+                standin._handle(self, upstream)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _handle(self, handler, upstream):
+        parts = urlsplit(handler.path)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length).decode('utf-8') if length else ''
+        path = parts.path
+        if upstream == 'twitch':
+            # The token URL is a full endpoint, so only its path is ours
+            path = ''
+        key = request_key(upstream, handler.command, path, query, body)
+        with self._lock:
+            self.stats['requests'] += 1
+
+        if self.mode == 'record':
+            status, content_type, text = self._record(handler, upstream, path, query, body, key)
+            self._send(handler, status, content_type, text)
+            return
+
+        self._delay()
+        if upstream == 'twitch':
+            token = {'access_token': 'standin-token', 'expires_in': 5184000, 'token_type': 'bearer'}
+            self._send(handler, 200, 'application/json', json.dumps(token))
+            return
+
+        fault = self._fault()
+        if fault == 429:
+            headers = {'Retry-After': f'{self.retry_after:g}'} if self.retry_after else {}
+            self._send(handler, 429, 'application/json', json.dumps({'status_message': 'Injected rate limit'}), headers)
+            return
+        if fault == 503:
+            self._send(handler, 503, 'application/json', json.dumps({'status_message': 'Injected error'}))
+            return
+
+        entry = self.cassette.get(key)
+        with self._lock:
+            self.stats['replayed' if entry is not None else 'missing'] += 1
+        if entry is None:
+            message = f'No recording for {handler.command} {upstream}{handler.path}'
+            self._send(handler, 404, 'application/json', json.dumps({'status_message': message}))
+            return
+        self._send(handler, entry['status'], entry['content_type'], entry['body'])
+
+    def _record(self, handler, upstream, path, query, body, key):
+        headers = {name: handler.headers[name] for name in FORWARD_HEADERS if handler.headers.get(name)}
+        url = self.upstreams[upstream] + path
+        if query:
+            url = f'{url}?{urlencode(query)}'
+        try:
+            response = self._session.request(handler.command, url, headers=headers, data=body.encode('utf-8') or None,
+                                             timeout=30)
+        except requests.exceptions.RequestException as e:
+            return 502, 'application/json', json.dumps({'status_message': f'Upstream request failed: {str(e)}'})
+
+        content_type = response.headers.get('Content-Type', 'application/json')
+        # Throttles, server errors and tokens are never worth replaying
+        if upstream != 'twitch' and response.status_code != 429 and response.status_code < 500:
+            self.cassette.record(key, {
+                'upstream': upstream,
+                'method': handler.command,
+                'path': path,
+                'query': [(k, v) for k, v in query if k not in SECRET_PARAMS],
+                'request_body': body,
+                'status': response.status_code,
+                'content_type': content_type,
+                'body': response.text,
+            })
+            with self._lock:
+                self.stats['recorded'] += 1
+        return response.status_code, content_type, response.text
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter)
+            time.sleep((self.latency + extra) / 1000)
+
+    def _fault(self):
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                self.stats['throttled'] += 1
+                return 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.stats['errors'] += 1
+                return 503
+        return None
+
+    def _send(self, handler, status, content_type, text, headers=None):
+        data = text.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record or replay TMDB, IGDB and Twitch OAuth responses locally.')
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('--cassette', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cassette.json'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TMDB port; IGDB and Twitch use the next two')
+    parser.add_argument('--latency', type=float, default=0, help='Milliseconds added to each replayed response')
+    parser.add_argument('--jitter', type=float, default=0, help='Up to this many more milliseconds, at random')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of replayed requests answered with a 503')
+    parser.add_argument('--throttle-rate', type=float, default=0, help='Share of replayed requests answered with a 429')
+    parser.add_argument('--retry-after', type=float, default=1, help='Retry-After seconds on injected 429s (0 for none)')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.cassette, args.mode, args.host, args.port, args.latency, args.jitter,
+                           args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+    env = server.start()
+    print(f'Stand-in server {args.mode}ing {len(server.cassette)} recordings in {args.cassette}. Point the app at it with:\n')
+    for name, value in env.items():
+        print(f'export {name}={value}')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f'\n{json.dumps(server.stats)}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,143 +2,271 @@ import os
 import requests
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
+from collectors.session import create_session
+from collectors.twitch_auth import get_token_manager
 
 # Load environment variables
 load_dotenv()
 
+# IGDB caps the page size and the number of sub-queries per multiquery;
+# its request rate is enforced by the shared scheduler behind create_session()
+IGDB_PAGE_LIMIT = 500
+IGDB_MULTIQUERY_LIMIT = 10
+# Overridden with IGDB_BASE_URL, e.g. to point at a local stand-in server
+IGDB_BASE_URL = 'https://api.igdb.com/v4'
+
 class IGDBCollector:
     def __init__(self, start_date, end_date):
         self.client_id = os.getenv('IGDB_CLIENT_ID')
         self.client_secret = os.getenv('IGDB_CLIENT_SECRET')
-        
+
         # Validate credentials
         if not self.client_id or not self.client_secret:
             raise ValueError("IGDB credentials not found in .env file")
-            
+
+        # Shared across collectors so page views don't each pay for an OAuth call
+        self.token_manager = get_token_manager(self.client_id, self.client_secret)
         self.access_token = self.get_access_token()
         # Convert dates to Unix timestamps
         self.start_date = int(time.mktime(datetime.strptime(start_date, '%Y-%m-%d').timetuple()))
         self.end_date = int(time.mktime(datetime.strptime(end_date, '%Y-%m-%d').timetuple()))
-        self.session = requests.Session()
-        self.base_url = 'https://api.igdb.com/v4'
+        self.session = create_session()
+        self.base_url = os.getenv('IGDB_BASE_URL', IGDB_BASE_URL).rstrip('/')
         self.headers = {
             'Client-ID': self.client_id,
             'Authorization': f'Bearer {self.access_token}',
             'Accept': 'application/json',
             'Content-Type': 'text/plain'  # IGDB expects text/plain for the query
         }
+        self.shard_days = int(os.getenv('IGDB_SHARD_DAYS', 7))
+        self.shard_concurrency = int(os.getenv('IGDB_SHARD_CONCURRENCY', 4))
 
     def get_access_token(self):
-        logging.info('Fetching IGDB access token')
-        url = 'https://id.twitch.tv/oauth2/token'
-        params = {
-            'client_id': self.client_id,
-            'client_secret': self.client_secret,
-            'grant_type': 'client_credentials'
-        }
-        
-        try:
-            response = requests.post(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'access_token' not in data:
-                logging.error(f"Unexpected API response: {data}")
-                raise ValueError("Access token not found in API response")
-                
-            logging.info('Successfully obtained IGDB access token')
-            return data['access_token']
-            
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Failed to get IGDB access token: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                logging.error(f"API Response: {e.response.text}")
-            raise
+        return self.token_manager.get_token()
 
-    def get_games(self):
+    def get_games(self, table=None):
+        """
+        Returns the window's games as a list of dicts, or appends them to a
+        ReleaseTable and returns that when one is given.
+        """
+        empty = table if table is not None else []
         if not self.access_token:
             logging.error("No access token available")
-            return []
-            
+            return empty
+
         logging.info('Fetching games from IGDB')
         try:
-            # First, get games directly with release date filter
-            games_query = f"""
-                fields 
-                    name,
-                    first_release_date,
-                    rating,
-                    total_rating,
-                    platforms.name,
-                    cover.url,
-                    aggregated_rating,
-                    follows;
-                where first_release_date >= {self.start_date} 
-                & first_release_date <= {self.end_date}
-                & category = 0
-                & version_parent = null;
-                sort first_release_date asc;
-                limit 500;
-            """
-            
-            logging.debug(f"IGDB Query: {games_query}")  # Add debug logging
-            
-            games_response = self.session.post(
-                f"{self.base_url}/games",
-                headers=self.headers,
-                data=games_query
+            games_query = self._build_games_query(
+                f"first_release_date >= {self.start_date} & first_release_date <= {self.end_date}"
             )
-            games_response.raise_for_status()
-            games_data = games_response.json()
-            
+            games_data = self._post_query(games_query)
+
             if not games_data:
                 logging.info("No games found in the specified range")
-                return []
-            
-            # Process games data
-            games = []
-            for item in games_data:
-                # Get platform names instead of IDs
-                platforms = []
-                if 'platforms' in item:
-                    platforms = [p.get('name', '') for p in item.get('platforms', [])]
-                
-                # Get cover URL if available
-                cover_url = None
-                if 'cover' in item and 'url' in item['cover']:
-                    # Convert thumbnail to full-size image
-                    cover_url = item['cover']['url'].replace('t_thumb', 't_cover_big')
-                    if not cover_url.startswith('https:'):
-                        cover_url = 'https:' + cover_url
-
-                # Calculate a popularity score from available metrics
-                popularity = (
-                    (item.get('follows', 0) * 10) +  # Weight follows more heavily
-                    (item.get('rating', 0) * 0.5) +  # Regular user rating
-                    (item.get('aggregated_rating', 0) * 0.5)  # Critics rating
-                )
-
-                game = {
-                    'title': item.get('name'),
-                    'release_date': datetime.utcfromtimestamp(item.get('first_release_date')).strftime('%Y-%m-%d') if item.get('first_release_date') else None,
-                    'popularity': popularity,  # Our calculated popularity
-                    'rating': item.get('rating', 0),
-                    'total_rating': item.get('total_rating', 0),
-                    'platforms': platforms,
-                    'cover_url': cover_url,
-                    'type': 'game'
-                }
-                
-                if game['release_date']:  # Only add games with valid release dates
-                    games.append(game)
-                        
+                return empty
+
+            if len(games_data) >= IGDB_PAGE_LIMIT:
+                logging.warning(f"IGDB returned {len(games_data)} games, results may be truncated; use get_games_bulk() for wide windows")
+
+            games = self._format_games(games_data, table)
             logging.info(f'Successfully fetched {len(games)} games')
             return games
-            
+
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching games from IGDB: {str(e)}")
             if hasattr(e, 'response') and e.response is not None:
                 logging.error(f"API Response: {e.response.text}")
-            return []
+            return empty
+
+    def get_games_bulk(self, table=None):
+        """
+        Fetches every game in the window, however many there are. Like
+        get_games, appends to and returns table when one is given.
+
+        The window is split into shards of shard_days and each shard is paged
+        with offset until a short page comes back. Each round sends the next
+        page of every open shard through /multiquery, so a round costs one
+        request per ten shards. Results are merged in first_release_date order.
+
+        Raises:
+            RuntimeError: If any shard's page could not be fetched, once the
+            remaining shards have finished, so a partial window isn't taken
+            for a complete one.
+        """
+        if not self.access_token:
+            logging.error("No access token available")
+            return table if table is not None else []
+
+        shards = self._date_shards()
+        logging.info(f'Fetching games from IGDB in {len(shards)} shards')
+        pending = {f'shard {i}': (date_filter, 0) for i, date_filter in enumerate(shards)}
+        games_data = {}
+        failed = []
+        while pending:
+            queries = {
+                name: ('games', self._build_games_query(date_filter, offset=offset))
+                for name, (date_filter, offset) in pending.items()
+            }
+            results = self.multiquery(queries)
+
+            next_pending = {}
+            for name, (date_filter, offset) in pending.items():
+                page = results.get(name)
+                if page is None:
+                    failed.append(name)  # Its batch failed and was already logged
+                    continue
+                # Offset paging over live data can repeat a row at a page boundary
+                for item in page:
+                    games_data.setdefault(item.get('id', id(item)), item)
+                if len(page) >= IGDB_PAGE_LIMIT:
+                    next_pending[name] = (date_filter, offset + IGDB_PAGE_LIMIT)
+            pending = next_pending
+
+        if failed:
+            raise RuntimeError(f"IGDB failed to fetch {len(failed)} of {len(shards)} shards: {', '.join(sorted(failed))}")
+
+        ordered = sorted(games_data.values(), key=lambda item: item.get('first_release_date') or 0)
+        games = self._format_games(ordered, table)
+        logging.info(f'Successfully fetched {len(games)} games')
+        return games
+
+    def multiquery(self, queries):
+        """
+        Sends named sub-queries through IGDB's /multiquery endpoint, up to
+        IGDB_MULTIQUERY_LIMIT per request, and splits the responses back out.
+
+        Args:
+            queries (dict): Maps a unique name to an (endpoint, query) pair,
+                e.g. {'upcoming': ('games', 'fields name; limit 10;')}.
+
+        Returns:
+            dict: Maps each name to its result list (or count for /count
+            endpoints). Names from a batch that failed are left out.
+        """
+        names = list(queries)
+        batches = [names[i:i + IGDB_MULTIQUERY_LIMIT] for i in range(0, len(names), IGDB_MULTIQUERY_LIMIT)]
+        if not batches:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=self.shard_concurrency, thread_name_prefix='igdb-multiquery') as executor:
+            batch_results = list(executor.map(lambda batch: self._post_multiquery(batch, queries), batches))
+
+        results = {}
+        for batch_result in batch_results:
+            results.update(batch_result)
+        return results
+
+    def _post_multiquery(self, names, queries):
+        body = '\n'.join(
+            f'query {queries[name][0]} "{name}" {{ {queries[name][1].strip()} }};'
+            for name in names
+        )
+        try:
+            response_data = self._post_query(body, endpoint='multiquery')
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error running IGDB multiquery for {', '.join(names)}: {str(e)}")
+            if hasattr(e, 'response') and e.response is not None:
+                logging.error(f"API Response: {e.response.text}")
+            return {}
+
+        results = {}
+        for item in response_data:
+            results[item['name']] = item['result'] if 'result' in item else item.get('count')
+        return results
+
+    def _date_shards(self):
+        # Half-open shards so a game on a boundary lands in exactly one of them
+        step = max(self.shard_days, 1) * 86400
+        shards = []
+        shard_start = self.start_date
+        while shard_start + step < self.end_date:
+            shards.append(f"first_release_date >= {shard_start} & first_release_date < {shard_start + step}")
+            shard_start += step
+        shards.append(f"first_release_date >= {shard_start} & first_release_date <= {self.end_date}")
+        return shards
+
+    def _build_games_query(self, date_filter, offset=0):
+        return f"""
+            fields
+                name,
+                first_release_date,
+                rating,
+                total_rating,
+                platforms.name,
+                cover.url,
+                aggregated_rating,
+                follows;
+            where {date_filter}
+            & category = 0
+            & version_parent = null;
+            sort first_release_date asc;
+            limit {IGDB_PAGE_LIMIT};
+            offset {offset};
+        """
+
+    def _post_query(self, query, endpoint='games', retry_auth=True):
+        logging.debug(f"IGDB Query: {query}")
+        response = self.session.post(
+            f"{self.base_url}/{endpoint}",
+            headers=self.headers,
+            data=query
+        )
+        if response.status_code == 401 and retry_auth:
+            # Token was revoked or expired early; swap it and try once more
+            logging.warning('IGDB rejected the access token, refreshing')
+            self.access_token = self.token_manager.refresh(self.access_token)
+            self.headers['Authorization'] = f'Bearer {self.access_token}'
+            return self._post_query(query, endpoint, retry_auth=False)
+        response.raise_for_status()
+        return response.json()
+
+    def _format_games(self, games_data, table=None):
+        games = []
+        for item in games_data:
+            # Get platform names instead of IDs
+            platforms = []
+            if 'platforms' in item:
+                platforms = [p.get('name', '') for p in item.get('platforms', [])]
+
+            # Get cover URL if available
+            cover_url = None
+            if 'cover' in item and 'url' in item['cover']:
+                # Convert thumbnail to full-size image
+                cover_url = item['cover']['url'].replace('t_thumb', 't_cover_big')
+                if not cover_url.startswith('https:'):
+                    cover_url = 'https:' + cover_url
+
+            # Calculate a popularity score from available metrics
+            popularity = (
+                (item.get('follows', 0) * 10) +  # Weight follows more heavily
+                (item.get('rating', 0) * 0.5) +  # Regular user rating
+                (item.get('aggregated_rating', 0) * 0.5)  # Critics rating
+            )
+
+            release_date = datetime.utcfromtimestamp(item.get('first_release_date')).strftime('%Y-%m-%d') if item.get('first_release_date') else None
+            if table is not None:
+                # Rows without a release date are skipped by the table itself
+                table.append(item.get('id'), 'igdb', 'game', item.get('name'), release_date, popularity=popularity,
+                             rating=item.get('rating', 0), total_rating=item.get('total_rating', 0),
+                             platforms=platforms, cover_url=cover_url)
+                continue
+
+            game = {
+                'id': item.get('id'),
+                'source': 'igdb',
+                'title': item.get('name'),
+                'release_date': release_date,
+                'popularity': popularity,  # Our calculated popularity
+                'rating': item.get('rating', 0),
+                'total_rating': item.get('total_rating', 0),
+                'platforms': platforms,
+                'cover_url': cover_url,
+                'type': 'game'
+            }
+
+            if game['release_date']:  # Only add games with valid release dates
+                games.append(game)
+        return table if table is not None else games
@@ -0,0 +1,71 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from utils.metrics import get_metrics
+
+class CollectionOrchestrator:
+    """
+    Runs every release source at the same time on a thread pool.
+
+    Sources are plain callables returning a list of releases. Each source gets
+    its own timeout measured from the start of the run, so a refresh takes
+    about as long as the slowest source rather than the sum of all of them.
+    A source that fails or runs late is reported and left out; the rest are
+    returned as partial results.
+
+    Metrics are labelled with the source name unless metric_names maps it to
+    something coarser; keep per-run details such as date ranges out of labels.
+    """
+
+    def __init__(self, sources, timeout=None, timeouts=None, metric_names=None):
+        self.sources = sources  # name -> callable, in merge order
+        self.timeout = timeout if timeout is not None else float(os.getenv('COLLECTOR_TIMEOUT', 20))
+        self.timeouts = timeouts or {}
+        self.metric_names = metric_names or {}
+
+    def collect(self):
+        """
+        Returns:
+            tuple: (results, failures) where results maps each successful
+            source name to its releases and failures maps the rest to a
+            short reason.
+        """
+        results = {}
+        failures = {}
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=max(len(self.sources), 1), thread_name_prefix='collector')
+        try:
+            futures = {name: executor.submit(self._run, name, source) for name, source in self.sources.items()}
+            # Wait on the tightest deadlines first so one slow source can't eat the others' budget
+            for name in sorted(futures, key=self._timeout_for):
+                remaining = max(started + self._timeout_for(name) - time.monotonic(), 0)
+                try:
+                    results[name] = futures[name].result(timeout=remaining)
+                except TimeoutError:
+                    failures[name] = f"timed out after {self._timeout_for(name)}s"
+                    logging.error(f"Collector {name} timed out after {self._timeout_for(name)}s")
+                    get_metrics().inc('wakeupbabe_collector_failures_total', collector=self._metric_name(name), reason='timeout')
+                except Exception as e:
+                    failures[name] = str(e)
+                    logging.error(f"Error collecting {name}: {str(e)}")
+                    get_metrics().inc('wakeupbabe_collector_failures_total', collector=self._metric_name(name), reason='error')
+        finally:
+            # Don't block on late sources; their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        logging.info(f'Collected {len(results)}/{len(self.sources)} sources in {elapsed:.2f}s')
+        ordered = {name: results[name] for name in self.sources if name in results}
+        return ordered, failures
+
+    def _run(self, name, source):
+        # Timed in the worker, so a late source is still measured when it finishes
+        with get_metrics().timer('wakeupbabe_collector_seconds', collector=self._metric_name(name)):
+            return source()
+
+    def _timeout_for(self, name):
+        return self.timeouts.get(name, self.timeout)
+
+    def _metric_name(self, name):
+        return self.metric_names.get(name, name)
@@ -0,0 +1,17 @@
+import requests
+from utils.http_cache import CachingAdapter, get_response_cache
+from utils.scheduler import SchedulingAdapter, get_request_scheduler
+
+def create_session():
+    """
+    Builds a requests.Session whose requests are answered from the shared
+    response cache when possible and otherwise paced by the shared scheduler.
+    """
+    session = requests.Session()
+    adapter = SchedulingAdapter(get_request_scheduler())
+    cache = get_response_cache()
+    if cache is not None:
+        adapter = CachingAdapter(cache, delegate=adapter)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
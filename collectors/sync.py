@@ -0,0 +1,157 @@
+import os
+import time
+import logging
+import datetime
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from collectors.tmdb_collector import TMDBCollector
+from collectors.igdb_collector import IGDBCollector
+from collectors.orchestrator import CollectionOrchestrator
+
+SYNC_SOURCES = ('tmdb_movie', 'tmdb_tv', 'igdb')
+TMDB_SOURCES = {'tmdb_movie': 'movie', 'tmdb_tv': 'tv'}
+
+# TMDB's change feeds only go back this far
+TMDB_CHANGES_MAX_DAYS = 14
+
+class SlidingWindowSync:
+    """
+    Keeps the release store in step with a moving date window without
+    re-downloading the whole window on every refresh.
+
+    For each source it tracks which days are already synced and only fetches
+    days that are new to the window, were last synced more than resync_after
+    seconds ago, or lie within recheck_days of today (where popularity still
+    moves). Days that slid out of the window are forgotten. Optionally, TMDB's
+    /movie/changes and /tv/changes feeds are used to refresh just the stored
+    titles that changed upstream.
+    """
+
+    def __init__(self, release_store, recheck_days=None, resync_after=None, use_changes=None,
+                 tmdb_factory=TMDBCollector, igdb_factory=IGDBCollector):
+        self.store = release_store
+        self.recheck_days = recheck_days if recheck_days is not None else int(os.getenv('SYNC_RECHECK_DAYS', 2))
+        self.resync_after = resync_after if resync_after is not None else int(os.getenv('SYNC_RESYNC_AFTER', 86400))
+        self.use_changes = use_changes if use_changes is not None else os.getenv('SYNC_USE_TMDB_CHANGES', '0') == '1'
+        self.tmdb_factory = tmdb_factory
+        self.igdb_factory = igdb_factory
+
+    def sync(self, start_date, end_date, today=None):
+        """
+        Brings [start_date, end_date] up to date and returns the stored
+        releases for it.
+        """
+        today = today or datetime.date.today()
+        now = time.time()
+        window = _days_between(start_date, end_date)
+
+        sources = {}
+        metric_names = {}
+        fetched_days = {}
+        for source in SYNC_SOURCES:
+            synced = self.store.get_synced_days(source)
+            due = [day for day in window if self._is_due(day, synced.get(day), today, now)]
+            fetched_days[source] = set(due)
+            for range_start, range_end in _contiguous_ranges(due):
+                name = f'{source}|{range_start}|{range_end}'
+                sources[name] = self._fetcher(source, range_start, range_end)
+                metric_names[name] = source
+
+        logging.info(f'Syncing {len(sources)} day ranges for {start_date} to {end_date}')
+        results, failures = CollectionOrchestrator(sources, metric_names=metric_names).collect() if sources else ({}, {})
+
+        releases = []
+        for name, source_releases in results.items():
+            source, range_start, range_end = name.split('|')
+            releases.extend(source_releases)
+            self.store.mark_synced(source, _days_between(range_start, range_end), now)
+
+        if self.use_changes:
+            releases.extend(self._changed_releases(start_date, end_date, fetched_days, today))
+
+        if releases:
+            self.store.upsert_releases(releases)
+        for source in SYNC_SOURCES:
+            self.store.evict_synced_days(source, start_date, end_date)
+
+        stored_releases = self.store.get_window(start_date, end_date)
+        if failures and not results and not stored_releases:
+            raise RuntimeError(f"All release sources failed: {', '.join(failures)}")
+        return stored_releases
+
+    def _is_due(self, day, synced_at, today, now):
+        if synced_at is None or now - synced_at > self.resync_after:
+            return True
+        return abs((datetime.date.fromisoformat(day) - today).days) <= self.recheck_days
+
+    def _fetcher(self, source, range_start, range_end):
+        if source in TMDB_SOURCES:
+            return lambda: self._fetch_tmdb(source, range_start, range_end)
+        # IGDB's upper bound is midnight at the start of end_date, so reach into the next day
+        igdb_end = (datetime.date.fromisoformat(range_end) + datetime.timedelta(days=1)).isoformat()
+        return lambda: self.igdb_factory(range_start, igdb_end).get_games_bulk()
+
+    def _fetch_tmdb(self, source, range_start, range_end):
+        tmdb = self.tmdb_factory(range_start, range_end)
+        releases = tmdb.get_movies() if source == 'tmdb_movie' else tmdb.get_tv_shows()
+        # A skipped page would otherwise mark its days synced for resync_after seconds
+        if tmdb.failed_pages:
+            pages = ', '.join(str(page) for _, page in tmdb.failed_pages)
+            raise RuntimeError(f"TMDB {TMDB_SOURCES[source]} pages {pages} failed for {range_start} to {range_end}")
+        return releases
+
+    def _changed_releases(self, start_date, end_date, fetched_days, today):
+        tmdb = self.tmdb_factory(start_date, end_date)
+        stored = self.store.get_window(start_date, end_date)
+        releases = []
+        for source, media_type in TMDB_SOURCES.items():
+            synced = self.store.get_synced_days(source)
+            if not synced:
+                continue
+            last_sync = datetime.date.fromtimestamp(max(synced.values()))
+            since = max(last_sync, today - datetime.timedelta(days=TMDB_CHANGES_MAX_DAYS))
+
+            try:
+                changed_ids = tmdb.get_changed_ids(media_type, since.isoformat(), today.isoformat())
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error fetching TMDB {media_type} changes: {str(e)}")
+                continue
+
+            # Titles on days we just re-fetched are already current
+            stale_ids = [
+                release['id'] for release in stored
+                if release['source'] == source
+                and release['id'] in changed_ids
+                and release['release_date'] not in fetched_days[source]
+            ]
+            if not stale_ids:
+                continue
+
+            logging.info(f'Refreshing {len(stale_ids)} changed TMDB {media_type} titles')
+            with ThreadPoolExecutor(max_workers=tmdb.page_concurrency, thread_name_prefix='tmdb-changes') as executor:
+                for release in executor.map(lambda tmdb_id: self._details(tmdb, media_type, tmdb_id), stale_ids):
+                    if release is not None:
+                        releases.append(release)
+        return releases
+
+    def _details(self, tmdb, media_type, tmdb_id):
+        try:
+            return tmdb.get_details(media_type, tmdb_id)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error fetching TMDB {media_type} {tmdb_id}: {str(e)}")
+            return None
+
+def _days_between(start_date, end_date):
+    start = datetime.date.fromisoformat(start_date)
+    end = datetime.date.fromisoformat(end_date)
+    return [(start + datetime.timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+def _contiguous_ranges(days):
+    # Collapse sorted ISO days into (first, last) runs so each run is one upstream query
+    ranges = []
+    for day in sorted(days):
+        if ranges and datetime.date.fromisoformat(day) - datetime.date.fromisoformat(ranges[-1][1]) == datetime.timedelta(days=1):
+            ranges[-1][1] = day
+        else:
+            ranges.append([day, day])
+    return [tuple(r) for r in ranges]
@@ -1,59 +1,161 @@
 import os
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
+from collectors.session import create_session
 
 # Load environment variables
 load_dotenv()
 
+# TMDB refuses page numbers above this for discover endpoints
+TMDB_PAGE_LIMIT = 500
+# Overridden with TMDB_BASE_URL, e.g. to point at a local stand-in server
+TMDB_BASE_URL = 'https://api.themoviedb.org/3'
+
 class TMDBCollector:
-    def __init__(self, start_date, end_date):
+    def __init__(self, start_date, end_date, max_pages=None, page_concurrency=None):
         self.api_key = os.getenv('TMDB_API_KEY')
         self.start_date = start_date
         self.end_date = end_date
-        self.base_url = 'https://api.themoviedb.org/3'
-        self.session = requests.Session()
+        self.base_url = os.getenv('TMDB_BASE_URL', TMDB_BASE_URL).rstrip('/')
+        self.session = create_session()
         self.session.params = {'api_key': self.api_key, 'language': 'en-US'}
+        self.max_pages = max_pages if max_pages is not None else int(os.getenv('TMDB_MAX_PAGES', 5))
+        self.page_concurrency = page_concurrency if page_concurrency is not None else int(os.getenv('TMDB_PAGE_CONCURRENCY', 4))
+        # (media_type, page) for every discover page skipped after an error
+        self.failed_pages = []
 
-    def get_movies(self):
+    def get_movies(self, table=None):
+        """
+        Returns the window's movies as a list of dicts, or appends them to a
+        ReleaseTable and returns that when one is given.
+        """
         logging.info('Fetching movies from TMDB')
-        url = f"{self.base_url}/discover/movie"
-        params = {
+        if table is not None:
+            count = len(table)
+            for item in self._iter_discover('movie', self._movie_params()):
+                table.append(item['id'], 'tmdb_movie', 'movie', item['title'], item['release_date'],
+                             popularity=item['popularity'])
+            logging.info(f'Fetched {len(table) - count} movies from TMDB')
+            return table
+        movies = list(self.iter_movies())
+        logging.info(f'Fetched {len(movies)} movies from TMDB')
+        return movies
+
+    def get_tv_shows(self, table=None):
+        """Like get_movies, for TV shows."""
+        logging.info('Fetching TV shows from TMDB')
+        if table is not None:
+            count = len(table)
+            for item in self._iter_discover('tv', self._tv_params()):
+                table.append(item['id'], 'tmdb_tv', 'tv', item['name'], item['first_air_date'],
+                             popularity=item['popularity'])
+            logging.info(f'Fetched {len(table) - count} TV shows from TMDB')
+            return table
+        tv_shows = list(self.iter_tv_shows())
+        logging.info(f'Fetched {len(tv_shows)} TV shows from TMDB')
+        return tv_shows
+
+    def iter_movies(self):
+        for item in self._iter_discover('movie', self._movie_params()):
+            yield self._format_movie(item)
+
+    def iter_tv_shows(self):
+        for item in self._iter_discover('tv', self._tv_params()):
+            yield self._format_tv_show(item)
+
+    def _movie_params(self):
+        return {
             'primary_release_date.gte': self.start_date,
             'primary_release_date.lte': self.end_date,
             'sort_by': 'popularity.desc'
         }
-        response = self.session.get(url, params=params)
-        data = response.json()
-        movies = []
-        for item in data.get('results', []):
-            movie = {
-                'title': item['title'],
-                'release_date': item['release_date'],
-                'popularity': item['popularity'],
-                'type': 'movie'
-            }
-            movies.append(movie)
-        return movies
 
-    def get_tv_shows(self):
-        logging.info('Fetching TV shows from TMDB')
-        url = f"{self.base_url}/discover/tv"
-        params = {
+    def _tv_params(self):
+        return {
             'first_air_date.gte': self.start_date,
             'first_air_date.lte': self.end_date,
             'sort_by': 'popularity.desc'
         }
-        response = self.session.get(url, params=params)
-        data = response.json()
-        tv_shows = []
-        for item in data.get('results', []):
-            tv_show = {
-                'title': item['name'],
-                'release_date': item['first_air_date'],
-                'popularity': item['popularity'],
-                'type': 'tv'
+
+    def get_changed_ids(self, media_type, start_date, end_date):
+        """
+        Returns the ids TMDB reports as changed between two dates (at most 14
+        days apart) from /movie/changes or /tv/changes.
+        """
+        url = f"{self.base_url}/{media_type}/changes"
+        params = {'start_date': start_date, 'end_date': end_date}
+        first_page = self._fetch_page(url, params, 1)
+        ids = {item['id'] for item in first_page.get('results', [])}
+        for page in range(2, min(first_page.get('total_pages', 1), self.max_pages) + 1):
+            ids.update(item['id'] for item in self._fetch_page(url, params, page).get('results', []))
+        return ids
+
+    def get_details(self, media_type, tmdb_id):
+        """Fetches one title and returns it in the same shape as get_movies/get_tv_shows."""
+        response = self.session.get(f"{self.base_url}/{media_type}/{tmdb_id}")
+        response.raise_for_status()
+        item = response.json()
+        return self._format_movie(item) if media_type == 'movie' else self._format_tv_show(item)
+
+    def _format_movie(self, item):
+        return {
+            'id': item['id'],
+            'source': 'tmdb_movie',
+            'title': item['title'],
+            'release_date': item['release_date'],
+            'popularity': item['popularity'],
+            'type': 'movie'
+        }
+
+    def _format_tv_show(self, item):
+        return {
+            'id': item['id'],
+            'source': 'tmdb_tv',
+            'title': item['name'],
+            'release_date': item['first_air_date'],
+            'popularity': item['popularity'],
+            'type': 'tv'
+        }
+
+    def _iter_discover(self, media_type, params):
+        """
+        Yields raw discover results page by page. The first page tells us
+        total_pages; the rest are fetched in parallel over the shared session,
+        at most page_concurrency at a time and capped at max_pages, and are
+        yielded as soon as each one arrives. A later page that fails is logged,
+        skipped and recorded in failed_pages.
+        """
+        url = f"{self.base_url}/discover/{media_type}"
+        first_page = self._fetch_page(url, params, 1)
+        yield from first_page.get('results', [])
+
+        total_pages = min(first_page.get('total_pages', 1), self.max_pages, TMDB_PAGE_LIMIT)
+        if total_pages <= 1:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.page_concurrency, thread_name_prefix='tmdb-page')
+        try:
+            futures = {
+                executor.submit(self._fetch_page, url, params, page): page
+                for page in range(2, total_pages + 1)
             }
-            tv_shows.append(tv_show)
-        return tv_shows
\ No newline at end of file
+            for future in as_completed(futures):
+                try:
+                    data = future.result()
+                except requests.exceptions.RequestException as e:
+                    # Losing one page beats losing the whole window
+                    logging.error(f"Error fetching TMDB {media_type} page {futures[future]}: {str(e)}")
+                    self.failed_pages.append((media_type, futures[future]))
+                    continue
+                yield from data.get('results', [])
+        finally:
+            # Stop queued pages if the consumer abandons the stream early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _fetch_page(self, url, params, page):
+        response = self.session.get(url, params={**params, 'page': page})
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import logging
+import threading
+import requests
+from utils.metrics import get_metrics
+
+# Overridden with TWITCH_TOKEN_URL, e.g. to point at a local stand-in server
+TWITCH_TOKEN_URL = 'https://id.twitch.tv/oauth2/token'
+
+class TwitchTokenManager:
+    """
+    Process-wide holder for the Twitch app access token that IGDB requires.
+
+    The token is cached with its expiry and persisted to a local file so a
+    restart skips the OAuth call. Once a token is inside the refresh margin it
+    is still handed out while a replacement is fetched in the background;
+    only a missing or expired token blocks the caller.
+    """
+
+    def __init__(self, client_id, client_secret, cache_path=None, refresh_margin=None, token_url=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache_path = cache_path or os.getenv('IGDB_TOKEN_CACHE', '.igdb_token.json')
+        self.refresh_margin = refresh_margin if refresh_margin is not None else int(os.getenv('IGDB_TOKEN_REFRESH_MARGIN', 3600))
+        self.token_url = token_url or os.getenv('TWITCH_TOKEN_URL', TWITCH_TOKEN_URL)
+        self.access_token = None
+        self.expires_at = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._load()
+
+    def get_token(self):
+        now = time.time()
+        token, expires_at = self.access_token, self.expires_at
+        if token and expires_at - now > self.refresh_margin:
+            return token
+        if token and expires_at - now > 60:
+            self._refresh_in_background()
+            return token
+
+        with self._lock:
+            # Another thread may have fetched one while we waited
+            if self.access_token and self.expires_at - time.time() > 60:
+                return self.access_token
+            return self._fetch_token()
+
+    def refresh(self, stale_token=None):
+        """
+        Replaces the token after the API rejected it. Concurrent callers that
+        saw the same stale token share a single OAuth call.
+        """
+        with self._lock:
+            if stale_token is not None and self.access_token != stale_token:
+                return self.access_token
+            return self._fetch_token()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._lock:
+                    self._fetch_token()
+            except Exception as e:
+                # The current token is still valid; the next call will retry
+                logging.error(f"Background IGDB token refresh failed: {str(e)}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name='igdb-token-refresh', daemon=True).start()
+
+    def _fetch_token(self):
+        logging.info('Fetching IGDB access token')
+        params = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'grant_type': 'client_credentials'
+        }
+
+        try:
+            with get_metrics().timer('wakeupbabe_collector_seconds', collector='twitch_oauth'):
+                response = requests.post(self.token_url, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            if 'access_token' not in data:
+                logging.error(f"Unexpected API response: {data}")
+                raise ValueError("Access token not found in API response")
+
+            self.access_token = data['access_token']
+            self.expires_at = time.time() + data.get('expires_in', 3600)
+            self._save()
+            logging.info('Successfully obtained IGDB access token')
+            return self.access_token
+
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Failed to get IGDB access token: {str(e)}")
+            if hasattr(e, 'response') and e.response is not None:
+                logging.error(f"API Response: {e.response.text}")
+            raise
+
+    def _load(self):
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('client_id') == self.client_id and data.get('expires_at', 0) > time.time():
+            self.access_token = data.get('access_token')
+            self.expires_at = data['expires_at']
+
+    def _save(self):
+        data = {
+            'client_id': self.client_id,
+            'access_token': self.access_token,
+            'expires_at': self.expires_at
+        }
+        tmp_path = f'{self.cache_path}.tmp'
+        try:
+            # The token is a credential; keep it readable by this user only
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Could not persist IGDB token to {self.cache_path}: {str(e)}")
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_token_manager(client_id, client_secret):
+    """Returns the shared token manager for a set of credentials."""
+    with _managers_lock:
+        manager = _managers.get(client_id)
+        if manager is None or manager.client_secret != client_secret:
+            manager = TwitchTokenManager(client_id, client_secret)
+            _managers[client_id] = manager
+        return manager
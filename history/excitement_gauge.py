@@ -1,11 +1,28 @@
 import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from pytrends.request import TrendReq
 import praw
 from textblob import TextBlob
+from textblob.en import sentiment as textblob_lexicon
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from fuzzywuzzy import fuzz
 
+# This script is usually run from history/; the app's shared helpers live one level up
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+from utils.dedupe import normalize_title
+
 # Load environment variables
 load_dotenv()
 
@@ -13,68 +30,473 @@ REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
 REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
 REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT')
 
+# Google Trends compares at most 5 terms per payload; one slot holds the anchor
+TRENDS_BATCH_SIZE = 5
+# Opt-in. Trends rescales a payload to its biggest term, so pick an anchor about as searched as a typical title
+TRENDS_ANCHOR = os.getenv('TRENDS_ANCHOR', '')
+# Below this peak an anchored series is too coarse (mostly 0s and 1s) to measure growth on
+TRENDS_MIN_PEAK = int(os.getenv('TRENDS_MIN_PEAK', 10))
+TRENDS_CACHE_TTL = int(os.getenv('TRENDS_CACHE_TTL', 6 * 3600))
+TRENDS_MIN_INTERVAL = float(os.getenv('TRENDS_MIN_INTERVAL', 5))
+
+SUBREDDITS = {
+    'movie': ['movies'],
+    'tv': ['television'],
+    'game': ['gaming', 'Games']
+}
+REDDIT_MAX_WORKERS = int(os.getenv('REDDIT_MAX_WORKERS', 8))
+REDDIT_CACHE_TTL = int(os.getenv('REDDIT_CACHE_TTL', 3600))
+
+SENTIMENT_PROCESSES = int(os.getenv('SENTIMENT_PROCESSES', 0))
+SENTIMENT_PARALLEL_THRESHOLD = int(os.getenv('SENTIMENT_PARALLEL_THRESHOLD', 20000))
+SENTIMENT_MEMO_SIZE = int(os.getenv('SENTIMENT_MEMO_SIZE', 100000))
+
+GAUGE_MAX_WORKERS = int(os.getenv('GAUGE_MAX_WORKERS', 8))
+GAUGE_TITLE_TIMEOUT = float(os.getenv('GAUGE_TITLE_TIMEOUT', 120))
+GAUGE_SENTIMENT_PROCESSES = int(os.getenv('GAUGE_SENTIMENT_PROCESSES', os.cpu_count() or 1))
+# Titles whose Reddit texts are scored in one batch; at a couple of hundred
+# texts per title a full batch reaches SENTIMENT_PARALLEL_THRESHOLD
+GAUGE_SENTIMENT_BATCH = int(os.getenv('GAUGE_SENTIMENT_BATCH', 100))
+GAUGE_CHECKPOINT_PATH = os.getenv('GAUGE_CHECKPOINT_PATH', '.gauge_checkpoint.json')
+
+# Trends move within a day; Reddit's monthly search results change more slowly
+GAUGE_CACHE_PATH = os.getenv('GAUGE_CACHE_PATH', '.gauge_cache.sqlite')
+GAUGE_TREND_TTL = int(os.getenv('GAUGE_TREND_TTL', 12 * 3600))
+GAUGE_SENTIMENT_TTL = int(os.getenv('GAUGE_SENTIMENT_TTL', 24 * 3600))
+GAUGE_CACHE_MAX_ENTRIES = int(os.getenv('GAUGE_CACHE_MAX_ENTRIES', 20000))
+
 class GoogleTrendsAnalyzer:
-    def __init__(self):
+    """
+    Scores keywords by how much their search interest grew over the last 30
+    days.
+
+    Each keyword is fetched in its own payload, so its series is scaled to its
+    own peak. With an anchor term, keywords are instead packed four to a
+    payload next to the anchor, so relative interest stays comparable across
+    batches; a keyword whose anchored series peaks below TRENDS_MIN_PEAK is
+    fetched again on its own for the growth score. Results are cached per
+    (keyword, timeframe) for TRENDS_CACHE_TTL seconds, which also lets title
+    variants shared between releases reuse one lookup. Payloads are sent at
+    most once every TRENDS_MIN_INTERVAL seconds to stay clear of Google's
+    throttling.
+    """
+
+    def __init__(self, anchor=None, cache_ttl=TRENDS_CACHE_TTL, min_interval=TRENDS_MIN_INTERVAL):
         self.pytrends = TrendReq(hl='en-US', tz=360)
+        self.anchor = anchor if anchor is not None else TRENDS_ANCHOR
+        self.cache_ttl = cache_ttl
+        self.min_interval = min_interval
+        self._cache = {}  # (keyword, timeframe) -> (fetched_at, trend_score, relative_interest)
+        self._lock = threading.Lock()
+        self._next_request_at = 0
 
     def get_trend_score(self, title):
         print(f"Analyzing Google Trends for: {title}")
+        return self.get_trend_scores([title])[title]
+
+    def get_trend_scores(self, keywords, on_batch=None):
+        """
+        Args:
+            keywords (iterable): Search terms, duplicates allowed.
+            on_batch (callable): Called with {keyword: trend score} as scores
+                become available: once for the cached keywords, then after
+                every payload. Keywords in a failed payload are left out.
+
+        Returns:
+            dict: Trend score from 0 to 100 for each keyword.
+        """
+        timeframe = self._timeframe()
+        keywords = list(dict.fromkeys(keywords))
+        with self._lock:
+            missing = [k for k in keywords if not self._is_fresh(k, timeframe)]
+            if on_batch is not None and len(missing) < len(keywords):
+                on_batch(self._cached_scores(set(keywords) - set(missing), timeframe))
+            batch_size = TRENDS_BATCH_SIZE - 1 if self.anchor else 1
+            for i in range(0, len(missing), batch_size):
+                batch = missing[i:i + batch_size]
+                self._fetch_batch(batch, timeframe)
+                if on_batch is not None:
+                    on_batch(self._cached_scores(batch, timeframe))
+            return {k: self._cache[(k, timeframe)][1] if (k, timeframe) in self._cache else 0 for k in keywords}
+
+    def _cached_scores(self, keywords, timeframe):
+        return {k: self._cache[(k, timeframe)][1] for k in keywords if (k, timeframe) in self._cache}
+
+    def get_relative_interest(self, keyword):
+        """Returns a keyword's average interest relative to the anchor term, if fetched with one."""
+        entry = self._cache.get((keyword, self._timeframe()))
+        return entry[2] if entry is not None else None
+
+    def is_fetched(self, keyword):
+        """Whether the keyword has Trends data for the current timeframe, i.e. wasn't in a failed payload."""
+        return (keyword, self._timeframe()) in self._cache
+
+    def _timeframe(self):
         today = datetime.now()
         start_date = (today - timedelta(days=30)).strftime('%Y-%m-%d')
         end_date = today.strftime('%Y-%m-%d')
-        
-        self.pytrends.build_payload([title], timeframe=f'{start_date} {end_date}')
-        interest_over_time = self.pytrends.interest_over_time()
-        
-        if interest_over_time.empty:
-            print(f"No trend data found for: {title}")
-            return 0
-        
-        trend_values = interest_over_time[title].values
+        return f'{start_date} {end_date}'
+
+    def _is_fresh(self, keyword, timeframe):
+        entry = self._cache.get((keyword, timeframe))
+        return entry is not None and time.time() - entry[0] < self.cache_ttl
+
+    def _fetch_batch(self, keywords, timeframe):
+        payload = ([self.anchor] if self.anchor else []) + [k for k in keywords if k != self.anchor]
+        print(f"Fetching Google Trends for: {', '.join(keywords)}")
+        interest_over_time = self._interest_over_time(payload, timeframe)
+        if interest_over_time is None:
+            # Leave these uncached so the next call retries them
+            return
+
+        now = time.time()
+        anchor_mean = interest_over_time[self.anchor].mean() if self.anchor and not interest_over_time.empty else 0
+        for keyword in keywords:
+            if interest_over_time.empty or keyword not in interest_over_time:
+                print(f"No trend data found for: {keyword}")
+                self._cache[(keyword, timeframe)] = (now, 0, 0 if self.anchor else None)
+                continue
+            trend_values = interest_over_time[keyword].values
+            relative_interest = None
+            if self.anchor:
+                relative_interest = trend_values.mean() / anchor_mean if anchor_mean > 0 else 0
+                if trend_values.max() < TRENDS_MIN_PEAK:
+                    # Scaled against a much bigger anchor, growth is lost to rounding; measure it on its own
+                    alone = self._interest_over_time([keyword], timeframe)
+                    if alone is not None and keyword in alone:
+                        trend_values = alone[keyword].values
+            self._cache[(keyword, timeframe)] = (now, self._score(keyword, trend_values), relative_interest)
+
+    def _interest_over_time(self, payload, timeframe):
+        # Throttle payloads; the lock is held, so they go out one at a time
+        wait = self._next_request_at - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        self._next_request_at = time.time() + self.min_interval
+        try:
+            self.pytrends.build_payload(payload, timeframe=timeframe)
+            return self.pytrends.interest_over_time()
+        except Exception as e:
+            print(f"Error fetching Google Trends for {', '.join(payload)}: {str(e)}")
+            return None
+
+    def _score(self, keyword, trend_values):
         if len(trend_values) < 2:
-            print(f"Insufficient trend data for: {title}")
+            print(f"Insufficient trend data for: {keyword}")
             return 0
-        
+
         initial_volume = trend_values[0]
         final_volume = trend_values[-1]
         trend_score = (final_volume - initial_volume) / initial_volume if initial_volume > 0 else 0
-        
+
         normalized_score = max(0, min(100, trend_score * 100))
-        print(f"Trend score for {title}: {normalized_score:.2f}")
+        print(f"Trend score for {keyword}: {normalized_score:.2f}")
         return normalized_score
 
+NEGATIONS = ('no', 'not', "n't", 'never')
+# Words and "!" only. TextBlob's tokenizer ends up splitting "don't" into
+# "do n ' t", so contractions never negate there and don't here either.
+SENTIMENT_TOKEN = re.compile(r"\w+(?:-\w+)*|!")
+
+_lexicon = None
+
+def _get_lexicon():
+    # {word: (polarity, intensity, is_modifier)} from TextBlob's pattern lexicon, built once per process
+    global _lexicon
+    if _lexicon is None:
+        if not dict.__len__(textblob_lexicon):
+            textblob_lexicon.load()
+        _lexicon = {
+            word: (tags[None][0], tags[None][2], 'RB' in tags)
+            for word, tags in dict.items(textblob_lexicon)
+            if None in tags
+        }
+    return _lexicon
+
+def polarity(text, lexicon=None):
+    """
+    Returns the polarity of a text from -1.0 to 1.0, following TextBlob's
+    pattern analyzer (modifiers, negation, exclamation marks) without its
+    per-call parsing overhead. Emoticons are not scored.
+    """
+    lexicon = lexicon or _get_lexicon()
+    assessments = []  # [polarity, intensity, negated]
+    modifier = None
+    negation = None
+    for word in SENTIMENT_TOKEN.findall(text.lower()):
+        entry = lexicon.get(word)
+        if entry is not None:
+            word_polarity, intensity, is_modifier = entry
+            if modifier is None:
+                assessments.append([word_polarity, intensity, False])
+            else:
+                # "really good": the modifier's intensity scales this word
+                last = assessments[-1]
+                last[0] = max(-1.0, min(word_polarity * last[1], 1.0))
+                last[1] = intensity
+            if negation is not None:
+                assessments[-1][1] = 1.0 / assessments[-1][1]
+                assessments[-1][2] = True
+            modifier = word if is_modifier else None
+            negation = word if word in NEGATIONS else None
+        else:
+            if word in NEGATIONS:
+                negation = word
+            elif negation and len(word) > 1:
+                # Negation carries across small words ("not a good")
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith('ly'):
+                # "really not good"
+                assessments[-1][2] = True
+                negation = None
+            elif modifier and len(word) > 2:
+                modifier = None
+            if word == '!' and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+
+    if not assessments:
+        return 0.0
+    # "not good" = slightly bad, "not bad" = slightly good
+    return sum(p * -0.5 if negated else p for p, _, negated in assessments) / len(assessments)
+
+def _polarities(texts):
+    lexicon = _get_lexicon()
+    return [polarity(text, lexicon) for text in texts]
+
+class TextBlobSentimentScorer:
+    """Reference engine: one TextBlob per text."""
+
+    def score(self, texts):
+        return [TextBlob(text).sentiment.polarity for text in texts]
+
+class LexiconSentimentScorer:
+    """
+    Batch sentiment engine. Scores a list of texts at once with a
+    precompiled lexicon lookup, memoizing results by text hash so repeated
+    comments and titles are scored once. Batches of at least
+    parallel_threshold new texts are spread over a process pool when
+    processes is set; smaller ones are cheaper to score in-process. The pool's
+    workers are spawned rather than forked, since it is usually started from
+    one of several threads.
+    """
+
+    def __init__(self, processes=SENTIMENT_PROCESSES, parallel_threshold=SENTIMENT_PARALLEL_THRESHOLD,
+                 memo_size=SENTIMENT_MEMO_SIZE):
+        self.processes = processes
+        self.parallel_threshold = parallel_threshold
+        self.memo_size = memo_size
+        self._memo = OrderedDict()  # text hash -> polarity
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def score(self, texts):
+        """
+        Args:
+            texts (list): Strings to score.
+
+        Returns:
+            list: Polarity from -1.0 to 1.0 for each text, in order.
+        """
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest() for text in texts]
+        results = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    results[key] = self._memo[key]
+        missing = {key: text for key, text in zip(keys, texts) if key not in results}
+
+        if missing:
+            results.update(zip(missing, self._score_missing(list(missing.values()))))
+            with self._lock:
+                for key in missing:
+                    self._memo[key] = results[key]
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return [results[key] for key in keys]
+
+    def _score_missing(self, texts):
+        if not self.processes or len(texts) < self.parallel_threshold:
+            return _polarities(texts)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'))
+        chunk_size = -(-len(texts) // self.processes)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        return [p for chunk in self._pool.map(_polarities, chunks) for p in chunk]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
 class RedditSentimentAnalyzer:
-    def __init__(self):
-        self.reddit = praw.Reddit(
-            client_id=REDDIT_CLIENT_ID,
-            client_secret=REDDIT_CLIENT_SECRET,
-            user_agent=REDDIT_USER_AGENT
-        )
+    """
+    Scores titles by the sentiment and engagement of matching Reddit posts.
+
+    Searches for every (subreddit, query) pair run concurrently on one thread
+    pool of max_workers shared by all callers, so a catalog run gauging many
+    titles at once still makes at most max_workers Reddit requests at a time.
+    PRAW isn't thread-safe, so each worker thread has its own praw.Reddit.
+    Submissions found by several queries are fetched once, and both search
+    results and fetched submissions with their comments are cached for
+    REDDIT_CACHE_TTL seconds.
+    """
+
+    def __init__(self, max_workers=REDDIT_MAX_WORKERS, cache_ttl=REDDIT_CACHE_TTL, sentiment_scorer=None):
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.sentiment_scorer = sentiment_scorer or LexiconSentimentScorer()
+        self._searches = {}  # (subreddit, query) -> (fetched_at, [submission ids])
+        self._submissions = {}  # submission id -> (fetched_at, submission summary)
+        self._found = {}  # submission id -> post from the latest search, comments not fetched
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = None
 
     def get_sentiment_score(self, title, media_type):
         print(f"Analyzing Reddit sentiment for: {title} ({media_type})")
-        subreddits = {
-            'movie': ['movies'],
-            'tv': ['television'],
-            'game': ['gaming', 'Games']
+        return self.get_sentiment_scores([title], media_type)[title]
+
+    def get_sentiment_scores(self, titles, media_type):
+        """
+        Args:
+            titles (iterable): Search queries, e.g. the variants of one title.
+            media_type (str): 'movie', 'tv' or 'game'; picks the subreddits.
+
+        Returns:
+            dict: Sentiment score for each title.
+        """
+        return self.score_lookups([self.lookup(titles, media_type)])[0]
+
+    def lookup(self, titles, media_type):
+        """
+        Runs the searches for titles and fetches the posts they find, without
+        scoring them. Takes the same arguments as get_sentiment_scores.
+
+        Returns:
+            dict: The submissions found for each title.
+        """
+        titles = list(dict.fromkeys(titles))
+        searches = [(subreddit, title) for title in titles for subreddit in SUBREDDITS.get(media_type, ['all'])]
+
+        executor = self._get_executor()
+        found = dict(zip(searches, executor.map(self._search, searches)))
+
+        # Variants and subreddits often surface the same posts; fetch each once
+        submission_ids = list(dict.fromkeys(i for ids in found.values() for i in ids))
+        submissions = dict(zip(submission_ids, executor.map(self._submission, submission_ids)))
+        submissions = {i: submission for i, submission in submissions.items() if submission is not None}
+
+        lookup = {}
+        for title in titles:
+            ids = dict.fromkeys(i for (_, query), found_ids in found.items() if query == title for i in found_ids)
+            lookup[title] = [submissions[i] for i in ids if i in submissions]
+        return lookup
+
+    def score_lookups(self, lookups):
+        """
+        Scores the results of several lookup calls in one batch.
+
+        Returns:
+            list: The sentiment score for each title, one dict per lookup.
+        """
+        # Every post and comment across all lookups goes to the scorer at once, shared posts only once
+        submissions = {s['id']: s for lookup in lookups for found in lookup.values() for s in found}
+        texts = [text for submission in submissions.values() for text in [submission['text']] + submission['comments']]
+        polarities = iter(self.sentiment_scorer.score(texts))
+        sentiments = {i: [next(polarities) for _ in range(1 + len(s['comments']))] for i, s in submissions.items()}
+
+        return [
+            {title: self._score(title, [(s, sentiments[s['id']]) for s in found]) for title, found in lookup.items()}
+            for lookup in lookups
+        ]
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+        if hasattr(self.sentiment_scorer, 'close'):
+            self.sentiment_scorer.close()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='reddit')
+            return self._executor
+
+    def _reddit(self):
+        reddit = getattr(self._local, 'reddit', None)
+        if reddit is None:
+            reddit = self._local.reddit = praw.Reddit(
+                client_id=REDDIT_CLIENT_ID,
+                client_secret=REDDIT_CLIENT_SECRET,
+                user_agent=REDDIT_USER_AGENT
+            )
+        return reddit
+
+    def _is_fresh(self, entry):
+        return entry is not None and time.time() - entry[0] < self.cache_ttl
+
+    def _search(self, search):
+        entry = self._searches.get(search)
+        if self._is_fresh(entry):
+            return entry[1]
+
+        subreddit_name, query = search
+        print(f"Searching in subreddit: {subreddit_name} for: {query}")
+        try:
+            submissions = list(self._reddit().subreddit(subreddit_name).search(query, limit=5, sort='hot', time_filter='month'))
+        except Exception as e:
+            print(f"Error searching {subreddit_name} for {query}: {str(e)}")
+            return []
+
+        ids = [submission.id for submission in submissions]
+        with self._lock:
+            # Search results already carry the post itself, so only comments need another request
+            for submission in submissions:
+                self._found[submission.id] = submission
+            self._searches[search] = (time.time(), ids)
+        return ids
+
+    def _submission(self, submission_id):
+        with self._lock:
+            entry = self._submissions.get(submission_id)
+            if self._is_fresh(entry):
+                return entry[1]
+            submission = self._found.pop(submission_id, None)
+        if submission is None:
+            return entry[1] if entry is not None else None
+
+        try:
+            # The search result belongs to another thread's client; load the comments through this one's
+            thread_submission = self._reddit().submission(id=submission_id)
+            thread_submission.comments.replace_more(limit=0)
+            comments = [comment.body for comment in thread_submission.comments.list()[:10]]
+        except Exception as e:
+            print(f"Error fetching comments for {submission_id}: {str(e)}")
+            comments = []
+
+        summary = {
+            'id': submission_id,
+            'text': submission.title + ' ' + (submission.selftext or ''),
+            'score': submission.score,
+            'num_comments': submission.num_comments,
+            'comments': comments,
         }
-        
+        with self._lock:
+            self._submissions[submission_id] = (time.time(), summary)
+        return summary
+
+    def _score(self, title, submissions):
         sentiment_scores = []
         engagement_scores = []
+        for submission, polarities in submissions:
+            # The post itself, then its comments
+            sentiment_scores.extend(polarities)
 
-        for subreddit_name in subreddits.get(media_type, ['all']):
-            print(f"Searching in subreddit: {subreddit_name}")
-            subreddit = self.reddit.subreddit(subreddit_name)
-            for submission in subreddit.search(title, limit=5, sort='hot', time_filter='month'):
-                text = submission.title + ' ' + (submission.selftext or '')
-                sentiment_scores.append(TextBlob(text).sentiment.polarity)
-                
-                engagement_score = (submission.score + submission.num_comments) / 100
-                engagement_scores.append(min(engagement_score, 100))  # Cap at 100
-
-                submission.comments.replace_more(limit=0)
-                for comment in submission.comments.list()[:10]:
-                    sentiment_scores.append(TextBlob(comment.body).sentiment.polarity)
+            engagement_score = (submission['score'] + submission['num_comments']) / 100
+            engagement_scores.append(min(engagement_score, 100))  # Cap at 100
 
         if not sentiment_scores:
             print(f"No Reddit data found for: {title}")
@@ -87,26 +509,126 @@ class RedditSentimentAnalyzer:
         print(f"Reddit sentiment score for {title}: {final_score:.2f}")
         return final_score
 
+class GaugeScoreCache:
+    """
+    Trend and sentiment scores per (normalized title, media type, release
+    day), persisted in SQLite so repeated runs only gauge new or stale titles.
+
+    Each signal has its own TTL; expired scores count as misses. Once the
+    table grows past max_entries the least recently used scores are evicted.
+    """
+
+    def __init__(self, path=GAUGE_CACHE_PATH, ttls=None, max_entries=GAUGE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttls = ttls or {'trend': GAUGE_TREND_TTL, 'sentiment': GAUGE_SENTIMENT_TTL}
+        self.max_entries = max_entries
+        self.stats = {signal: {'hits': 0, 'misses': 0, 'stale': 0} for signal in self.ttls}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS scores (
+                title TEXT NOT NULL,
+                media_type TEXT NOT NULL,
+                day TEXT NOT NULL,
+                signal TEXT NOT NULL,
+                score REAL NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (title, media_type, day, signal)
+            );
+            CREATE INDEX IF NOT EXISTS idx_scores_accessed_at ON scores (accessed_at);
+        ''')
+
+    def get(self, title, media_type, day, signal):
+        """Returns a fresh cached score, or None."""
+        key = (normalize_title(title), media_type, day or '', signal)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT score, stored_at FROM scores WHERE title = ? AND media_type = ? AND day = ? AND signal = ?', key
+            ).fetchone()
+            if row is None:
+                self.stats[signal]['misses'] += 1
+                return None
+            if now - row[1] >= self.ttls[signal]:
+                self.stats[signal]['stale'] += 1
+                return None
+            self.stats[signal]['hits'] += 1
+            self._conn.execute(
+                'UPDATE scores SET accessed_at = ? WHERE title = ? AND media_type = ? AND day = ? AND signal = ?',
+                (now,) + key
+            )
+            self._conn.commit()
+        return row[0]
+
+    def set(self, title, media_type, day, signal, score):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO scores (title, media_type, day, signal, score, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (normalize_title(title), media_type, day or '', signal, float(score), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def hit_rate(self, signal=None):
+        signals = [signal] if signal else list(self.stats)
+        hits = sum(self.stats[s]['hits'] for s in signals)
+        lookups = sum(sum(self.stats[s].values()) for s in signals)
+        return hits / lookups if lookups else 0.0
+
+    def _evict(self):
+        count = self._conn.execute('SELECT COUNT(*) FROM scores').fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                'DELETE FROM scores WHERE rowid IN (SELECT rowid FROM scores ORDER BY accessed_at ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
 class ExcitementGauge:
-    def __init__(self):
-        self.trends_analyzer = GoogleTrendsAnalyzer()
-        self.sentiment_analyzer = RedditSentimentAnalyzer()
+    def __init__(self, trends_analyzer=None, sentiment_analyzer=None, score_cache=None):
+        self.trends_analyzer = trends_analyzer or GoogleTrendsAnalyzer()
+        self.sentiment_analyzer = sentiment_analyzer or RedditSentimentAnalyzer()
+        self.score_cache = score_cache
 
-    def gauge_excitement(self, title, media_type):
+    def gauge_excitement(self, title, media_type, release_date=None):
         print(f"\nGauging excitement for: {title} ({media_type})")
-        
-        # Fuzzy match for Google Trends
-        trend_score = max(self.trends_analyzer.get_trend_score(variant) 
-                          for variant in self.generate_title_variants(title))
-        
-        # Fuzzy match for Reddit
-        sentiment_score = max(self.sentiment_analyzer.get_sentiment_score(variant, media_type) 
-                              for variant in self.generate_title_variants(title))
-        
-        excitement_score = 0.6 * trend_score + 0.4 * sentiment_score
+
+        trend_score = self._cached(title, media_type, release_date, 'trend', lambda: self.get_trend_score(title))
+        sentiment_score = self._cached(title, media_type, release_date, 'sentiment',
+                                       lambda: self.get_sentiment_score(title, media_type))
+
+        excitement_score = self.combine_scores(trend_score, sentiment_score)
         print(f"Final excitement score for {title}: {excitement_score:.2f}")
         return excitement_score
 
+    def _cached(self, title, media_type, release_date, signal, compute):
+        if self.score_cache is None:
+            return compute()
+        score = self.score_cache.get(title, media_type, release_date, signal)
+        if score is None:
+            score = compute()
+            self.score_cache.set(title, media_type, release_date, signal, score)
+        return score
+
+    def get_trend_score(self, title):
+        # Fuzzy match for Google Trends, all variants in one batch
+        return max(self.trends_analyzer.get_trend_scores(self.generate_title_variants(title)).values())
+
+    def get_sentiment_score(self, title, media_type):
+        return self.score_sentiment([self.lookup_sentiment(title, media_type)])[0]
+
+    def lookup_sentiment(self, title, media_type):
+        # Fuzzy match for Reddit, searching all variants concurrently
+        return self.sentiment_analyzer.lookup(self.generate_title_variants(title), media_type)
+
+    def score_sentiment(self, lookups):
+        return [max(scores.values()) for scores in self.sentiment_analyzer.score_lookups(lookups)]
+
+    def combine_scores(self, trend_score, sentiment_score):
+        return 0.6 * trend_score + 0.4 * sentiment_score
+
     def generate_title_variants(self, title):
         # Generate variations of the title
         words = title.split()
@@ -116,8 +638,225 @@ class ExcitementGauge:
             variants.append(' '.join(words[1:]))   # Remove first word
         return variants
 
+class GaugeCheckpoint:
+    """
+    Trend and sentiment scores of a catalog run, saved to a JSON file after
+    every title so an interrupted run can pick up where it stopped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.scores = {}  # release key -> {'trend': score, 'sentiment': score}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.scores = json.load(f)
+                print(f"Resuming from checkpoint with {len(self.scores)} titles")
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable checkpoint {path}: {str(e)}")
+
+    def get(self, key, signal):
+        return self.scores.get(key, {}).get(signal)
+
+    def record(self, key, signal, score, save=True):
+        with self._lock:
+            self.scores.setdefault(key, {})[signal] = score
+            if not save or not self.path:
+                return
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.scores, f)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        with self._lock:
+            self.scores = {}
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+class CatalogGaugeRunner:
+    """
+    Gauges a whole catalog at once.
+
+    Trend scores for every title variant are fetched in full batches on a
+    background thread, and each title is checkpointed as soon as the batch
+    holding its last variant returns. Meanwhile Reddit lookups run for many
+    titles in parallel on a thread pool, their requests sharing the sentiment
+    analyzer's bounded pool. The posts they find are scored sentiment_batch
+    titles at a time, so the CPU-bound scoring gets batches big enough for
+    the scorer's process pool. A title whose Reddit lookup takes longer than
+    title_timeout seconds is skipped. Finished scores are checkpointed, so rerunning after an
+    interruption or timeouts only gauges what is missing; the checkpoint is
+    removed once every title is done. Scores still fresh in the gauge's score
+    cache are not gauged again at all.
+    """
+
+    def __init__(self, gauge=None, max_workers=GAUGE_MAX_WORKERS, title_timeout=GAUGE_TITLE_TIMEOUT,
+                 processes=GAUGE_SENTIMENT_PROCESSES, sentiment_batch=GAUGE_SENTIMENT_BATCH,
+                 checkpoint_path=GAUGE_CHECKPOINT_PATH, progress=None):
+        if gauge is None:
+            scorer = LexiconSentimentScorer(processes=processes)
+            gauge = ExcitementGauge(sentiment_analyzer=RedditSentimentAnalyzer(sentiment_scorer=scorer),
+                                    score_cache=GaugeScoreCache() if GAUGE_CACHE_PATH else None)
+        self.gauge = gauge
+        self.max_workers = max_workers
+        self.title_timeout = title_timeout
+        self.sentiment_batch = sentiment_batch
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress or self._print_progress
+
+    def run(self, releases):
+        """
+        Sets excitement_score on every release that could be gauged.
+
+        Args:
+            releases (list): Release dictionaries with a title and type.
+
+        Returns:
+            list: The releases that were gauged.
+        """
+        checkpoint = GaugeCheckpoint(self.checkpoint_path)
+        titles = {}
+        for release in releases:
+            title = release.get('title') or release.get('name', 'Unknown Title')
+            titles.setdefault(f"{release['type']}|{title}", (title, release['type'], release.get('release_date')))
+
+        score_cache = self.gauge.score_cache
+        if score_cache is not None:
+            for key, (title, media_type, day) in titles.items():
+                for signal in ('trend', 'sentiment'):
+                    if checkpoint.get(key, signal) is None:
+                        score = score_cache.get(title, media_type, day, signal)
+                        if score is not None:
+                            checkpoint.record(key, signal, score, save=False)
+
+        started_at = time.time()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='gauge-trends') as trends_executor:
+            trends = trends_executor.submit(self._gauge_trends, titles, checkpoint)
+            self._gauge_sentiment(titles, checkpoint, started_at)
+            trends.result()
+
+        gauged = []
+        for release in releases:
+            title = release.get('title') or release.get('name', 'Unknown Title')
+            key = f"{release['type']}|{title}"
+            trend_score, sentiment_score = checkpoint.get(key, 'trend'), checkpoint.get(key, 'sentiment')
+            if trend_score is None or sentiment_score is None:
+                continue
+            release['excitement_score'] = self.gauge.combine_scores(trend_score, sentiment_score)
+            gauged.append(release)
+
+        print(f"Gauged {len(gauged)} of {len(releases)} releases in {time.time() - started_at:.1f}s")
+        if score_cache is not None:
+            print(f"Score cache hit rate: {score_cache.hit_rate():.0%}")
+        if len(gauged) == len(releases):
+            checkpoint.clear()
+        else:
+            print(f"Run again to retry the rest; progress is saved in {self.checkpoint_path}")
+        return gauged
+
+    def _gauge_trends(self, titles, checkpoint):
+        pending = {key: title for key, (title, _, _) in titles.items() if checkpoint.get(key, 'trend') is None}
+        variants = {key: self.gauge.generate_title_variants(title) for key, title in pending.items()}
+        waiting = {key: set(title_variants) for key, title_variants in variants.items()}
+        titles_by_variant = {}
+        for key, title_variants in variants.items():
+            for variant in title_variants:
+                titles_by_variant.setdefault(variant, []).append(key)
+        scores = {}
+
+        def on_batch(batch_scores):
+            # Checkpoint each title as soon as its last variant is in, so an interrupted run keeps its progress
+            scores.update(batch_scores)
+            for variant in batch_scores:
+                for key in titles_by_variant.get(variant, ()):
+                    remaining = waiting.get(key)
+                    if remaining is None:
+                        continue
+                    remaining.discard(variant)
+                    if not remaining:
+                        del waiting[key]
+                        self._record(checkpoint, key, titles[key], 'trend', max(scores[v] for v in variants[key]))
+
+        # One call so Trends payloads go out full and shared variants are fetched once
+        scores.update(self.gauge.trends_analyzer.get_trend_scores(
+            (v for title_variants in variants.values() for v in title_variants), on_batch=on_batch))
+        for key in list(waiting):
+            # Variants in a failed batch have no data yet; leave the title for the next run
+            if all(self.gauge.trends_analyzer.is_fetched(v) for v in variants[key]):
+                self._record(checkpoint, key, titles[key], 'trend', max(scores[v] for v in variants[key]))
+
+    def _gauge_sentiment(self, titles, checkpoint, started_at):
+        pending = {key: title for key, title in titles.items() if checkpoint.get(key, 'sentiment') is None}
+        done = len(titles) - len(pending)
+        started = {}
+
+        def lookup(key, title, media_type, release_date):
+            started[key] = time.time()
+            return self.gauge.lookup_sentiment(title, media_type)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='gauge')
+        futures = {executor.submit(lookup, key, *title): key for key, title in pending.items()}
+        fetched = {}  # key -> lookup waiting to be scored
+        timed_out = []
+        try:
+            while futures:
+                finished, _ = wait(futures, timeout=1, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = futures.pop(future)
+                    try:
+                        fetched[key] = future.result()
+                    except Exception as e:
+                        print(f"Error gauging {key}: {str(e)}")
+                        done += 1
+                        self.progress(done, len(titles), key, time.time() - started_at)
+
+                now = time.time()
+                for future, key in list(futures.items()):
+                    if key in started and now - started[key] > self.title_timeout:
+                        # The thread can't be stopped, but its result is no longer waited for
+                        print(f"Timed out gauging {key} after {self.title_timeout}s")
+                        del futures[future]
+                        timed_out.append(future)
+                        done += 1
+                        self.progress(done, len(titles), key, now - started_at)
+
+                if fetched and (len(fetched) >= self.sentiment_batch or not futures):
+                    done = self._score_sentiment(titles, checkpoint, fetched, done, started_at)
+                    fetched = {}
+        finally:
+            # Timed-out lookups may still be running; let them finish before the analyzer's pools go away
+            unfinished = sum(1 for future in list(futures) + timed_out if future.running())
+            if unfinished:
+                print(f"Waiting for {unfinished} unfinished lookups to stop")
+            executor.shutdown(wait=True, cancel_futures=True)
+            if hasattr(self.gauge.sentiment_analyzer, 'close'):
+                self.gauge.sentiment_analyzer.close()
+
+    def _score_sentiment(self, titles, checkpoint, fetched, done, started_at):
+        try:
+            scores = self.gauge.score_sentiment(list(fetched.values()))
+        except Exception as e:
+            print(f"Error scoring sentiment for {len(fetched)} titles: {str(e)}")
+            scores = [None] * len(fetched)
+        for key, score in zip(fetched, scores):
+            done += 1
+            if score is not None:
+                self._record(checkpoint, key, titles[key], 'sentiment', score)
+            self.progress(done, len(titles), key, time.time() - started_at)
+        return done
+
+    def _record(self, checkpoint, key, title, signal, score):
+        checkpoint.record(key, signal, score)
+        if self.gauge.score_cache is not None:
+            self.gauge.score_cache.set(*title, signal, score)
+
+    def _print_progress(self, done, total, key, elapsed):
+        print(f"[{done}/{total}] {key} ({elapsed:.1f}s elapsed)")
+
 def main(releases):
-    excitement_gauge = ExcitementGauge()
+    gaugeable = []
     for release in releases:
         # Check if 'type' key exists, if not, try to infer from other keys
         if 'type' not in release:
@@ -128,12 +867,9 @@ def main(releases):
             else:
                 print(f"Warning: Unable to determine type for release: {release}")
                 continue  # Skip this release
+        gaugeable.append(release)
 
-        excitement_score = excitement_gauge.gauge_excitement(
-            release.get('title') or release.get('name', 'Unknown Title'), 
-            release['type']
-        )
-        release['excitement_score'] = excitement_score
+    releases = CatalogGaugeRunner().run(gaugeable)
 
     # Sort releases by excitement score
     releases.sort(key=lambda x: x['excitement_score'], reverse=True)
@@ -1,11 +1,22 @@
 import os
+import sqlite3
 import datetime
 from dotenv import load_dotenv
 from collectors.tmdb_collector import TMDBCollector
 from collectors.igdb_collector import IGDBCollector
-from score_calculator import ScoreCalculator
+from collectors.orchestrator import CollectionOrchestrator
+from collectors.sync import SlidingWindowSync
+from score_calculator import ScoreCalculator, IncrementalScoreCalculator
+from utils.dedupe import ReleaseDeduplicator
+from utils.release_store import get_release_store
+from utils.metrics import get_metrics
+from utils.profiling import RequestProfiler
+from utils.release_table import ReleaseTable
+from utils.single_flight import SingleFlight
+from utils.snapshot_cache import SnapshotCache
+import click
 import logging
-from flask import Flask, render_template, request
+from flask import Flask, Response, render_template, request
 
 # Load environment variables
 load_dotenv()
@@ -22,50 +33,161 @@ logging.basicConfig(
 
 app = Flask(__name__)
 
+# Score components survive between refreshes so only changed releases are rescored
+incremental_scorer = IncrementalScoreCalculator()
+release_deduplicator = ReleaseDeduplicator()
+
+def get_date_range(date_range_backward=None, date_range_forward=None):
+    if date_range_backward is None:
+        date_range_backward = int(os.getenv('DATE_RANGE_BACKWARD', 7))
+    if date_range_forward is None:
+        date_range_forward = int(os.getenv('DATE_RANGE_FORWARD', 7))
+
+    today = datetime.datetime.now()
+    start_date = (today - datetime.timedelta(days=date_range_backward)).strftime('%Y-%m-%d')
+    end_date = (today + datetime.timedelta(days=date_range_forward)).strftime('%Y-%m-%d')
+    return start_date, end_date
+
+def fetch_releases(start_date, end_date, release_store=None):
+    """
+    Fetches the whole window from every upstream at once into a
+    ReleaseTable, falling back to the release store when all of them fail.
+    """
+    # Each source fills its own table; the IGDB token request runs inside its own task
+    tmdb_collector = TMDBCollector(start_date, end_date)
+    orchestrator = CollectionOrchestrator({
+        'tmdb_movies': lambda: tmdb_collector.get_movies(ReleaseTable()),
+        'tmdb_tv': lambda: tmdb_collector.get_tv_shows(ReleaseTable()),
+        'igdb_games': lambda: IGDBCollector(start_date, end_date).get_games(ReleaseTable()),
+    })
+    results, failures = orchestrator.collect()
+    if failures and not results:
+        # Serve what we stored last time rather than caching an outage as an empty snapshot
+        stored_releases = release_store.get_window(start_date, end_date) if release_store is not None else []
+        if not stored_releases:
+            raise RuntimeError(f"All release sources failed: {', '.join(failures)}")
+        logging.warning(f'All release sources failed, using {len(stored_releases)} stored releases')
+        return ReleaseTable.from_releases(stored_releases)
+
+    return ReleaseTable.concat(results.values())
+
+def collect_releases(start_date, end_date):
+    """
+    Collects, deduplicates and scores every release in a date window.
+
+    Args:
+        start_date (str): Window start as YYYY-MM-DD.
+        end_date (str): Window end as YYYY-MM-DD.
+
+    Returns:
+        ReleaseTable: Scored releases, unfiltered and unsorted.
+    """
+    metrics = get_metrics()
+    release_store = get_release_store()
+    with metrics.timer('wakeupbabe_stage_seconds', stage='fetch'):
+        if release_store is not None and os.getenv('INCREMENTAL_SYNC', '0') == '1':
+            # Only days new to the window, and recent ones, are fetched; the rest come from the store
+            all_releases = ReleaseTable.from_releases(SlidingWindowSync(release_store).sync(start_date, end_date))
+        else:
+            all_releases = fetch_releases(start_date, end_date, release_store)
+
+    # Deduplicate data, merging near-identical titles a day or so apart
+    with metrics.timer('wakeupbabe_stage_seconds', stage='dedupe'):
+        unique_releases = release_deduplicator.deduplicate_table(all_releases)
+
+    # Calculate excitement scores, reusing components of unchanged releases
+    with metrics.timer('wakeupbabe_stage_seconds', stage='score'):
+        scored_releases = incremental_scorer.calculate_scores_table(unique_releases)
+
+    if release_store is not None:
+        try:
+            with metrics.timer('wakeupbabe_stage_seconds', stage='store'):
+                release_store.upsert_releases(scored_releases)
+        except sqlite3.Error as e:
+            logging.error(f"Error storing releases: {str(e)}")
+    return scored_releases
+
+def filter_releases(releases, score_threshold):
+    # Filter based on score threshold and sort into a new table, without touching the snapshot
+    return ReleaseTable.from_releases(releases).top(score_threshold)
+
+def home_releases(releases):
+    """The rows the home page renders: releases over the threshold, best first."""
+    score_threshold = int(os.getenv('SCORE_THRESHOLD', 70))
+    with get_metrics().timer('wakeupbabe_stage_seconds', stage='filter'):
+        return filter_releases(releases, score_threshold).to_dicts()
+
+# Scored releases per date window, rebuilt in the background by one worker at a time.
+# The home page rows are derived once per snapshot rather than on every page view.
+snapshot_cache = SnapshotCache(collect_releases, single_flight=SingleFlight(), decode=ReleaseTable.from_releases,
+                               view=home_releases)
+
+# Profiles sampled or signed requests; a no-op unless PROFILE_REQUESTS or PROFILE_SECRET is set
+request_profiler = RequestProfiler()
+
+snapshot_refresh_interval = int(os.getenv('SNAPSHOT_REFRESH_INTERVAL', 0))
+if snapshot_refresh_interval > 0:
+    snapshot_cache.start_periodic_refresh(get_date_range, snapshot_refresh_interval)
+
 @app.route('/')
 def home():
+    return request_profiler.run('home', render_home, request.path, request.args.get('profile'))
+
+def render_home():
+    metrics = get_metrics()
+    with metrics.timer('wakeupbabe_http_request_seconds', route='/'):
+        try:
+            start_date, end_date = get_date_range()
+
+            with metrics.timer('wakeupbabe_stage_seconds', stage='snapshot'):
+                wake_up_babes = snapshot_cache.get_view(start_date, end_date)
+
+            with metrics.timer('wakeupbabe_stage_seconds', stage='render'):
+                return render_template('index.html', releases=wake_up_babes)
+
+        except Exception as e:
+            logging.error(f"Error in home route: {str(e)}")
+            return render_template('index.html', releases=[], error="An error occurred while fetching releases.")
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape target; only served when METRICS_ENABLED=1."""
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return Response('Metrics are disabled. Set METRICS_ENABLED=1 to collect them.\n', status=404, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.cli.command('refresh-snapshot')
+def refresh_snapshot():
+    """Rebuilds the release snapshot for the current date window."""
+    start_date, end_date = get_date_range()
+    releases = snapshot_cache.refresh(start_date, end_date)
+    print(f"Refreshed {len(releases)} releases for {start_date} to {end_date}")
+
+@app.cli.command('profile-link')
+@click.option('--path', default='/', help='Route the link is valid for.')
+@click.option('--ttl', default=300, help='Seconds the link stays valid.')
+def profile_link(path, ttl):
+    """Prints a signed query string that profiles requests to a route."""
     try:
-        # Input parameters from environment variables
-        date_range_forward = int(os.getenv('DATE_RANGE_FORWARD', 7))
-        date_range_backward = int(os.getenv('DATE_RANGE_BACKWARD', 7))
-        score_threshold = int(os.getenv('SCORE_THRESHOLD', 70))
-        
-        # Calculate date range
-        today = datetime.datetime.now()
-        start_date = (today - datetime.timedelta(days=date_range_backward)).strftime('%Y-%m-%d')
-        end_date = (today + datetime.timedelta(days=date_range_forward)).strftime('%Y-%m-%d')
-
-        # Initialize collectors with date range
-        tmdb = TMDBCollector(start_date, end_date)
-        igdb = IGDBCollector(start_date, end_date)
-        
-        # Get releases
-        movies = tmdb.get_movies()
-        tv_shows = tmdb.get_tv_shows()
-        games = igdb.get_games()
-        
-        # Combine all releases
-        all_releases = movies + tv_shows + games
-        
-        # Deduplicate releases
-        unique_releases = {(r['title'], r['release_date']): r for r in all_releases}.values()
-        
-        # Calculate excitement scores
-        score_calculator = ScoreCalculator()
-        scored_releases = score_calculator.calculate_scores(unique_releases)
-        
-        # Filter based on score threshold and sort
-        wake_up_babes = [
-            release for release in scored_releases 
-            if release['excitement_score'] >= score_threshold
-        ]
-        wake_up_babes.sort(key=lambda x: x['excitement_score'], reverse=True)
-        
-        return render_template('index.html', releases=wake_up_babes)
-        
-    except Exception as e:
-        logging.error(f"Error in home route: {str(e)}")
-        return render_template('index.html', releases=[], error="An error occurred while fetching releases.")
+        token = request_profiler.sign(path, ttl)
+    except ValueError:
+        print("Set PROFILE_SECRET to sign profiling links.")
+        return
+    print(f"{path}?profile={token}")
+    print(f"Profiles are written to {request_profiler.output_dir} (valid for {ttl}s).")
+
+@app.cli.command('stored-releases')
+def stored_releases():
+    """Prints the current window straight from the local release store."""
+    release_store = get_release_store()
+    if release_store is None:
+        print("The release store is disabled (RELEASE_STORE_PATH is empty).")
+        return
+    start_date, end_date = get_date_range()
+    score_threshold = int(os.getenv('SCORE_THRESHOLD', 70))
+    for release in release_store.get_window(start_date, end_date, min_score=score_threshold):
+        print(f"{release['excitement_score']:>8.2f}  {release['type']:<5}  {release['release_date']}  {release['title']}")
 
 def calculate_excitement_scores(releases):
     """
@@ -85,50 +207,18 @@ def calculate_excitement_scores(releases):
 def main():
     try:
         # Input parameters
-        date_range_forward = int(os.getenv('DATE_RANGE_FORWARD', 7))
-        date_range_backward = int(os.getenv('DATE_RANGE_BACKWARD', 7))
         score_threshold = int(os.getenv('SCORE_THRESHOLD', 70))
-        
-        # Date calculations
-        today = datetime.datetime.now()
-        start_date = (today - datetime.timedelta(days=date_range_backward)).strftime('%Y-%m-%d')
-        end_date = (today + datetime.timedelta(days=date_range_forward)).strftime('%Y-%m-%d')
+        start_date, end_date = get_date_range()
 
-        all_releases = []
+        scored_releases = collect_releases(start_date, end_date)
         
-        # Collect TMDB data
-        try:
-            tmdb_collector = TMDBCollector(start_date, end_date)
-            movies = tmdb_collector.get_movies()
-            tv_shows = tmdb_collector.get_tv_shows()
-            all_releases.extend(movies + tv_shows)
-        except Exception as e:
-            logging.error(f"Error collecting TMDB data: {str(e)}")
-        
-        # Collect IGDB data
-        try:
-            igdb_collector = IGDBCollector(start_date, end_date)
-            games = igdb_collector.get_games()
-            all_releases.extend(games)
-        except Exception as e:
-            logging.error(f"Error collecting IGDB data: {str(e)}")
-        
-        if not all_releases:
+        if not scored_releases:
             print("No releases found. Please check your API credentials and try again.")
             return
         
-        # Deduplicate data
-        unique_releases = { (r['title'], r['release_date']): r for r in all_releases }.values()
-        
-        # Calculate excitement scores
-        score_calculator = ScoreCalculator()
-        scored_releases = score_calculator.calculate_scores(unique_releases)
-        
-        # Filter based on score threshold
-        wake_up_babe_moments = [release for release in scored_releases if release['excitement_score'] >= score_threshold]
-        
-        # Sort by excitement score
-        wake_up_babe_moments.sort(key=lambda x: x['excitement_score'], reverse=True)
+        # Filter based on score threshold and sort by excitement score
+        with get_metrics().timer('wakeupbabe_stage_seconds', stage='filter'):
+            wake_up_babe_moments = filter_releases(scored_releases, score_threshold)
         
         if not wake_up_babe_moments:
             print("\nNo 'Wake Up Babe' moments found that meet the excitement threshold.")
@@ -1,5 +1,11 @@
+import time
 import datetime
 import logging
+import threading
+import numpy as np
+from utils.release_table import MEDIA_TYPES, EPOCH_ORDINAL
+
+TYPE_WEIGHTS = {'movie': 1.2, 'tv': 1.1, 'game': 1.3}
 
 class ScoreCalculator:
     def calculate_scores(self, releases):
@@ -17,6 +23,99 @@ class ScoreCalculator:
             scored_releases.append(release)
         return scored_releases
 
+    def calculate_scores_batch(self, releases):
+        """
+        Vectorized equivalent of calculate_scores for large catalogs.
+
+        The releases are unpacked once into columnar NumPy arrays (epoch days,
+        popularity, ratings, type weight, platform count) and the same formula
+        is evaluated over whole columns, so the results match the scalar path
+        exactly.
+        """
+        logging.info('Calculating excitement scores in batch')
+        releases = list(releases)
+        if not releases:
+            return []
+
+        columns = self._to_columns(releases)
+        scores = self._score_columns(columns, np.datetime64(datetime.datetime.now().date(), 'D'))
+
+        for release, score in zip(releases, scores.tolist()):
+            release['excitement_score'] = round(score, 2)
+        return releases
+
+    def calculate_scores_table(self, table):
+        """
+        Scores a ReleaseTable in place, straight from its columns, and returns
+        it. Results match calculate_scores exactly.
+        """
+        logging.info('Calculating excitement scores for release table')
+        if not len(table):
+            return table
+
+        types = np.array(table.types, dtype=np.intp)
+        game_code = MEDIA_TYPES.code('game')
+        type_weights = np.array([TYPE_WEIGHTS.get(name, 1) for name in MEDIA_TYPES.names])
+        columns = {
+            'release_day': table.column('days').astype('datetime64[D]'),
+            # Missing values count as 0, like release.get(field, 0)
+            'popularity': np.nan_to_num(table.column('popularity')),
+            'rating': np.nan_to_num(table.column('rating')),
+            'total_rating': np.nan_to_num(table.column('total_rating')),
+            'type_weight': type_weights[types],
+            'platform_count': np.array([
+                len(set(platforms or ())) if code == game_code else 0
+                for code, platforms in zip(table.types, table.platforms)
+            ], dtype=float),
+            'is_game': types == game_code,
+        }
+        scores = self._score_columns(columns, np.datetime64(datetime.datetime.now().date(), 'D'))
+        table.set_scores(round(score, 2) for score in scores.tolist())
+        return table
+
+    def _to_columns(self, releases):
+        count = len(releases)
+        popularity = np.empty(count)
+        rating = np.empty(count)
+        total_rating = np.empty(count)
+        type_weight = np.empty(count)
+        platform_count = np.empty(count)
+        is_game = np.empty(count, dtype=bool)
+        release_dates = []
+
+        for i, release in enumerate(releases):
+            media_type = release['type']
+            popularity[i] = release.get('popularity', 0)
+            rating[i] = release.get('rating', 0)
+            total_rating[i] = release.get('total_rating', 0)
+            type_weight[i] = TYPE_WEIGHTS.get(media_type, 1)
+            is_game[i] = media_type == 'game'
+            platform_count[i] = len(set(release.get('platforms', []))) if media_type == 'game' else 0
+            release_dates.append(release['release_date'])
+
+        return {
+            'release_day': np.array(release_dates, dtype='datetime64[D]'),
+            'popularity': popularity,
+            'rating': rating,
+            'total_rating': total_rating,
+            'type_weight': type_weight,
+            'platform_count': platform_count,
+            'is_game': is_game,
+        }
+
+    def _score_columns(self, columns, today):
+        # Games already have a normalized popularity score from the collector
+        base_popularity_score = np.where(
+            columns['is_game'],
+            columns['popularity'],
+            (columns['popularity'] * 0.6) + (columns['rating'] * 0.2) + (columns['total_rating'] * 0.2)
+        )
+        # Whole-day distance, matching timedelta.days against midnight in the scalar path
+        days_difference = np.abs((today - columns['release_day']).astype(np.int64))
+        recency_factor = np.maximum(1 - (days_difference / 30), 0.1)
+        platform_bonus = columns['platform_count'] * 2
+        return (base_popularity_score * recency_factor * columns['type_weight']) + platform_bonus
+
     def _calculate_popularity_score(self, release):
         if release['type'] == 'game':
             # Games already have a normalized popularity score from the collector
@@ -35,11 +134,170 @@ class ScoreCalculator:
         return recency_factor
 
     def _get_type_weight(self, media_type):
-        weights = {'movie': 1.2, 'tv': 1.1, 'game': 1.3}
-        return weights.get(media_type, 1)
+        return TYPE_WEIGHTS.get(media_type, 1)
 
     def _get_platform_bonus(self, release):
         if release['type'] == 'game':
             unique_platforms = len(set(release.get('platforms', [])))
             return unique_platforms * 2  # Each unique platform adds a bonus
-        return 0 
\ No newline at end of file
+        return 0
+
+class IncrementalScoreCalculator(ScoreCalculator):
+    """
+    Scores a catalog across refreshes, recomputing only what changed.
+
+    Each release's score components are kept under a stable key (type plus
+    source ID). A release whose source fields are unchanged reuses its cached
+    score; only new or changed releases go through the full formula. The
+    recency term is the only part that depends on the date, so it is
+    recomputed for every cached release in one NumPy batch when the day rolls
+    over. Releases not seen for evict_after seconds are dropped at rollover.
+
+    Unlike calculate_scores, the input dicts are not modified; scored copies
+    are returned.
+    """
+
+    def __init__(self, evict_after=2 * 86400):
+        self.evict_after = evict_after
+        self._rows = {}  # key -> [fingerprint, base, type_weight, bonus, day, recency, score, last_seen]
+        self._today = None
+        self._lock = threading.Lock()
+        self.last_recomputed = 0
+
+    def calculate_scores(self, releases):
+        logging.info('Calculating excitement scores incrementally')
+        now = time.time()
+        with self._lock:
+            self._roll_over(datetime.date.today().toordinal(), now)
+
+            recomputed = 0
+            scored_releases = []
+            for release in releases:
+                key = self._release_key(release)
+                fingerprint = self._fingerprint(release)
+                row = self._rows.get(key)
+                if row is None or row[0] != fingerprint:
+                    row = self._rows[key] = self._build_row(release, fingerprint)
+                    recomputed += 1
+                row[7] = now
+                scored_releases.append({**release, 'excitement_score': row[6]})
+
+            self.last_recomputed = recomputed
+        logging.info(f'Recomputed {recomputed} of {len(scored_releases)} excitement scores')
+        return scored_releases
+
+    def calculate_scores_table(self, table):
+        """
+        Like calculate_scores, but reads a ReleaseTable's columns directly and
+        writes the scores into its excitement_score column. New and changed
+        rows are scored together in one NumPy batch.
+        """
+        logging.info('Calculating excitement scores incrementally for release table')
+        now = time.time()
+        names = MEDIA_TYPES.names
+        scores = []
+        changed = []  # (position, key, fingerprint)
+        with self._lock:
+            self._roll_over(datetime.date.today().toordinal(), now)
+
+            rows = self._rows
+            columns = zip(table.ids, table.types, table.titles, table.days, table.popularity,
+                          table.rating, table.total_rating, table.platforms)
+            for i, (release_id, code, title, day, popularity, rating, total_rating, platforms) in enumerate(columns):
+                media_type = names[code]
+                key = (media_type, release_id) if release_id is not None else (media_type, title, day)
+                # NaN marks a missing value, which the formula reads as 0 (and NaN never compares equal)
+                fingerprint = (
+                    day,
+                    popularity if popularity == popularity else 0,
+                    rating if rating == rating else 0,
+                    total_rating if total_rating == total_rating else 0,
+                    platforms or (),
+                )
+                row = rows.get(key)
+                if row is None or row[0] != fingerprint:
+                    changed.append((i, key, fingerprint))
+                    scores.append(None)
+                else:
+                    row[7] = now
+                    scores.append(row[6])
+
+            for (i, key, _), row in zip(changed, self._build_rows(changed, now)):
+                rows[key] = row
+                scores[i] = row[6]
+            self.last_recomputed = len(changed)
+        table.set_scores(scores)
+        logging.info(f'Recomputed {len(changed)} of {len(table)} excitement scores')
+        return table
+
+    def _build_rows(self, changed, now):
+        # Vectorized _build_row over table fingerprints (epoch day, popularity, rating, total_rating, platforms)
+        if not changed:
+            return []
+        count = len(changed)
+        is_game = np.fromiter((key[0] == 'game' for _, key, _ in changed), dtype=bool, count=count)
+        type_weight = np.fromiter((TYPE_WEIGHTS.get(key[0], 1) for _, key, _ in changed), dtype=float, count=count)
+        day = np.fromiter((f[0] for _, _, f in changed), dtype=np.int64, count=count) + EPOCH_ORDINAL
+        popularity = np.fromiter((f[1] for _, _, f in changed), dtype=float, count=count)
+        rating = np.fromiter((f[2] for _, _, f in changed), dtype=float, count=count)
+        total_rating = np.fromiter((f[3] for _, _, f in changed), dtype=float, count=count)
+        platform_count = np.fromiter((len(set(f[4])) for _, _, f in changed), dtype=float, count=count)
+
+        base = np.where(is_game, popularity, (popularity * 0.6) + (rating * 0.2) + (total_rating * 0.2))
+        bonus = np.where(is_game, platform_count * 2, 0.0)
+        recency = np.maximum(1 - (np.abs(self._today - day) / 30), 0.1)
+        scores = (base * recency * type_weight) + bonus
+        return [
+            [fingerprint, row_base, row_weight, row_bonus, row_day, row_recency, round(score, 2), now]
+            for (_, _, fingerprint), row_base, row_weight, row_bonus, row_day, row_recency, score in zip(
+                changed, base.tolist(), type_weight.tolist(), bonus.tolist(), day.tolist(), recency.tolist(),
+                scores.tolist())
+        ]
+
+    def _roll_over(self, today, now):
+        if today == self._today:
+            return
+        self._today = today
+
+        for key in [k for k, row in self._rows.items() if now - row[7] > self.evict_after]:
+            del self._rows[key]
+        if not self._rows:
+            return
+
+        # Only the recency term depends on the date; refresh it for every row at once
+        rows = list(self._rows.values())
+        days = np.fromiter((row[4] for row in rows), dtype=np.int64, count=len(rows))
+        base = np.fromiter((row[1] for row in rows), dtype=float, count=len(rows))
+        weight = np.fromiter((row[2] for row in rows), dtype=float, count=len(rows))
+        bonus = np.fromiter((row[3] for row in rows), dtype=float, count=len(rows))
+        recency = np.maximum(1 - (np.abs(today - days) / 30), 0.1)
+        scores = (base * recency * weight) + bonus
+        for row, row_recency, score in zip(rows, recency.tolist(), scores.tolist()):
+            row[5] = row_recency
+            row[6] = round(score, 2)
+
+    def _build_row(self, release, fingerprint):
+        base_popularity_score = self._calculate_popularity_score(release)
+        type_weight = self._get_type_weight(release['type'])
+        platform_bonus = self._get_platform_bonus(release)
+        day = datetime.date.fromisoformat(release['release_date']).toordinal()
+        recency_factor = max(1 - (abs(self._today - day) / 30), 0.1)
+
+        excitement_score = (base_popularity_score * recency_factor * type_weight) + platform_bonus
+        return [fingerprint, base_popularity_score, type_weight, platform_bonus, day,
+                recency_factor, round(excitement_score, 2), 0]
+
+    def _release_key(self, release):
+        if release.get('id') is not None:
+            return (release['type'], release['id'])
+        return (release['type'], release['title'], release['release_date'])
+
+    def _fingerprint(self, release):
+        # Every source field the formula reads
+        return (
+            release['release_date'],
+            release.get('popularity', 0),
+            release.get('rating', 0),
+            release.get('total_rating', 0),
+            tuple(release.get('platforms', ())),
+        )
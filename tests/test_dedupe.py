@@ -0,0 +1,94 @@
+import unittest
+from utils.dedupe import ReleaseDeduplicator, normalize_title
+from utils.release_table import ReleaseTable
+
+class TestNormalizeTitle(unittest.TestCase):
+    def test_case_accents_and_punctuation(self):
+        self.assertEqual(normalize_title('SILENT HILL 2'), 'silent hill 2')
+        self.assertEqual(normalize_title('Pokémon: Legends — Z-A'), 'pokemon legends z a')
+        self.assertEqual(normalize_title('Ratchet & Clank'), 'ratchet and clank')
+        self.assertEqual(normalize_title(None), '')
+
+class TestReleaseDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.deduplicator = ReleaseDeduplicator(threshold=90)
+
+    def test_merges_case_variants(self):
+        releases = [
+            {'title': 'Silent Hill 2', 'release_date': '2024-10-08', 'type': 'game', 'popularity': 10},
+            {'title': 'SILENT HILL 2', 'release_date': '2024-10-08', 'type': 'game', 'popularity': 30},
+        ]
+        unique = self.deduplicator.deduplicate(releases)
+
+        self.assertEqual(len(unique), 1)
+        self.assertEqual(unique[0]['popularity'], 30)
+
+    def test_merges_off_by_one_dates(self):
+        releases = [
+            {'title': 'Dune: Part Two', 'release_date': '2024-03-01', 'type': 'movie'},
+            {'title': 'Dune Part Two', 'release_date': '2024-02-29', 'type': 'movie', 'cover_url': 'x.jpg'},
+        ]
+        unique = self.deduplicator.deduplicate(releases)
+
+        self.assertEqual(len(unique), 1)
+        self.assertEqual(unique[0]['cover_url'], 'x.jpg')
+
+    def test_keeps_distinct_titles_and_dates(self):
+        releases = [
+            {'title': 'Silent Hill 2', 'release_date': '2024-10-08', 'type': 'game'},
+            {'title': 'Silent Hill 2', 'release_date': '2024-10-20', 'type': 'game'},
+            {'title': 'Silent Hill f', 'release_date': '2024-10-08', 'type': 'game'},
+            {'title': 'Alien: Romulus', 'release_date': '2024-10-08', 'type': 'movie'},
+        ]
+        self.assertEqual(len(self.deduplicator.deduplicate(releases)), 4)
+
+    def test_keeps_different_types_apart(self):
+        releases = [
+            {'id': 1, 'title': 'Dune', 'release_date': '2024-03-01', 'type': 'game', 'popularity': 10},
+            {'id': 2, 'title': 'Dune', 'release_date': '2024-03-01', 'type': 'movie', 'popularity': 50},
+            {'id': 3, 'title': 'Silent Hill 2', 'release_date': '2024-10-08', 'type': 'game'},
+            {'id': 4, 'title': 'SILENT HILL 2', 'release_date': '2024-10-09', 'type': 'movie'},
+        ]
+        self.assertEqual(len(self.deduplicator.deduplicate(releases)), 4)
+        table = self.deduplicator.deduplicate_table(ReleaseTable.from_releases(releases))
+        self.assertEqual([release['type'] for release in table], ['game', 'movie', 'game', 'movie'])
+
+    def test_table_matches_dict_deduplication(self):
+        releases = [
+            {'id': 1, 'title': 'Silent Hill 2', 'release_date': '2024-10-08', 'type': 'game', 'popularity': 10,
+             'platforms': ['PC']},
+            {'id': 2, 'title': 'Dune Part Two', 'release_date': '2024-02-29', 'type': 'movie', 'popularity': 50},
+            {'id': 3, 'title': 'SILENT HILL 2', 'release_date': '2024-10-09', 'type': 'game', 'popularity': 30},
+            {'id': 4, 'title': 'Dune: Part Two', 'release_date': '2024-03-01', 'type': 'movie'},
+        ]
+        expected = self.deduplicator.deduplicate(releases)
+        table = self.deduplicator.deduplicate_table(ReleaseTable.from_releases(releases))
+
+        self.assertEqual(table.to_dicts(), expected)
+        self.assertEqual(table[0]['platforms'], ['PC'])
+
+    def test_preserves_first_seen_order(self):
+        releases = [
+            {'title': 'B', 'release_date': '2024-01-01'},
+            {'title': 'A', 'release_date': '2024-01-01'},
+            {'title': 'b', 'release_date': '2024-01-01'},
+        ]
+        titles = [r['title'] for r in self.deduplicator.deduplicate(releases)]
+        self.assertEqual(titles, ['B', 'A'])
+
+    def test_only_compares_within_blocks(self):
+        adjectives = ['Crimson', 'Silent', 'Hollow', 'Broken', 'Golden', 'Frozen', 'Savage', 'Electric', 'Quiet', 'Wicked']
+        nouns = ['Harbor', 'Empire', 'Garden', 'Signal', 'Frontier', 'Orchard', 'Voyage', 'Kingdom', 'Circuit', 'Lantern']
+        releases = [
+            {'title': f'{adjective} {noun}', 'release_date': f'2024-01-{1 + (a * 10 + n) % 28:02d}'}
+            for a, adjective in enumerate(adjectives)
+            for n, noun in enumerate(nouns)
+        ]
+        unique = self.deduplicator.deduplicate(releases)
+
+        self.assertEqual(len(unique), 100)
+        # Naive matching would score 4950 pairs
+        self.assertLess(self.deduplicator.last_comparisons, 500)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,400 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from history.excitement_gauge import (
+    GoogleTrendsAnalyzer, RedditSentimentAnalyzer, LexiconSentimentScorer, TextBlobSentimentScorer,
+    ExcitementGauge, CatalogGaugeRunner, GaugeScoreCache
+)
+
+COMMENTS = [
+    'This looks amazing, I am so excited!',
+    'Honestly the first trailer was boring and the CGI looked cheap.',
+    'Not a bad cast at all',
+    "I don't love it but I'll probably watch it",
+    'The original was a masterpiece, this is really not good',
+    'Very very disappointing. Terrible pacing!!',
+    'meh',
+    'Best game of the year? Maybe. The combat is incredibly fun and the world is beautiful.',
+    'It is not a great port, performance is awful on PC :(',
+    'Day one purchase for me, absolutely loved the demo!',
+    "Can't wait, the director's last film was brilliant",
+    'Who asked for this sequel lol',
+]
+
+def make_trend_req(payloads):
+    class FakeTrendReq:
+        def __init__(self, *args, **kwargs):
+            self.keywords = None
+
+        def build_payload(self, keywords, timeframe):
+            payloads.append(list(keywords))
+            self.keywords = keywords
+
+        def interest_over_time(self):
+            # The anchor holds steady, every other keyword doubles
+            return pd.DataFrame({k: [20, 20] if k == 'anchor' else [10, 20] for k in self.keywords})
+
+    return FakeTrendReq
+
+def make_scaled_trend_req(volumes, payloads):
+    # Like Google Trends: every series is rescaled to 0-100 against the payload's peak and rounded
+    class ScaledTrendReq:
+        def __init__(self, *args, **kwargs):
+            self.keywords = None
+
+        def build_payload(self, keywords, timeframe):
+            payloads.append(list(keywords))
+            self.keywords = keywords
+
+        def interest_over_time(self):
+            peak = max(max(volumes[k]) for k in self.keywords)
+            return pd.DataFrame({k: [round(v / peak * 100) for v in volumes[k]] for k in self.keywords})
+
+    return ScaledTrendReq
+
+# Daily searches: a big anchor term next to two new, low-volume titles that are picking up
+VOLUMES = {
+    'netflix': [500000, 520000, 510000, 505000],
+    'Balatro': [300, 450, 800, 1200],
+    'Shogun': [900, 1100, 1500, 2100],
+}
+
+class TestGoogleTrendsLowVolume(unittest.TestCase):
+    def setUp(self):
+        self.payloads = []
+        patcher = patch('history.excitement_gauge.TrendReq', make_scaled_trend_req(VOLUMES, self.payloads))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_without_anchor_each_title_is_scaled_to_itself(self):
+        analyzer = GoogleTrendsAnalyzer(anchor='', cache_ttl=60, min_interval=0)
+        scores = analyzer.get_trend_scores(['Balatro', 'Shogun'])
+
+        self.assertEqual(self.payloads, [['Balatro'], ['Shogun']])
+        self.assertEqual(scores, {'Balatro': 100, 'Shogun': 100})
+        self.assertIsNone(analyzer.get_relative_interest('Balatro'))
+        self.assertTrue(analyzer.is_fetched('Balatro'))
+
+    def test_titles_dwarfed_by_the_anchor_are_scored_on_their_own(self):
+        analyzer = GoogleTrendsAnalyzer(anchor='netflix', cache_ttl=60, min_interval=0)
+        scores = analyzer.get_trend_scores(['Balatro', 'Shogun'])
+
+        # Next to the anchor both series round to 0s; their growth comes from solo payloads
+        self.assertEqual(self.payloads, [['netflix', 'Balatro', 'Shogun'], ['Balatro'], ['Shogun']])
+        self.assertEqual(scores, {'Balatro': 100, 'Shogun': 100})
+        self.assertLess(analyzer.get_relative_interest('Shogun'), 0.01)
+
+class TestGoogleTrendsAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.payloads = []
+        patcher = patch('history.excitement_gauge.TrendReq', make_trend_req(self.payloads))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.analyzer = GoogleTrendsAnalyzer(anchor='anchor', cache_ttl=60, min_interval=0)
+
+    def test_batches_keywords_with_anchor(self):
+        keywords = [f'Title {i}' for i in range(6)]
+        scores = self.analyzer.get_trend_scores(keywords)
+
+        self.assertEqual(self.payloads, [['anchor'] + keywords[:4], ['anchor'] + keywords[4:]])
+        self.assertEqual(scores, {k: 100 for k in keywords})
+        self.assertAlmostEqual(self.analyzer.get_relative_interest('Title 0'), 0.75)
+
+    def test_cached_and_shared_keywords_are_not_refetched(self):
+        self.analyzer.get_trend_scores(['Dune Part Two', 'Dune Part', 'Part Two'])
+        self.analyzer.get_trend_scores(['Dune Part', 'Dune Part Two', 'Dune'])
+
+        self.assertEqual(self.payloads, [['anchor', 'Dune Part Two', 'Dune Part', 'Part Two'], ['anchor', 'Dune']])
+
+    def test_expired_keywords_are_refetched(self):
+        self.analyzer.cache_ttl = 0
+        self.analyzer.get_trend_score('Dune')
+        self.analyzer.get_trend_score('Dune')
+        self.assertEqual(len(self.payloads), 2)
+
+    def test_reports_each_batch_as_it_arrives(self):
+        self.analyzer.get_trend_scores(['Title 0'])
+        batches = []
+        self.analyzer.get_trend_scores([f'Title {i}' for i in range(6)], on_batch=batches.append)
+
+        self.assertEqual([sorted(batch) for batch in batches],
+                         [['Title 0'], ['Title 1', 'Title 2', 'Title 3', 'Title 4'], ['Title 5']])
+
+    def test_failed_batch_scores_zero_and_retries(self):
+        with patch.object(self.analyzer.pytrends, 'build_payload', side_effect=Exception('429')):
+            self.assertEqual(self.analyzer.get_trend_scores(['Dune']), {'Dune': 0})
+        self.assertEqual(self.analyzer.get_trend_scores(['Dune']), {'Dune': 100})
+
+def make_submission(submission_id, title):
+    submission = MagicMock(id=submission_id, title=title, selftext='', score=100, num_comments=0)
+    submission.comments.list.return_value = [MagicMock(body='This looks great')]
+    return submission
+
+class TestRedditSentimentAnalyzer(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('history.excitement_gauge.praw.Reddit')
+        self.reddit = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.submissions = {'a': make_submission('a', 'Dune Part Two is great'), 'b': make_submission('b', 'Dune trailer')}
+        results = {'Dune Part Two': ['a', 'b'], 'Dune Part': ['a'], 'Part Two': []}
+        self.reddit.subreddit.return_value.search.side_effect = \
+            lambda query, **kwargs: [self.submissions[i] for i in results[query]]
+        self.reddit.submission.side_effect = lambda id: self.submissions[id]
+        self.analyzer = RedditSentimentAnalyzer(max_workers=4, cache_ttl=60)
+        self.addCleanup(self.analyzer.close)
+
+    def test_variants_share_fetched_submissions(self):
+        scores = self.analyzer.get_sentiment_scores(['Dune Part Two', 'Dune Part', 'Part Two'], 'movie')
+
+        self.assertEqual(self.reddit.subreddit.return_value.search.call_count, 3)
+        for submission in self.submissions.values():
+            submission.comments.replace_more.assert_called_once_with(limit=0)
+        self.assertGreater(scores['Dune Part Two'], 0)
+        self.assertEqual(scores['Part Two'], 0)
+
+    def test_searches_every_subreddit(self):
+        self.analyzer.get_sentiment_score('Dune Part', 'game')
+        subreddits = sorted(call.args[0] for call in self.reddit.subreddit.call_args_list)
+        self.assertEqual(subreddits, ['Games', 'gaming'])
+
+    def test_repeated_lookups_hit_the_cache(self):
+        first = self.analyzer.get_sentiment_score('Dune Part Two', 'movie')
+        second = self.analyzer.get_sentiment_score('Dune Part Two', 'movie')
+
+        self.assertEqual(first, second)
+        self.reddit.subreddit.return_value.search.assert_called_once()
+
+    def test_failed_search_scores_zero(self):
+        self.reddit.subreddit.return_value.search.side_effect = Exception('503')
+        self.assertEqual(self.analyzer.get_sentiment_score('Dune', 'movie'), 0)
+
+    def test_lookups_are_scored_in_one_batch(self):
+        self.analyzer.sentiment_scorer = MagicMock()
+        self.analyzer.sentiment_scorer.score.side_effect = lambda texts: [0.5] * len(texts)
+        lookups = [self.analyzer.lookup(['Dune Part Two'], 'movie'), self.analyzer.lookup(['Dune Part'], 'movie')]
+
+        scores = self.analyzer.score_lookups(lookups)
+
+        # Posts a and b, each with one comment; a was found by both lookups but is scored once
+        self.analyzer.sentiment_scorer.score.assert_called_once()
+        self.assertEqual(len(self.analyzer.sentiment_scorer.score.call_args.args[0]), 4)
+        self.assertEqual([list(s) for s in scores], [['Dune Part Two'], ['Dune Part']])
+        self.assertEqual(scores[1]['Dune Part'], self.analyzer.get_sentiment_score('Dune Part', 'movie'))
+
+    @patch('history.excitement_gauge.praw.Reddit')
+    def test_concurrent_callers_share_capped_pool_with_a_client_per_thread(self, reddit_class):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+        foreign_calls = []
+
+        def search(query, **kwargs):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.02)
+            with lock:
+                state['running'] -= 1
+            return []
+
+        def new_client(**kwargs):
+            owner = threading.get_ident()
+            client = MagicMock()
+
+            def subreddit(name):
+                if threading.get_ident() != owner:
+                    foreign_calls.append(name)
+                return MagicMock(search=MagicMock(side_effect=search))
+            client.subreddit.side_effect = subreddit
+            return client
+
+        reddit_class.side_effect = new_client
+        analyzer = RedditSentimentAnalyzer(max_workers=2, cache_ttl=60)
+        self.addCleanup(analyzer.close)
+
+        callers = [threading.Thread(target=analyzer.get_sentiment_scores, args=([f'Title {i}', f'Other {i}'], 'game'))
+                   for i in range(4)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+
+        self.assertEqual(state['peak'], 2)
+        self.assertEqual(reddit_class.call_count, 2)
+        self.assertEqual(foreign_calls, [])
+
+class TestLexiconSentimentScorer(unittest.TestCase):
+    def test_drift_from_textblob_is_small(self):
+        scores = LexiconSentimentScorer().score(COMMENTS)
+        reference = TextBlobSentimentScorer().score(COMMENTS)
+
+        drift = [abs(a - b) for a, b in zip(scores, reference)]
+        self.assertLess(sum(drift) / len(drift), 0.02)
+        self.assertLess(max(drift), 0.1)
+
+    def test_repeated_texts_are_memoized(self):
+        scorer = LexiconSentimentScorer(memo_size=100)
+        with patch('history.excitement_gauge._polarities', side_effect=lambda texts: [0.5] * len(texts)) as polarities:
+            self.assertEqual(scorer.score(['good', 'good', 'bad']), [0.5, 0.5, 0.5])
+            scorer.score(['bad', 'fine'])
+
+        self.assertEqual([call.args[0] for call in polarities.call_args_list], [['good', 'bad'], ['fine']])
+
+    def test_process_pool_matches_inline_scoring(self):
+        scorer = LexiconSentimentScorer(processes=2, parallel_threshold=1)
+        self.addCleanup(scorer.close)
+        self.assertEqual(scorer.score(COMMENTS), LexiconSentimentScorer().score(COMMENTS))
+
+class TestCatalogGaugeRunner(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.checkpoint_path = os.path.join(tmp_dir, 'checkpoint.json')
+
+        self.trends = MagicMock()
+        self.trends.get_trend_scores.side_effect = lambda keywords, on_batch=None: {k: 50 for k in keywords}
+        self.trends.is_fetched.return_value = True
+        self.sentiment = MagicMock()
+        self.sentiment.lookup.side_effect = lambda titles, media_type: {t: [] for t in titles}
+        self.sentiment.score_lookups.side_effect = lambda lookups: [{t: 75 for t in lookup} for lookup in lookups]
+        self.gauge = ExcitementGauge(trends_analyzer=self.trends, sentiment_analyzer=self.sentiment)
+
+        self.releases = [
+            {'title': 'Dune Part Two', 'type': 'movie'},
+            {'title': 'Shogun', 'type': 'tv'},
+            {'title': 'Balatro', 'type': 'game'},
+        ]
+
+    def make_runner(self, **kwargs):
+        return CatalogGaugeRunner(gauge=self.gauge, max_workers=4, checkpoint_path=self.checkpoint_path,
+                                  progress=MagicMock(), **kwargs)
+
+    def test_gauges_every_release(self):
+        runner = self.make_runner(title_timeout=10)
+        gauged = runner.run(self.releases)
+
+        self.assertEqual([r['excitement_score'] for r in gauged], [60, 60, 60])
+        self.assertEqual(runner.progress.call_count, 3)
+        self.trends.get_trend_scores.assert_called_once()
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_trend_scores_are_checkpointed_per_batch(self):
+        dune = set(self.gauge.generate_title_variants('Dune Part Two'))
+
+        def interrupted(keywords, on_batch=None):
+            # The first payload comes back, then the run is interrupted
+            on_batch({k: 50 for k in keywords if k in dune})
+            raise KeyboardInterrupt
+
+        self.trends.get_trend_scores.side_effect = interrupted
+        with self.assertRaises(KeyboardInterrupt):
+            self.make_runner(title_timeout=10).run(self.releases)
+
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        self.assertEqual(checkpoint['movie|Dune Part Two']['trend'], 50)
+        self.assertNotIn('trend', checkpoint.get('tv|Shogun', {}))
+
+    def test_sentiment_is_scored_in_one_batch_across_titles(self):
+        gauged = self.make_runner(title_timeout=10).run(self.releases)
+
+        self.assertEqual(len(gauged), 3)
+        self.sentiment.score_lookups.assert_called_once()
+        lookups = self.sentiment.score_lookups.call_args.args[0]
+        self.assertEqual(sorted(title for lookup in lookups for title in lookup),
+                         sorted(['Dune Part Two', 'Part Two', 'Dune Part', 'Shogun', 'Balatro']))
+
+    def test_timed_out_titles_are_resumed(self):
+        def slow_for_shogun(titles, media_type):
+            if 'Shogun' in titles:
+                time.sleep(1.5)
+            return {t: [] for t in titles}
+
+        self.sentiment.lookup.side_effect = slow_for_shogun
+        gauged = self.make_runner(title_timeout=0.2).run(self.releases)
+
+        self.assertEqual([r['title'] for r in gauged], ['Dune Part Two', 'Balatro'])
+        self.assertTrue(os.path.exists(self.checkpoint_path))
+
+        self.sentiment.lookup.reset_mock()
+        self.sentiment.lookup.side_effect = lambda titles, media_type: {t: [] for t in titles}
+        gauged = self.make_runner(title_timeout=10).run(self.releases)
+
+        self.assertEqual(len(gauged), 3)
+        self.sentiment.lookup.assert_called_once_with(['Shogun'], 'tv')
+
+    def test_scorer_closed_after_timed_out_lookups_finish(self):
+        events = []
+
+        def slow_for_shogun(titles, media_type):
+            if 'Shogun' in titles:
+                time.sleep(1.5)
+                events.append('scored')
+            return {t: [] for t in titles}
+
+        self.sentiment.lookup.side_effect = slow_for_shogun
+        self.sentiment.close.side_effect = lambda: events.append('closed')
+        gauged = self.make_runner(title_timeout=0.2).run(self.releases)
+
+        self.assertEqual(len(gauged), 2)
+        self.assertEqual(events, ['scored', 'closed'])
+
+class TestGaugeScoreCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = GaugeScoreCache(':memory:', ttls={'trend': 60, 'sentiment': 3600}, max_entries=3)
+
+    def test_keys_use_normalized_titles(self):
+        self.cache.set('Silent Hill 2', 'game', '2024-10-08', 'trend', 42)
+
+        self.assertEqual(self.cache.get('SILENT HILL 2!', 'game', '2024-10-08', 'trend'), 42)
+        self.assertIsNone(self.cache.get('Silent Hill 2', 'game', '2024-10-09', 'trend'))
+        self.assertIsNone(self.cache.get('Silent Hill 2', 'movie', '2024-10-08', 'trend'))
+        self.assertIsNone(self.cache.get('Silent Hill 2', 'game', '2024-10-08', 'sentiment'))
+
+    def test_each_signal_has_its_own_ttl(self):
+        self.cache.set('Dune', 'movie', '2024-03-01', 'trend', 10)
+        self.cache.set('Dune', 'movie', '2024-03-01', 'sentiment', 20)
+        self.cache._conn.execute('UPDATE scores SET stored_at = ?', (time.time() - 120,))
+
+        self.assertIsNone(self.cache.get('Dune', 'movie', '2024-03-01', 'trend'))
+        self.assertEqual(self.cache.get('Dune', 'movie', '2024-03-01', 'sentiment'), 20)
+        self.assertEqual(self.cache.stats['trend']['stale'], 1)
+        self.assertEqual(self.cache.hit_rate('sentiment'), 1.0)
+        self.assertEqual(self.cache.hit_rate(), 0.5)
+
+    def test_evicts_least_recently_used(self):
+        for i, title in enumerate(['A', 'B', 'C']):
+            self.cache.set(title, 'movie', '2024-01-01', 'trend', i)
+            self.cache._conn.execute('UPDATE scores SET accessed_at = ? WHERE title = ?', (i, title.lower()))
+        self.cache.get('A', 'movie', '2024-01-01', 'trend')
+        self.cache.set('D', 'movie', '2024-01-01', 'trend', 3)
+
+        self.assertIsNone(self.cache.get('B', 'movie', '2024-01-01', 'trend'))
+        self.assertEqual(self.cache.get('A', 'movie', '2024-01-01', 'trend'), 0)
+
+    def test_runner_only_gauges_uncached_titles(self):
+        trends = MagicMock()
+        trends.get_trend_scores.side_effect = lambda keywords, on_batch=None: {k: 50 for k in keywords}
+        sentiment = MagicMock()
+        sentiment.lookup.side_effect = lambda titles, media_type: {t: [] for t in titles}
+        sentiment.score_lookups.side_effect = lambda lookups: [{t: 75 for t in lookup} for lookup in lookups]
+        gauge = ExcitementGauge(trends_analyzer=trends, sentiment_analyzer=sentiment, score_cache=self.cache)
+        self.cache.set('Dune', 'movie', '2024-03-01', 'trend', 10)
+        self.cache.set('Dune', 'movie', '2024-03-01', 'sentiment', 20)
+
+        releases = [{'title': 'Dune', 'type': 'movie', 'release_date': '2024-03-01'},
+                    {'title': 'Shogun', 'type': 'tv', 'release_date': '2024-02-27'}]
+        CatalogGaugeRunner(gauge=gauge, checkpoint_path=None, progress=MagicMock()).run(releases)
+
+        self.assertEqual(releases[0]['excitement_score'], 14)
+        sentiment.lookup.assert_called_once_with(['Shogun'], 'tv')
+        self.assertEqual(self.cache.get('Shogun', 'tv', '2024-02-27', 'sentiment'), 75)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import requests
+from utils.http_cache import ResponseCache, CachingAdapter
+
+class TestCachingAdapter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = ResponseCache(os.path.join(self.tmpdir, 'cache.sqlite'), ttl=60, max_entries=2)
+        self.session = requests.Session()
+        self.session.mount('https://', CachingAdapter(self.cache))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _response(self, request, status=200, body=b'{"results": []}', headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.headers = requests.structures.CaseInsensitiveDict(headers or {'Content-Type': 'application/json'})
+        response._content = body
+        response.request = request
+        response.url = request.url
+        return response
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_fresh_response_served_from_cache(self, mock_send):
+        mock_send.side_effect = lambda request, **kwargs: self._response(request)
+
+        first = self.session.get('https://api.example.com/discover/movie', params={'page': 1})
+        second = self.session.get('https://api.example.com/discover/movie', params={'page': 1})
+
+        self.assertEqual(mock_send.call_count, 1)
+        self.assertEqual(second.json(), {'results': []})
+        self.assertTrue(second.from_cache)
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(self.cache.stats['misses'], 1)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_params_and_body_are_part_of_the_key(self, mock_send):
+        mock_send.side_effect = lambda request, **kwargs: self._response(request)
+
+        self.session.get('https://api.example.com/discover/movie', params={'page': 1})
+        self.session.get('https://api.example.com/discover/movie', params={'page': 2})
+        self.session.post('https://api.example.com/games', data='fields name;')
+        self.session.post('https://api.example.com/games', data='fields name; offset 500;')
+
+        self.assertEqual(mock_send.call_count, 4)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_stale_entry_is_revalidated_with_etag(self, mock_send):
+        mock_send.side_effect = lambda request, **kwargs: self._response(request, headers={'ETag': '"v1"'})
+        self.session.get('https://api.example.com/discover/movie')
+
+        self.cache.ttl = 0
+        mock_send.side_effect = lambda request, **kwargs: self._response(request, status=304, body=b'')
+        response = self.session.get('https://api.example.com/discover/movie')
+
+        self.assertEqual(mock_send.call_args[0][0].headers['If-None-Match'], '"v1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'results': []})
+        self.assertEqual(self.cache.stats['revalidated'], 1)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_stale_entry_served_when_offline(self, mock_send):
+        mock_send.side_effect = lambda request, **kwargs: self._response(request)
+        self.session.get('https://api.example.com/discover/movie')
+
+        self.cache.ttl = 0
+        mock_send.side_effect = requests.exceptions.ConnectionError('offline')
+        response = self.session.get('https://api.example.com/discover/movie')
+
+        self.assertEqual(response.json(), {'results': []})
+        self.assertEqual(self.cache.stats['stale'], 1)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_errors_are_not_cached(self, mock_send):
+        mock_send.side_effect = lambda request, **kwargs: self._response(request, status=500)
+
+        self.session.get('https://api.example.com/discover/movie')
+        self.session.get('https://api.example.com/discover/movie')
+        self.assertEqual(mock_send.call_count, 2)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    def test_least_recently_used_entry_is_evicted(self, mock_send):
+        mock_send.side_effect = lambda request, **kwargs: self._response(request)
+
+        self.session.get('https://api.example.com/a')
+        self.session.get('https://api.example.com/b')
+        self.session.get('https://api.example.com/a')
+        self.session.get('https://api.example.com/c')
+        self.session.get('https://api.example.com/a')
+        self.assertEqual(mock_send.call_count, 3)
+
+        self.session.get('https://api.example.com/b')
+        self.assertEqual(mock_send.call_count, 4)
+
+    def test_default_ttl_follows_the_snapshot_ttl(self):
+        env = {key: value for key, value in os.environ.items() if key not in ('HTTP_CACHE_TTL', 'SNAPSHOT_TTL')}
+        with patch.dict(os.environ, env, clear=True):
+            self.assertEqual(ResponseCache(':memory:').ttl, 900)
+            os.environ['SNAPSHOT_TTL'] = '300'
+            self.assertEqual(ResponseCache(':memory:').ttl, 300)
+            os.environ['HTTP_CACHE_TTL'] = '60'
+            self.assertEqual(ResponseCache(':memory:').ttl, 60)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from collectors.igdb_collector import IGDBCollector
+from utils.release_table import ReleaseTable
 from datetime import datetime
+import os
+import re
+import requests
 
 class TestIGDBCollector(unittest.TestCase):
     def setUp(self):
@@ -65,5 +69,111 @@ class TestIGDBCollector(unittest.TestCase):
         self.assertIsNotNone(formatted['release_date'])
         self.assertEqual(formatted['popularity'], 100)
 
+class TestIGDBBulkFetch(unittest.TestCase):
+    def setUp(self):
+        env = {'IGDB_CLIENT_ID': 'dummy_id', 'IGDB_CLIENT_SECRET': 'dummy_secret', 'IGDB_SHARD_DAYS': '7'}
+        with patch.dict(os.environ, env), \
+                patch.object(IGDBCollector, 'get_access_token', return_value='dummy_token'):
+            self.collector = IGDBCollector('2024-01-01', '2024-01-29')
+        self.collector.session = MagicMock()
+
+    def _game(self, game_id, timestamp):
+        return {'id': game_id, 'name': f'Game {game_id}', 'first_release_date': timestamp}
+
+    def _serve(self, page_for):
+        # Answers each named sub-query of a multiquery body with page_for(query, offset)
+        def post(url, headers, data):
+            self.assertTrue(url.endswith('/multiquery'))
+            response = MagicMock()
+            response.json.return_value = [
+                {'name': name, 'result': page_for(query, int(re.search(r'offset (\d+);', query).group(1)))}
+                for name, query in re.findall(r'query games "(.*?)" \{(.*?)\};', data, re.S)
+            ]
+            return response
+        self.collector.session.post.side_effect = post
+
+    def test_date_shards_cover_window_once(self):
+        shards = self.collector._date_shards()
+
+        self.assertEqual(len(shards), 4)
+        self.assertIn(f'first_release_date >= {self.collector.start_date} ', shards[0])
+        self.assertTrue(shards[-1].endswith(f'first_release_date <= {self.collector.end_date}'))
+
+    @patch('collectors.igdb_collector.IGDB_PAGE_LIMIT', 2)
+    def test_pages_each_shard_with_offset_and_merges_in_date_order(self):
+        start = self.collector.start_date
+        self.collector.shard_days = 28
+        pages = {
+            0: [self._game(1, start + 300), self._game(2, start + 100)],
+            2: [self._game(3, start + 200)],
+        }
+        self._serve(lambda query, offset: pages[offset])
+
+        games = self.collector.get_games_bulk()
+
+        self.assertEqual([g['title'] for g in games], ['Game 2', 'Game 3', 'Game 1'])
+        self.assertEqual(self.collector.session.post.call_count, 2)
+
+    def test_shards_share_one_multiquery_request(self):
+        start = self.collector.start_date
+        self._serve(lambda query, offset: [self._game(int(query.split('>= ')[1].split(' ')[0]), start)])
+
+        games = self.collector.get_games_bulk()
+
+        self.assertEqual(self.collector.session.post.call_count, 1)
+        self.assertEqual(len(games), 4)
+
+    def test_appends_to_release_table(self):
+        start = self.collector.start_date
+        self._serve(lambda query, offset: [self._game(1, start)] if 'offset 0;' in query else [])
+
+        games = self.collector.get_games_bulk()
+        table = self.collector.get_games_bulk(ReleaseTable())
+
+        self.assertEqual(table.to_dicts(), [{k: v for k, v in g.items() if v is not None} for g in games])
+
+    def test_overlapping_rows_are_merged(self):
+        start = self.collector.start_date
+        self._serve(lambda query, offset: [self._game(1, start)])
+
+        games = self.collector.get_games_bulk()
+        self.assertEqual(len(games), 1)
+
+    def test_multiquery_batches_ten_per_request(self):
+        self._serve(lambda query, offset: [])
+        queries = {f'q{i}': ('games', 'fields name; limit 1; offset 0;') for i in range(23)}
+
+        results = self.collector.multiquery(queries)
+
+        self.assertEqual(self.collector.session.post.call_count, 3)
+        self.assertEqual(sorted(results), sorted(queries))
+
+    def test_failed_batch_is_left_out(self):
+        self.collector.session.post.side_effect = requests.exceptions.HTTPError('500 Server Error')
+
+        results = self.collector.multiquery({'q0': ('games', 'fields name; limit 1; offset 0;')})
+        self.assertEqual(results, {})
+
+    def test_failed_shard_raises(self):
+        self.collector.session.post.side_effect = requests.exceptions.HTTPError('500 Server Error')
+
+        with self.assertRaises(RuntimeError):
+            self.collector.get_games_bulk()
+
+    @patch('collectors.igdb_collector.IGDB_PAGE_LIMIT', 2)
+    def test_failed_later_page_raises_after_other_shards_finish(self):
+        start = self.collector.start_date
+        served = []
+        def page_for(query, offset):
+            if offset:
+                raise requests.exceptions.HTTPError('500 Server Error')
+            served.append(query)
+            return [self._game(len(served) * 2, start), self._game(len(served) * 2 + 1, start)]
+        self._serve(page_for)
+
+        with self.assertRaises(RuntimeError):
+            self.collector.get_games_bulk()
+        self.assertEqual(len(served), 4)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+import threading
+from unittest.mock import patch
+from werkzeug.serving import make_server
+from werkzeug.wrappers import Response
+from benchmarks.load_test import LoadGenerator, StageTimer, stage_breakdown, run
+
+class TestLoadGenerator(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+        def app(environ, start_response):
+            with self.lock:
+                self.calls += 1
+                status = 500 if self.calls % 3 == 0 else 200
+            return Response('ok', status=status)(environ, start_response)
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+
+    def test_reports_throughput_latency_and_errors(self):
+        result = LoadGenerator(f'http://127.0.0.1:{self.server.server_port}/').run(concurrency=2, duration=0.3)
+
+        self.assertEqual(result['requests'], self.calls)
+        self.assertEqual(result['errors']['HTTP 500'], self.calls // 3)
+        self.assertGreater(result['throughput'], 0)
+        self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+
+class TestStageTimer(unittest.TestCase):
+    def test_breakdown_covers_only_the_measured_run(self):
+        timer = StageTimer()
+        render = timer.wrap('render', lambda: None)
+        render()
+        before = timer.snapshot()
+        render()
+        render()
+
+        breakdown = stage_breakdown(before, timer.snapshot(), requests_served=2)
+        self.assertEqual(breakdown['render']['calls'], 2)
+        self.assertEqual(set(breakdown), {'render'})
+
+class TestLoadTestRun(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_runs_the_app_against_stubbed_collectors(self):
+        options = {'host': '127.0.0.1', 'port': 0, 'stages': True, 'catalog_size': 60, 'cassette': None}
+        env = {'RELEASE_STORE_PATH': '', 'SINGLE_FLIGHT_DIR': self.tmpdir, 'SCORE_THRESHOLD': '0'}
+        with patch.dict(os.environ, env):
+            results = run(options, [2], duration=0.5, warmup=0.2, progress=False)
+
+        self.assertEqual(results[0]['errors'], {})
+        self.assertGreater(results[0]['requests'], 0)
+        self.assertEqual(results[0]['stages']['render']['calls'], results[0]['requests'])
+
+    def test_stub_run_keeps_out_of_the_default_store_and_cache(self):
+        if os.path.exists('releases.sqlite') or os.path.exists('.http_cache.sqlite'):
+            self.skipTest('A local release store or response cache already exists')
+        options = {'host': '127.0.0.1', 'port': 0, 'stages': False, 'catalog_size': 30, 'cassette': None}
+        env = {key: value for key, value in os.environ.items()
+               if key not in ('RELEASE_STORE_PATH', 'HTTP_CACHE_PATH', 'SINGLE_FLIGHT_DIR')}
+        with patch.dict(os.environ, env, clear=True):
+            results = run(options, [1], duration=0.2, warmup=0.1, progress=False)
+
+        self.assertEqual(results[0]['errors'], {})
+        self.assertFalse(os.path.exists('releases.sqlite'))
+        self.assertFalse(os.path.exists('.http_cache.sqlite'))
+
+    def test_incremental_sync_needs_a_cassette(self):
+        options = {'host': '127.0.0.1', 'port': 0, 'stages': False, 'catalog_size': 30, 'cassette': None}
+        with patch.dict(os.environ, {'INCREMENTAL_SYNC': '1'}), self.assertRaises(ValueError):
+            run(options, [1], duration=0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from utils.metrics import MetricsRegistry
+from utils.scheduler import RequestScheduler
+from utils.snapshot_cache import SnapshotCache
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_disabled_registry_records_nothing(self):
+        metrics = MetricsRegistry(enabled=False)
+        metrics.inc('wakeupbabe_upstream_requests_total', host='api.igdb.com', status=200)
+        with metrics.timer('wakeupbabe_stage_seconds', stage='render'):
+            pass
+
+        self.assertIs(metrics.timer('a'), metrics.timer('b'))
+        self.assertEqual(metrics.value('wakeupbabe_upstream_requests_total', host='api.igdb.com', status=200), 0)
+        self.assertEqual(metrics.render(), '\n')
+
+    def test_renders_counters_in_prometheus_format(self):
+        metrics = MetricsRegistry(enabled=True)
+        metrics.inc('wakeupbabe_upstream_requests_total', host='api.igdb.com', status=200)
+        metrics.inc('wakeupbabe_upstream_requests_total', host='api.igdb.com', status=200)
+        metrics.inc('wakeupbabe_cache_lookups_total', cache='http', outcome='say "hi"')
+
+        text = metrics.render()
+        self.assertIn('# TYPE wakeupbabe_upstream_requests_total counter', text)
+        self.assertIn('wakeupbabe_upstream_requests_total{host="api.igdb.com",status="200"} 2', text)
+        self.assertIn('outcome="say \\"hi\\""', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = MetricsRegistry(enabled=True, buckets=(0.1, 1))
+        metrics.observe('wakeupbabe_stage_seconds', 0.05, stage='render')
+        metrics.observe('wakeupbabe_stage_seconds', 0.5, stage='render')
+        metrics.observe('wakeupbabe_stage_seconds', 5, stage='render')
+
+        text = metrics.render()
+        self.assertIn('wakeupbabe_stage_seconds_bucket{stage="render",le="0.1"} 1', text)
+        self.assertIn('wakeupbabe_stage_seconds_bucket{stage="render",le="1"} 2', text)
+        self.assertIn('wakeupbabe_stage_seconds_bucket{stage="render",le="+Inf"} 3', text)
+        self.assertIn('wakeupbabe_stage_seconds_sum{stage="render"} 5.55', text)
+        self.assertIn('wakeupbabe_stage_seconds_count{stage="render"} 3', text)
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry(enabled=True)
+
+    @patch('utils.scheduler.time.sleep')
+    def test_scheduler_counts_attempts_and_retries(self, mock_sleep):
+        responses = [MagicMock(status_code=429, headers={}), MagicMock(status_code=200, headers={})]
+        scheduler = RequestScheduler(host_rates={'api.example.com': 1000}, max_retries=3)
+
+        with patch('utils.scheduler.get_metrics', return_value=self.metrics):
+            scheduler.send('api.example.com', MagicMock(side_effect=responses))
+
+        self.assertEqual(self.metrics.value('wakeupbabe_upstream_requests_total', host='api.example.com', status=429), 1)
+        self.assertEqual(self.metrics.value('wakeupbabe_upstream_requests_total', host='api.example.com', status=200), 1)
+        self.assertEqual(self.metrics.value('wakeupbabe_upstream_retries_total', host='api.example.com', status=429), 1)
+        self.assertEqual(self.metrics.value('wakeupbabe_upstream_request_seconds', host='api.example.com')[1], 2)
+
+    def test_snapshot_cache_counts_hits_and_misses(self):
+        cache = SnapshotCache(MagicMock(return_value=[]), ttl=60, stale_ttl=60)
+
+        with patch('utils.snapshot_cache.get_metrics', return_value=self.metrics):
+            cache.get('2024-01-01', '2024-01-07')
+            cache.get('2024-01-01', '2024-01-07')
+
+        self.assertEqual(self.metrics.value('wakeupbabe_cache_lookups_total', cache='snapshot', outcome='misses'), 1)
+        self.assertEqual(self.metrics.value('wakeupbabe_cache_lookups_total', cache='snapshot', outcome='hits'), 1)
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        import main
+        self.main = main
+        self.client = main.app.test_client()
+
+    def test_not_served_when_disabled(self):
+        with patch('main.get_metrics', return_value=MetricsRegistry(enabled=False)):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    def test_home_stages_are_exported(self):
+        metrics = MetricsRegistry(enabled=True)
+        releases = [{'title': 'Test Movie', 'type': 'movie', 'release_date': '2024-01-01', 'excitement_score': 90}]
+        with patch('main.get_metrics', return_value=metrics), \
+                patch.object(self.main.snapshot_cache, 'get', return_value=releases):
+            self.assertIn(b'Test Movie', self.client.get('/').data)
+            response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        for stage in ('snapshot', 'filter', 'render'):
+            self.assertIn(f'wakeupbabe_stage_seconds_count{{stage="{stage}"}} 1', response.get_data(as_text=True))
+        self.assertIn('wakeupbabe_http_request_seconds_count{route="/"} 1', response.get_data(as_text=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import time
+import unittest
+from unittest.mock import patch
+from collectors.orchestrator import CollectionOrchestrator
+from utils.metrics import MetricsRegistry
+
+class TestCollectionOrchestrator(unittest.TestCase):
+    def test_sources_run_concurrently(self):
+        def slow(name):
+            def source():
+                time.sleep(0.2)
+                return [{'title': name}]
+            return source
+
+        orchestrator = CollectionOrchestrator({
+            'movies': slow('movie'),
+            'tv': slow('tv'),
+            'games': slow('game'),
+        }, timeout=5)
+
+        started = time.monotonic()
+        results, failures = orchestrator.collect()
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(list(results), ['movies', 'tv', 'games'])
+        self.assertEqual(failures, {})
+        self.assertLess(elapsed, 0.5)
+
+    def test_failed_source_returns_partial_results(self):
+        def broken():
+            raise ValueError('API Error')
+
+        orchestrator = CollectionOrchestrator({
+            'movies': lambda: [{'title': 'Test Movie'}],
+            'games': broken,
+        })
+        results, failures = orchestrator.collect()
+
+        self.assertEqual(results, {'movies': [{'title': 'Test Movie'}]})
+        self.assertIn('API Error', failures['games'])
+
+    def test_late_source_times_out(self):
+        orchestrator = CollectionOrchestrator({
+            'movies': lambda: [{'title': 'Test Movie'}],
+            'games': lambda: time.sleep(1) or [],
+        }, timeout=5, timeouts={'games': 0.1})
+
+        started = time.monotonic()
+        results, failures = orchestrator.collect()
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertIn('movies', results)
+        self.assertIn('timed out', failures['games'])
+
+    def test_metrics_use_metric_names(self):
+        def broken():
+            raise ValueError('API Error')
+
+        metrics = MetricsRegistry(enabled=True)
+        orchestrator = CollectionOrchestrator({
+            'igdb|2024-01-01|2024-01-07': broken,
+            'igdb|2024-01-09|2024-01-09': lambda: [],
+        }, metric_names={'igdb|2024-01-01|2024-01-07': 'igdb', 'igdb|2024-01-09|2024-01-09': 'igdb'})
+        with patch('collectors.orchestrator.get_metrics', return_value=metrics):
+            orchestrator.collect()
+
+        self.assertEqual(metrics.value('wakeupbabe_collector_failures_total', collector='igdb', reason='error'), 1)
+        self.assertEqual(metrics.value('wakeupbabe_collector_seconds', collector='igdb')[1], 2)
+        self.assertNotIn('2024-01', metrics.render())
+
+if __name__ == '__main__':
+    unittest.main()
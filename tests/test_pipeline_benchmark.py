@@ -0,0 +1,56 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import datetime
+from benchmarks.pipeline_benchmark import load_fixtures, replay, compare, compare_paths, main
+
+class TestReplay(unittest.TestCase):
+    def test_copies_get_new_ids_titles_and_window_dates(self):
+        movies = load_fixtures()['tmdb_movies']['results']
+        replayed = replay(movies, 3 * len(movies), 'title', 'release_date')
+        today = datetime.date.today()
+
+        self.assertEqual(len({movie['id'] for movie in replayed}), len(replayed))
+        self.assertEqual(len({movie['title'] for movie in replayed}), len(replayed))
+        self.assertEqual(replayed[0]['title'], movies[0]['title'])
+        for movie in replayed:
+            days = (datetime.date.fromisoformat(movie['release_date']) - today).days
+            self.assertLessEqual(abs(days), 7)
+
+class TestPipelineBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.results_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.results_dir)
+
+    def test_writes_every_stage_and_size(self):
+        output = os.path.join(self.results_dir, 'run.json')
+        self.assertEqual(main(['--sizes', '30', '60', '--repeat', '1', '--output', output]), 0)
+
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(results['sizes'], [30, 60])
+        for stage in ('tmdb_parse', 'igdb_parse', 'dedupe_table', 'incremental_scores_table',
+                      'incremental_scores_table_warm', 'filter_export', 'pipeline', 'excitement_score', 'render',
+                      'dedupe', 'calculate_scores', 'incremental_scores', 'filter_dicts', 'pipeline_dicts'):
+            self.assertEqual(set(results['results'][stage]), {'30', '60'})
+
+    def test_compare_flags_slower_stages(self):
+        baseline = {'results': {'dedupe': {'100': {'seconds': 1.0}}, 'render': {'100': {'seconds': 1.0}}}}
+        current = {'results': {'dedupe': {'100': {'seconds': 1.5}}, 'render': {'100': {'seconds': 1.05}}}}
+
+        self.assertEqual(compare(current, baseline, tolerance=0.1), [('dedupe', 100)])
+
+    def test_compare_paths_flags_slower_table_stages(self):
+        results = {
+            'incremental_scores': {'100': {'seconds': 1.0}, '1000': {'seconds': 1.0}},
+            'incremental_scores_table': {'100': {'seconds': 0.5}, '1000': {'seconds': 1.5}},
+        }
+
+        self.assertEqual(compare_paths(results), [('incremental_scores_table', 1000)])
+
+if __name__ == '__main__':
+    unittest.main()
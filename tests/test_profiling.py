@@ -0,0 +1,96 @@
+import os
+import time
+import pstats
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils.profiling import RequestProfiler
+
+def slow_stage():
+    time.sleep(0.05)
+    return 'done'
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _profiler(self, **kwargs):
+        return RequestProfiler(output_dir=self.output_dir, **kwargs)
+
+    def test_disabled_profiler_just_calls_through(self):
+        profiler = self._profiler(enabled=False, secret='')
+        shutil.rmtree(self.output_dir)
+
+        self.assertEqual(profiler.run('home', slow_stage, '/', None), 'done')
+        self.assertFalse(os.path.exists(self.output_dir))
+
+    def test_profiles_one_in_n_requests(self):
+        profiler = self._profiler(enabled=True, sample_every=3)
+        for _ in range(6):
+            self.assertEqual(profiler.run('home', slow_stage, '/'), 'done')
+
+        files = os.listdir(self.output_dir)
+        self.assertEqual(len(files), 2)
+        stats = pstats.Stats(profiler.last_output)
+        self.assertTrue(any(func[2] == 'slow_stage' for func in stats.stats))
+
+    def test_signed_tokens_are_checked(self):
+        profiler = self._profiler(enabled=False, secret='s3cret')
+        token = profiler.sign('/', ttl=60)
+
+        self.assertTrue(profiler.verify('/', token))
+        self.assertFalse(profiler.verify('/metrics', token))
+        self.assertFalse(profiler.verify('/', token[:-1] + ('0' if token[-1] != '0' else '1')))
+        self.assertFalse(profiler.verify('/', profiler.sign('/', ttl=-1)))
+        self.assertFalse(self._profiler(secret='').verify('/', token))
+
+        profiler.run('home', slow_stage, '/', 'not-a-token')
+        self.assertEqual(os.listdir(self.output_dir), [])
+        profiler.run('home', slow_stage, '/', token)
+        self.assertEqual(len(os.listdir(self.output_dir)), 1)
+
+    def test_collapsed_stacks_for_flame_graphs(self):
+        profiler = self._profiler(enabled=True, sample_every=1, format='collapsed', interval=0.002)
+        profiler.run('home', slow_stage, '/')
+
+        with open(profiler.last_output) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(any(';slow_stage (test_profiling.py:' in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+
+    def test_keeps_at_most_max_files(self):
+        profiler = self._profiler(enabled=True, sample_every=1, max_files=2)
+        for _ in range(4):
+            profiler.run('home', lambda: None, '/')
+        self.assertEqual(len(os.listdir(self.output_dir)), 2)
+
+class TestHomeProfiling(unittest.TestCase):
+    def setUp(self):
+        import main
+        self.main = main
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_signed_query_parameter_profiles_home(self):
+        profiler = RequestProfiler(enabled=False, secret='s3cret', output_dir=self.output_dir)
+        releases = [{'title': 'Test Movie', 'type': 'movie', 'release_date': '2024-01-01', 'excitement_score': 90}]
+        client = self.main.app.test_client()
+        with patch.object(self.main, 'request_profiler', profiler), \
+                patch.object(self.main.snapshot_cache, 'get', return_value=releases):
+            self.assertIn(b'Test Movie', client.get('/?profile=bogus').data)
+            self.assertEqual(os.listdir(self.output_dir), [])
+
+            response = client.get(f"/?profile={profiler.sign('/')}")
+
+        self.assertIn(b'Test Movie', response.data)
+        self.assertEqual(len(os.listdir(self.output_dir)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
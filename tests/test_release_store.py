@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+from utils.release_store import ReleaseStore, release_key
+
+class TestReleaseStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ReleaseStore(os.path.join(self.tmpdir, 'releases.sqlite'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _movie(self, **overrides):
+        movie = {'id': 1, 'source': 'tmdb_movie', 'title': 'Test Movie', 'type': 'movie',
+                 'release_date': '2024-01-03', 'popularity': 100, 'excitement_score': 80}
+        movie.update(overrides)
+        return movie
+
+    def test_upsert_keeps_one_row_per_source_id(self):
+        self.store.upsert_releases([self._movie()], day='2024-01-01')
+        self.store.upsert_releases([self._movie(popularity=150, excitement_score=90)], day='2024-01-02')
+
+        releases = self.store.get_window('2024-01-01', '2024-01-07')
+        self.assertEqual(len(releases), 1)
+        self.assertEqual(releases[0]['popularity'], 150)
+        self.assertEqual(releases[0]['id'], 1)
+
+    def test_popularity_history_has_one_point_per_day(self):
+        self.store.upsert_releases([self._movie(popularity=100)], day='2024-01-01')
+        self.store.upsert_releases([self._movie(popularity=110)], day='2024-01-01')
+        self.store.upsert_releases([self._movie(popularity=150)], day='2024-01-02')
+
+        history = self.store.get_popularity_history('tmdb_movie', 1)
+        self.assertEqual(history, [('2024-01-01', 110), ('2024-01-02', 150)])
+
+    def test_movie_and_tv_ids_do_not_collide(self):
+        show = {'id': 1, 'source': 'tmdb_tv', 'title': 'Test Show', 'type': 'tv', 'release_date': '2024-01-02'}
+        self.store.upsert_releases([self._movie(), show])
+
+        self.assertEqual(len(self.store.get_window('2024-01-01', '2024-01-07')), 2)
+
+    def test_window_filters_and_orders_by_score(self):
+        game = {'id': 7, 'source': 'igdb', 'title': 'Test Game', 'type': 'game', 'release_date': '2024-01-05',
+                'platforms': ['PC', 'Nintendo Switch'], 'excitement_score': 95}
+        old = self._movie(id=2, title='Old Movie', release_date='2023-12-01')
+        self.store.upsert_releases([self._movie(), game, old])
+
+        releases = self.store.get_window('2024-01-01', '2024-01-07')
+        self.assertEqual([r['title'] for r in releases], ['Test Game', 'Test Movie'])
+        self.assertEqual(releases[0]['platforms'], ['PC', 'Nintendo Switch'])
+
+        self.assertEqual(len(self.store.get_window('2024-01-01', '2024-01-07', media_type='movie')), 1)
+        self.assertEqual(len(self.store.get_window('2024-01-01', '2024-01-07', min_score=90)), 1)
+
+    def test_title_collector_releases_are_attributed_by_type(self):
+        self.assertEqual(release_key({'id': 5, 'type': 'game', 'title': 'Test Game'}), ('igdb', '5'))
+        self.assertEqual(release_key({'id': 5, 'type': 'tv', 'title': 'Test Show'}), ('tmdb_tv', '5'))
+        self.assertEqual(
+            release_key({'type': 'movie', 'title': 'Test Movie', 'release_date': '2024-01-01'}),
+            ('tmdb_movie', 'Test Movie|2024-01-01')
+        )
+
+if __name__ == '__main__':
+    unittest.main()
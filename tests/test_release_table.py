@@ -0,0 +1,79 @@
+import json
+import unittest
+import tracemalloc
+from utils.release_table import ReleaseTable
+
+MOVIE = {'id': 1, 'source': 'tmdb_movie', 'title': 'Dune: Part Two', 'release_date': '2024-03-01',
+         'popularity': 250.5, 'type': 'movie'}
+GAME = {'id': 7, 'source': 'igdb', 'title': 'Balatro', 'release_date': '2024-02-20', 'popularity': 80,
+        'rating': 90.0, 'total_rating': 88.0, 'platforms': ['PC', 'Nintendo Switch'],
+        'cover_url': 'https://images.igdb.com/balatro.jpg', 'type': 'game'}
+
+class TestReleaseTable(unittest.TestCase):
+    def setUp(self):
+        self.table = ReleaseTable.from_releases([MOVIE, GAME])
+
+    def test_rows_read_like_release_dicts(self):
+        movie, game = self.table
+
+        self.assertEqual(movie['title'], 'Dune: Part Two')
+        self.assertEqual(movie.release_date, '2024-03-01')
+        self.assertEqual(movie.get('rating', 0), 0)
+        self.assertNotIn('platforms', movie)
+        self.assertEqual(game['platforms'], ['PC', 'Nintendo Switch'])
+        self.assertEqual({**game}, GAME)
+
+    def test_exports_the_original_dicts(self):
+        self.assertEqual(self.table.to_dicts(), [MOVIE, GAME])
+        self.assertEqual(json.loads(json.dumps(self.table.to_dicts())), [MOVIE, GAME])
+
+    def test_to_dicts_matches_row_views(self):
+        self.table.append(None, None, 'podcast', 'Some Podcast', '2024-01-01')
+        self.table.set_scores([80.5, float('nan'), 12])
+
+        for exported, row in zip(self.table.to_dicts(), self.table):
+            self.assertEqual(list(exported.items()), list(row.to_dict().items()))
+
+    def test_skips_releases_without_a_usable_date(self):
+        self.assertIsNone(self.table.append(3, 'tmdb_tv', 'tv', 'Shogun', ''))
+        self.assertIsNone(self.table.append(3, 'tmdb_tv', 'tv', 'Shogun', 'TBA'))
+        self.assertEqual(len(self.table), 2)
+
+    def test_interns_unknown_types(self):
+        self.table.append(None, None, 'podcast', 'Some Podcast', '2024-01-01')
+        self.assertEqual(self.table[-1]['type'], 'podcast')
+        self.assertNotIn('source', self.table[-1])
+
+    def test_top_filters_and_sorts_by_score(self):
+        table = ReleaseTable.concat([self.table, self.table])
+        table.set_scores([50, 90, 75, 90])
+        top = table.top(70)
+
+        self.assertEqual([row['excitement_score'] for row in top], [90, 90, 75])
+        self.assertEqual([row['title'] for row in top], ['Balatro', 'Balatro', 'Dune: Part Two'])
+
+    def test_fill_missing_copies_only_gaps(self):
+        table = ReleaseTable.from_releases([{**MOVIE, 'popularity': None}])
+        table.fill_missing(0, self.table, 1)
+
+        self.assertEqual(table[0]['popularity'], 80)
+        self.assertEqual(table[0]['rating'], 90.0)
+        self.assertEqual(table[0]['title'], 'Dune: Part Two')
+
+    def test_uses_less_memory_than_dicts(self):
+        releases = [{**GAME, 'id': i, 'title': f'Game {i}'} for i in range(5000)]
+
+        tracemalloc.start()
+        dicts = [dict(release, platforms=list(release['platforms'])) for release in releases]
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        table = ReleaseTable.from_releases(releases)
+        table_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        self.assertEqual(len(table), len(dicts))
+        self.assertLess(table_bytes, dict_bytes / 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from utils.rate_limit import RateLimiter
+from utils.scheduler import RequestScheduler, host_key, parse_host_aliases
+
+class TestRequestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RequestScheduler(host_rates={'api.example.com': 1000}, max_retries=3, backoff_base=0.5)
+
+    def _response(self, status, headers=None):
+        response = MagicMock()
+        response.status_code = status
+        response.headers = headers or {}
+        return response
+
+    @patch('utils.scheduler.time.sleep')
+    def test_throttled_request_honours_retry_after(self, mock_sleep):
+        send = MagicMock(side_effect=[self._response(429, {'Retry-After': '2'}), self._response(200)])
+
+        response = self.scheduler.send('api.example.com', send)
+
+        self.assertEqual(response.status_code, 200)
+        mock_sleep.assert_called_once_with(2.0)
+
+    @patch('utils.scheduler.time.sleep')
+    def test_server_errors_back_off_exponentially(self, mock_sleep):
+        send = MagicMock(side_effect=[self._response(503), self._response(502), self._response(200)])
+
+        with patch('utils.scheduler.random.uniform', side_effect=lambda low, high: high):
+            response = self.scheduler.send('api.example.com', send)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [0.5, 1.0])
+
+    def test_stand_in_hosts_share_their_upstream_limits(self):
+        aliases = parse_host_aliases('127.0.0.1:8765=api.example.com, 127.0.0.1:8766=api.igdb.com')
+        scheduler = RequestScheduler(host_rates={'api.example.com': 1000}, host_aliases=aliases)
+
+        scheduler.send(host_key('http://127.0.0.1:8765/discover/movie'), MagicMock(return_value=self._response(200)))
+        scheduler.send(host_key('https://api.example.com/3/discover/tv'), MagicMock(return_value=self._response(200)))
+
+        self.assertEqual(list(scheduler._limiters), ['api.example.com'])
+
+    @patch('utils.scheduler.time.sleep')
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        send = MagicMock(return_value=self._response(500))
+
+        response = self.scheduler.send('api.example.com', send)
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(send.call_count, 4)
+
+    def test_client_errors_are_not_retried(self):
+        send = MagicMock(return_value=self._response(404))
+
+        self.scheduler.send('api.example.com', send)
+        self.assertEqual(send.call_count, 1)
+
+    def test_in_flight_requests_are_capped(self):
+        scheduler = RequestScheduler(host_rates={'api.example.com': 1000}, host_max_in_flight={'api.example.com': 2})
+        lock = threading.Lock()
+        state = {'current': 0, 'peak': 0}
+
+        def send():
+            with lock:
+                state['current'] += 1
+                state['peak'] = max(state['peak'], state['current'])
+            time.sleep(0.05)
+            with lock:
+                state['current'] -= 1
+            return self._response(200)
+
+        threads = [threading.Thread(target=scheduler.send, args=('api.example.com', send)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(state['peak'], 2)
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate_is_enforced_after_burst(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import copy
+import random
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from score_calculator import ScoreCalculator, IncrementalScoreCalculator
+from utils.release_table import ReleaseTable
+
+def make_releases(count, seed=42):
+    rng = random.Random(seed)
+    today = datetime.now()
+    platforms = ['PC', 'PlayStation 5', 'Xbox Series X|S', 'Nintendo Switch']
+    releases = []
+    for i in range(count):
+        media_type = rng.choice(['movie', 'tv', 'game', 'podcast'])
+        release = {
+            'title': f'Release {i}',
+            'type': media_type,
+            'release_date': (today + timedelta(days=rng.randint(-60, 60))).strftime('%Y-%m-%d'),
+        }
+        if rng.random() > 0.1:
+            release['popularity'] = rng.choice([rng.randint(0, 500), rng.uniform(0, 500)])
+        if media_type == 'game':
+            release['rating'] = rng.uniform(0, 100)
+            release['total_rating'] = rng.uniform(0, 100)
+            release['platforms'] = [rng.choice(platforms) for _ in range(rng.randint(0, 5))]
+        elif rng.random() > 0.5:
+            release['rating'] = rng.uniform(0, 10)
+        releases.append(release)
+    return releases
+
+class TestScoreCalculator(unittest.TestCase):
+    def setUp(self):
+        self.calculator = ScoreCalculator()
+
+    def test_batch_matches_scalar_scores(self):
+        releases = make_releases(2000)
+        scalar = self.calculator.calculate_scores(copy.deepcopy(releases))
+        batch = self.calculator.calculate_scores_batch(copy.deepcopy(releases))
+
+        self.assertEqual(
+            [r['excitement_score'] for r in scalar],
+            [r['excitement_score'] for r in batch]
+        )
+
+    def test_table_matches_scalar_scores(self):
+        releases = make_releases(2000)
+        scalar = self.calculator.calculate_scores(copy.deepcopy(releases))
+        table = self.calculator.calculate_scores_table(ReleaseTable.from_releases(releases))
+
+        self.assertEqual([r['excitement_score'] for r in scalar], [r['excitement_score'] for r in table])
+
+    def test_batch_handles_empty_input(self):
+        self.assertEqual(self.calculator.calculate_scores_batch([]), [])
+
+    def test_batch_accepts_dict_values(self):
+        releases = {('Test Game', '2024-01-01'): {
+            'title': 'Test Game', 'type': 'game', 'release_date': '2024-01-01',
+            'popularity': 100, 'platforms': ['PC', 'PC', 'Nintendo Switch']
+        }}
+        scored = self.calculator.calculate_scores_batch(releases.values())
+
+        self.assertEqual(len(scored), 1)
+        self.assertGreaterEqual(scored[0]['excitement_score'], 4)
+
+class TestIncrementalScoreCalculator(unittest.TestCase):
+    def setUp(self):
+        self.calculator = IncrementalScoreCalculator()
+
+    def _with_ids(self, releases):
+        for i, release in enumerate(releases):
+            release['id'] = i
+        return releases
+
+    def test_matches_full_scoring(self):
+        releases = self._with_ids(make_releases(500))
+        expected = ScoreCalculator().calculate_scores(copy.deepcopy(releases))
+        scored = self.calculator.calculate_scores(releases)
+
+        self.assertEqual(
+            [r['excitement_score'] for r in expected],
+            [r['excitement_score'] for r in scored]
+        )
+
+    def test_does_not_modify_input(self):
+        releases = self._with_ids(make_releases(5))
+        self.calculator.calculate_scores(releases)
+        self.assertTrue(all('excitement_score' not in r for r in releases))
+
+    def test_only_changed_releases_are_recomputed(self):
+        releases = self._with_ids(make_releases(100))
+        self.calculator.calculate_scores(releases)
+        self.assertEqual(self.calculator.last_recomputed, 100)
+
+        changed = copy.deepcopy(releases)
+        changed[3]['popularity'] = 9999
+        scored = self.calculator.calculate_scores(changed)
+
+        self.assertEqual(self.calculator.last_recomputed, 1)
+        expected = ScoreCalculator().calculate_scores(copy.deepcopy(changed))
+        self.assertEqual(scored[3]['excitement_score'], expected[3]['excitement_score'])
+
+    def test_day_rollover_refreshes_recency(self):
+        today = datetime.now()
+        release = {'id': 1, 'title': 'Test Movie', 'type': 'movie', 'popularity': 100,
+                   'release_date': today.strftime('%Y-%m-%d')}
+        self.calculator.calculate_scores([release])
+
+        with patch('score_calculator.datetime.date') as mock_date:
+            mock_date.today.return_value = (today + timedelta(days=15)).date()
+            mock_date.fromisoformat = date.fromisoformat
+            scored = self.calculator.calculate_scores([release])
+
+        self.assertEqual(self.calculator.last_recomputed, 0)
+        self.assertEqual(scored[0]['excitement_score'], 36.0)
+
+    def test_table_scores_match_and_reuse_cached_rows(self):
+        releases = self._with_ids(make_releases(300))
+        expected = ScoreCalculator().calculate_scores(copy.deepcopy(releases))
+
+        table = self.calculator.calculate_scores_table(ReleaseTable.from_releases(releases))
+        self.assertEqual([r['excitement_score'] for r in expected], [r['excitement_score'] for r in table])
+
+        self.calculator.calculate_scores_table(ReleaseTable.from_releases(releases))
+        self.assertEqual(self.calculator.last_recomputed, 0)
+
+    def test_table_only_changed_rows_are_recomputed(self):
+        releases = self._with_ids(make_releases(100))
+        self.calculator.calculate_scores_table(ReleaseTable.from_releases(releases))
+
+        changed = copy.deepcopy(releases)
+        changed[3]['popularity'] = 9999
+        changed[7].pop('popularity', None)
+        changed[7]['rating'] = 1.5
+        table = self.calculator.calculate_scores_table(ReleaseTable.from_releases(changed))
+
+        self.assertEqual(self.calculator.last_recomputed, 2)
+        expected = ScoreCalculator().calculate_scores(copy.deepcopy(changed))
+        self.assertEqual([r['excitement_score'] for r in expected], [r['excitement_score'] for r in table])
+
+    def test_unseen_releases_are_evicted_at_rollover(self):
+        calculator = IncrementalScoreCalculator(evict_after=0)
+        calculator.calculate_scores(self._with_ids(make_releases(3)))
+        calculator._today = None
+        calculator.calculate_scores([])
+        self.assertEqual(calculator._rows, {})
+
+if __name__ == '__main__':
+    unittest.main()
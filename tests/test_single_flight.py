@@ -0,0 +1,97 @@
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from utils.single_flight import SingleFlight
+from utils.release_table import ReleaseTable
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+        self.calls = 0
+        self.calls_lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.lock_dir)
+
+    def _slow_loader(self, result):
+        def load():
+            with self.calls_lock:
+                self.calls += 1
+            time.sleep(0.2)
+            return result
+        return load
+
+    def _run_concurrently(self, targets):
+        results = [None] * len(targets)
+
+        def run(i, target):
+            results[i] = target()
+
+        threads = [threading.Thread(target=run, args=(i, t)) for i, t in enumerate(targets)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight(self.lock_dir)
+        load = self._slow_loader([{'title': 'Test Movie'}])
+
+        results = self._run_concurrently([lambda: flight.do(('2024-01-01', '2024-01-07'), load)] * 8)
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r == [{'title': 'Test Movie'}] for r in results))
+
+    def test_errors_are_shared_with_waiting_callers(self):
+        flight = SingleFlight(self.lock_dir)
+
+        def broken():
+            time.sleep(0.1)
+            raise ValueError('API Error')
+
+        errors = []
+
+        def call():
+            try:
+                flight.do('window', broken)
+            except ValueError as e:
+                errors.append(e)
+
+        self._run_concurrently([call] * 4)
+        self.assertEqual(len(errors), 4)
+
+    def test_workers_queued_on_the_lease_reuse_the_result(self):
+        # Separate instances stand in for separate worker processes sharing a lock dir
+        workers = [SingleFlight(self.lock_dir) for _ in range(3)]
+        load = self._slow_loader([{'title': 'Test Game'}])
+
+        results = self._run_concurrently([lambda w=w: w.do(('2024-01-01', '2024-01-07'), load) for w in workers])
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r == [{'title': 'Test Game'}] for r in results))
+
+    def test_recent_result_from_another_worker_is_reused_within_max_age(self):
+        SingleFlight(self.lock_dir).do('window', lambda: [1])
+
+        self.assertEqual(SingleFlight(self.lock_dir).do('window', lambda: [2], max_age=60), [1])
+        self.assertEqual(SingleFlight(self.lock_dir).do('window', lambda: [3]), [3])
+
+    def test_shared_result_keeps_its_build_time(self):
+        built_at, _ = SingleFlight(self.lock_dir).do_timed('window', lambda: [1])
+        time.sleep(0.05)
+
+        self.assertEqual(SingleFlight(self.lock_dir).do_timed('window', lambda: [2], max_age=60), (built_at, [1]))
+
+    def test_release_tables_are_shared_as_dicts_and_decoded(self):
+        release = {'id': 1, 'title': 'Test Movie', 'release_date': '2024-01-01', 'type': 'movie'}
+        SingleFlight(self.lock_dir).do('window', lambda: ReleaseTable.from_releases([release]))
+
+        shared = SingleFlight(self.lock_dir).do('window', lambda: None, max_age=60, decode=ReleaseTable.from_releases)
+        self.assertIsInstance(shared, ReleaseTable)
+        self.assertEqual(shared[0]['title'], 'Test Movie')
+
+if __name__ == '__main__':
+    unittest.main()
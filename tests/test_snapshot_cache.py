@@ -0,0 +1,121 @@
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+from utils.single_flight import SingleFlight
+from utils.snapshot_cache import SnapshotCache
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        self.loader = MagicMock(return_value=[{'title': 'Test Movie', 'excitement_score': 80}])
+        self.cache = SnapshotCache(self.loader, ttl=60, stale_ttl=60)
+
+    def test_cold_window_loads_once(self):
+        first = self.cache.get('2024-01-01', '2024-01-07')
+        second = self.cache.get('2024-01-01', '2024-01-07')
+
+        self.assertIs(first, second)
+        self.loader.assert_called_once_with('2024-01-01', '2024-01-07')
+
+    def test_windows_are_cached_separately(self):
+        self.cache.get('2024-01-01', '2024-01-07')
+        self.cache.get('2024-01-02', '2024-01-08')
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_stale_snapshot_served_while_revalidating(self):
+        refreshed = threading.Event()
+        stale = [{'title': 'Old'}]
+        fresh = [{'title': 'New'}]
+
+        def loader(start_date, end_date):
+            refreshed.set()
+            return fresh
+
+        cache = SnapshotCache(loader, ttl=60, stale_ttl=60)
+        cache._snapshots[('2024-01-01', '2024-01-07')] = (time.time() - 90, stale)
+
+        self.assertIs(cache.get('2024-01-01', '2024-01-07'), stale)
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(100):
+            if cache._snapshots[('2024-01-01', '2024-01-07')][1] is fresh:
+                break
+            time.sleep(0.01)
+        self.assertIs(cache.get('2024-01-01', '2024-01-07'), fresh)
+
+    def test_expired_snapshot_blocks_on_refresh(self):
+        self.cache._snapshots[('2024-01-01', '2024-01-07')] = (time.time() - 500, [])
+        releases = self.cache.get('2024-01-01', '2024-01-07')
+
+        self.assertEqual(releases[0]['title'], 'Test Movie')
+        self.loader.assert_called_once()
+
+    def test_refresh_replaces_snapshot(self):
+        self.cache.get('2024-01-01', '2024-01-07')
+        self.cache.refresh('2024-01-01', '2024-01-07')
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_evicts_oldest_window(self):
+        cache = SnapshotCache(self.loader, ttl=60, stale_ttl=60, max_windows=2)
+        cache.get('2024-01-01', '2024-01-07')
+        cache.get('2024-01-02', '2024-01-08')
+        cache.get('2024-01-03', '2024-01-09')
+
+        self.assertNotIn(('2024-01-01', '2024-01-07'), cache._snapshots)
+        self.assertEqual(len(cache._snapshots), 2)
+
+    def test_snapshot_from_another_worker_keeps_its_build_time(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir)
+        SnapshotCache(self.loader, ttl=60, stale_ttl=60, single_flight=SingleFlight(lock_dir)).get('2024-01-01', '2024-01-07')
+        built_at = time.time()
+        time.sleep(0.05)
+
+        cache = SnapshotCache(self.loader, ttl=60, stale_ttl=60, single_flight=SingleFlight(lock_dir))
+        cache.get('2024-01-01', '2024-01-07')
+
+        self.loader.assert_called_once()
+        self.assertLessEqual(cache._snapshots[('2024-01-01', '2024-01-07')][0], built_at)
+
+    def test_view_is_derived_once_per_snapshot(self):
+        view = MagicMock(side_effect=lambda releases: [release['title'] for release in releases])
+        cache = SnapshotCache(self.loader, ttl=60, stale_ttl=60, view=view)
+
+        self.assertEqual(cache.get_view('2024-01-01', '2024-01-07'), ['Test Movie'])
+        self.assertEqual(cache.get_view('2024-01-01', '2024-01-07'), ['Test Movie'])
+        view.assert_called_once()
+
+        self.loader.return_value = [{'title': 'New'}]
+        cache.refresh('2024-01-01', '2024-01-07')
+        self.assertEqual(view.call_count, 2)
+        self.assertEqual(cache.get_view('2024-01-01', '2024-01-07'), ['New'])
+        self.assertEqual(view.call_count, 2)
+
+    def test_view_derived_for_snapshot_stored_directly(self):
+        cache = SnapshotCache(self.loader, ttl=60, stale_ttl=60, view=len)
+        cache._snapshots[('2024-01-01', '2024-01-07')] = (time.time(), [{}, {}])
+
+        self.assertEqual(cache.get_view('2024-01-01', '2024-01-07'), 2)
+        self.loader.assert_not_called()
+
+    def test_concurrent_cold_requests_share_one_refresh(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir)
+
+        def loader(start_date, end_date):
+            time.sleep(0.1)
+            return [{'title': 'Test Movie'}]
+
+        loader = MagicMock(side_effect=loader)
+        cache = SnapshotCache(loader, ttl=60, stale_ttl=60, single_flight=SingleFlight(lock_dir))
+        threads = [threading.Thread(target=cache.get, args=('2024-01-01', '2024-01-07')) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        loader.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
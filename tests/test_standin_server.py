@@ -0,0 +1,81 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import requests
+from benchmarks.standin_server import StandInServer, request_key
+from collectors.tmdb_collector import TMDBCollector
+
+DISCOVER_PATH = '/discover/movie'
+DISCOVER_QUERY = [('language', 'en-US'), ('primary_release_date.gte', '2024-03-01'),
+                  ('primary_release_date.lte', '2024-03-14'), ('sort_by', 'popularity.desc'), ('page', '1')]
+PAGE = {'page': 1, 'total_pages': 1, 'results': [
+    {'id': 693134, 'title': 'Dune: Part Two', 'release_date': '2024-03-01', 'popularity': 250.5},
+]}
+
+class TestStandInServer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.servers = []
+        # Plays the real TMDB for the recorder
+        self.upstream_cassette = os.path.join(self.tmpdir, 'upstream.json')
+        with open(self.upstream_cassette, 'w') as f:
+            json.dump({request_key('tmdb', 'GET', DISCOVER_PATH, DISCOVER_QUERY, ''): {
+                'status': 200, 'content_type': 'application/json', 'body': json.dumps(PAGE)}}, f)
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def _start(self, cassette, mode='replay', **kwargs):
+        server = StandInServer(os.path.join(self.tmpdir, cassette), mode, port=0, **kwargs)
+        self.servers.append(server)
+        return server, server.start()
+
+    def _collector(self, env):
+        with patch.dict(os.environ, {**env, 'TMDB_API_KEY': 'secret-key'}):
+            return TMDBCollector('2024-03-01', '2024-03-14', max_pages=1)
+
+    def test_records_then_replays_without_credentials(self):
+        upstream, _ = self._start('upstream.json')
+        recorder, env = self._start('cassette.json', 'record', upstreams={'tmdb': upstream.url('tmdb')})
+        self.assertEqual(self._collector(env).get_movies()[0]['title'], 'Dune: Part Two')
+        self.assertEqual(recorder.stats['recorded'], 1)
+        with open(os.path.join(self.tmpdir, 'cassette.json')) as f:
+            self.assertNotIn('secret-key', f.read())
+
+        replayer, env = self._start('cassette.json')
+        self.assertEqual(self._collector(env).get_movies()[0]['title'], 'Dune: Part Two')
+        self.assertEqual(replayer.stats['replayed'], 1)
+
+    def test_points_collectors_and_scheduler_at_the_stand_in(self):
+        _, env = self._start('upstream.json')
+
+        self.assertEqual(self._collector(env).base_url, env['TMDB_BASE_URL'])
+        self.assertIn('=api.themoviedb.org', env['HTTP_HOST_ALIASES'])
+        self.assertIn('=api.igdb.com', env['HTTP_HOST_ALIASES'])
+
+    def test_injects_throttles_and_errors(self):
+        server, env = self._start('upstream.json', throttle_rate=1, retry_after=2)
+        response = requests.get(f"{env['TMDB_BASE_URL']}{DISCOVER_PATH}")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '2')
+
+        server.throttle_rate, server.error_rate = 0, 1
+        self.assertEqual(requests.get(f"{env['TMDB_BASE_URL']}{DISCOVER_PATH}").status_code, 503)
+        self.assertEqual(server.stats['throttled'], 1)
+        self.assertEqual(server.stats['errors'], 1)
+
+    def test_issues_a_dummy_token_and_reports_missing_recordings(self):
+        server, env = self._start('upstream.json')
+
+        token = requests.post(env['TWITCH_TOKEN_URL'], params={'client_id': 'x', 'client_secret': 'y'}).json()
+        self.assertEqual(token['access_token'], 'standin-token')
+        self.assertEqual(requests.post(f"{env['IGDB_BASE_URL']}/games", data='fields name;').status_code, 404)
+        self.assertEqual(server.stats['missing'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
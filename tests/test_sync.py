@@ -0,0 +1,139 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+from collectors.sync import SlidingWindowSync, _contiguous_ranges
+from utils.release_store import ReleaseStore
+
+class FakeTMDB:
+    calls = []
+    changed = set()
+
+    def __init__(self, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.page_concurrency = 2
+        self.failed_pages = []
+
+    def get_movies(self):
+        FakeTMDB.calls.append(('movie', self.start_date, self.end_date))
+        return [{'id': int(self.start_date.replace('-', '')), 'source': 'tmdb_movie', 'type': 'movie',
+                 'title': f'Movie {self.start_date}', 'release_date': self.start_date, 'popularity': 10}]
+
+    def get_tv_shows(self):
+        FakeTMDB.calls.append(('tv', self.start_date, self.end_date))
+        return []
+
+    def get_changed_ids(self, media_type, start_date, end_date):
+        return FakeTMDB.changed if media_type == 'movie' else set()
+
+    def get_details(self, media_type, tmdb_id):
+        FakeTMDB.calls.append(('details', tmdb_id))
+        return {'id': tmdb_id, 'source': 'tmdb_movie', 'type': 'movie', 'title': 'Changed Movie',
+                'release_date': '2024-01-02', 'popularity': 99}
+
+class TestSlidingWindowSync(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ReleaseStore(os.path.join(self.tmpdir, 'releases.sqlite'))
+        FakeTMDB.calls = []
+        FakeTMDB.changed = set()
+        self.igdb = MagicMock()
+        self.igdb.return_value.get_games_bulk.return_value = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _sync(self, **kwargs):
+        return SlidingWindowSync(self.store, recheck_days=0, resync_after=86400,
+                                 tmdb_factory=FakeTMDB, igdb_factory=self.igdb, **kwargs)
+
+    def test_first_sync_fetches_whole_window_in_one_range(self):
+        releases = self._sync().sync('2024-01-01', '2024-01-07', today=date(2024, 1, 4))
+
+        self.assertIn(('movie', '2024-01-01', '2024-01-07'), FakeTMDB.calls)
+        self.assertEqual(len(releases), 1)
+        self.assertEqual(len(self.store.get_synced_days('tmdb_movie')), 7)
+        self.igdb.assert_called_once_with('2024-01-01', '2024-01-08')
+
+    def test_next_day_fetches_only_new_and_recent_days(self):
+        self._sync().sync('2024-01-01', '2024-01-07', today=date(2024, 1, 4))
+        FakeTMDB.calls = []
+
+        sync = SlidingWindowSync(self.store, recheck_days=1, resync_after=86400,
+                                 tmdb_factory=FakeTMDB, igdb_factory=self.igdb)
+        sync.sync('2024-01-02', '2024-01-08', today=date(2024, 1, 5))
+
+        movie_calls = [c for c in FakeTMDB.calls if c[0] == 'movie']
+        self.assertEqual(movie_calls, [('movie', '2024-01-04', '2024-01-06'), ('movie', '2024-01-08', '2024-01-08')])
+        self.assertNotIn('2024-01-01', self.store.get_synced_days('tmdb_movie'))
+
+    def test_stale_days_are_resynced(self):
+        self.store.mark_synced('tmdb_movie', ['2024-01-01'], synced_at=time.time() - 2 * 86400)
+        self._sync().sync('2024-01-01', '2024-01-01', today=date(2024, 1, 4))
+
+        self.assertIn(('movie', '2024-01-01', '2024-01-01'), FakeTMDB.calls)
+
+    def test_changes_feed_refreshes_only_changed_stored_titles(self):
+        self._sync().sync('2024-01-01', '2024-01-07', today=date(2024, 1, 4))
+        FakeTMDB.calls = []
+        FakeTMDB.changed = {20240101, 123456}
+
+        releases = self._sync(use_changes=True).sync('2024-01-01', '2024-01-07', today=date(2024, 1, 4))
+
+        # Only today is re-fetched in full; the changed title from earlier in the window is patched
+        self.assertEqual([c for c in FakeTMDB.calls if c[0] == 'movie'], [('movie', '2024-01-04', '2024-01-04')])
+        self.assertEqual([c for c in FakeTMDB.calls if c[0] == 'details'], [('details', 20240101)])
+        self.assertEqual({r['title'] for r in releases}, {'Changed Movie', 'Movie 2024-01-04'})
+
+    def test_everything_failing_with_empty_store_raises(self):
+        self.igdb.side_effect = ValueError('API Error')
+
+        class BrokenTMDB(FakeTMDB):
+            def get_movies(self):
+                raise ValueError('API Error')
+
+            def get_tv_shows(self):
+                raise ValueError('API Error')
+
+        sync = SlidingWindowSync(self.store, tmdb_factory=BrokenTMDB, igdb_factory=self.igdb)
+        with self.assertRaises(RuntimeError):
+            sync.sync('2024-01-01', '2024-01-07', today=date(2024, 1, 4))
+        self.assertEqual(self.store.get_synced_days('tmdb_movie'), {})
+
+    def test_days_with_a_failed_batch_are_retried_next_sync(self):
+        class PartialTMDB(FakeTMDB):
+            failures = 1
+
+            def get_movies(self):
+                releases = super().get_movies()
+                if PartialTMDB.failures:
+                    PartialTMDB.failures -= 1
+                    self.failed_pages.append(('movie', 2))
+                return releases
+
+        self.igdb.return_value.get_games_bulk.side_effect = [RuntimeError('IGDB failed to fetch 1 of 1 shards'), []]
+        sync = SlidingWindowSync(self.store, recheck_days=0, resync_after=86400,
+                                 tmdb_factory=PartialTMDB, igdb_factory=self.igdb)
+
+        sync.sync('2024-01-01', '2024-01-07', today=date(2024, 1, 4))
+        self.assertEqual(self.store.get_synced_days('tmdb_movie'), {})
+        self.assertEqual(self.store.get_synced_days('igdb'), {})
+        self.assertEqual(len(self.store.get_synced_days('tmdb_tv')), 7)
+
+        FakeTMDB.calls = []
+        sync.sync('2024-01-01', '2024-01-07', today=date(2024, 1, 4))
+        self.assertEqual([c for c in FakeTMDB.calls if c[0] == 'movie'], [('movie', '2024-01-01', '2024-01-07')])
+        self.assertEqual(self.igdb.return_value.get_games_bulk.call_count, 2)
+        self.assertEqual(len(self.store.get_synced_days('tmdb_movie')), 7)
+        self.assertEqual(len(self.store.get_synced_days('igdb')), 7)
+
+    def test_contiguous_ranges(self):
+        days = ['2024-01-05', '2024-01-01', '2024-01-02', '2024-01-04']
+        self.assertEqual(_contiguous_ranges(days), [('2024-01-01', '2024-01-02'), ('2024-01-04', '2024-01-05')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,9 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from collectors.tmdb_collector import TMDBCollector
+from utils.release_table import ReleaseTable
 from datetime import datetime, timedelta
+import requests
 
 class TestTMDBCollector(unittest.TestCase):
     def setUp(self):
@@ -59,5 +61,76 @@ class TestTMDBCollector(unittest.TestCase):
         self.assertEqual(formatted['release_date'], '2024-01-01')
         self.assertEqual(formatted['popularity'], 100)
 
+class TestTMDBPagination(unittest.TestCase):
+    def setUp(self):
+        self.collector = TMDBCollector('2024-01-01', '2024-01-07', max_pages=3, page_concurrency=2)
+
+    def _page(self, page, total_pages):
+        response = MagicMock()
+        response.json.return_value = {
+            'page': page,
+            'total_pages': total_pages,
+            'results': [
+                {'id': page, 'title': f'Movie {page}', 'release_date': '2024-01-01', 'popularity': 100 - page}
+            ]
+        }
+        return response
+
+    def test_fetches_remaining_pages_up_to_cap(self):
+        self.collector.session = MagicMock()
+        self.collector.session.get.side_effect = lambda url, params: self._page(params['page'], 10)
+
+        movies = self.collector.get_movies()
+
+        self.assertEqual(self.collector.session.get.call_count, 3)
+        self.assertEqual(sorted(m['title'] for m in movies), ['Movie 1', 'Movie 2', 'Movie 3'])
+        self.assertEqual(movies[0]['title'], 'Movie 1')
+
+    def test_appends_to_release_table(self):
+        self.collector.session = MagicMock()
+        self.collector.session.get.side_effect = lambda url, params: self._page(params['page'], 2)
+
+        table = ReleaseTable()
+        self.assertIs(self.collector.get_movies(table), table)
+        self.assertEqual(table.to_dicts(), list(self.collector.iter_movies()))
+
+    def test_single_page_makes_one_request(self):
+        self.collector.session = MagicMock()
+        self.collector.session.get.side_effect = lambda url, params: self._page(params['page'], 1)
+
+        self.collector.get_movies()
+        self.assertEqual(self.collector.session.get.call_count, 1)
+
+    def test_failed_page_is_skipped(self):
+        def get(url, params):
+            if params['page'] == 2:
+                raise requests.exceptions.ConnectionError('boom')
+            return self._page(params['page'], 3)
+
+        self.collector.session = MagicMock()
+        self.collector.session.get.side_effect = get
+
+        movies = self.collector.get_movies()
+        self.assertEqual(sorted(m['title'] for m in movies), ['Movie 1', 'Movie 3'])
+        self.assertEqual(self.collector.failed_pages, [('movie', 2)])
+
+    def test_tv_shows_stream_first_page_before_the_rest(self):
+        def page(url, params):
+            response = self._page(params['page'], 2)
+            item = response.json.return_value['results'][0]
+            item['name'] = item.pop('title')
+            item['first_air_date'] = item.pop('release_date')
+            return response
+
+        self.collector.session = MagicMock()
+        self.collector.session.get.side_effect = page
+
+        stream = self.collector.iter_tv_shows()
+        first = next(stream)
+        self.assertEqual(first['title'], 'Movie 1')
+        self.assertEqual(first['type'], 'tv')
+        self.assertEqual(self.collector.session.get.call_count, 1)
+        self.assertEqual(len(list(stream)), 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from collectors.twitch_auth import TwitchTokenManager
+from collectors.igdb_collector import IGDBCollector
+
+class TestTwitchTokenManager(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmpdir, 'token.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _token_response(self, token, expires_in=5000000):
+        response = MagicMock()
+        response.status_code = 200
+        response.json.return_value = {'access_token': token, 'expires_in': expires_in}
+        return response
+
+    def _manager(self):
+        return TwitchTokenManager('dummy_id', 'dummy_secret', cache_path=self.cache_path, refresh_margin=3600)
+
+    @patch('collectors.twitch_auth.requests.post')
+    def test_token_is_cached(self, mock_post):
+        mock_post.return_value = self._token_response('dummy_token')
+        manager = self._manager()
+
+        self.assertEqual(manager.get_token(), 'dummy_token')
+        self.assertEqual(manager.get_token(), 'dummy_token')
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch('collectors.twitch_auth.requests.post')
+    def test_token_persists_across_restarts(self, mock_post):
+        mock_post.return_value = self._token_response('dummy_token')
+        self._manager().get_token()
+
+        with open(self.cache_path) as f:
+            self.assertEqual(json.load(f)['access_token'], 'dummy_token')
+
+        self.assertEqual(self._manager().get_token(), 'dummy_token')
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch('collectors.twitch_auth.requests.post')
+    def test_expired_token_is_refetched(self, mock_post):
+        mock_post.side_effect = [self._token_response('old_token', expires_in=30), self._token_response('new_token')]
+        manager = self._manager()
+
+        self.assertEqual(manager.get_token(), 'old_token')
+        self.assertEqual(manager.get_token(), 'new_token')
+
+    @patch('collectors.twitch_auth.requests.post')
+    def test_token_near_expiry_refreshes_in_background(self, mock_post):
+        mock_post.side_effect = [self._token_response('old_token', expires_in=600), self._token_response('new_token')]
+        manager = self._manager()
+
+        self.assertEqual(manager.get_token(), 'old_token')
+        self.assertEqual(manager.get_token(), 'old_token')
+        for _ in range(100):
+            if manager.access_token == 'new_token':
+                break
+            time.sleep(0.01)
+        self.assertEqual(manager.get_token(), 'new_token')
+
+    @patch('collectors.twitch_auth.requests.post')
+    def test_refresh_is_shared_by_callers_with_same_stale_token(self, mock_post):
+        mock_post.side_effect = [self._token_response('old_token'), self._token_response('new_token')]
+        manager = self._manager()
+        manager.get_token()
+
+        self.assertEqual(manager.refresh('old_token'), 'new_token')
+        self.assertEqual(manager.refresh('old_token'), 'new_token')
+        self.assertEqual(mock_post.call_count, 2)
+
+class TestIGDBTokenRetry(unittest.TestCase):
+    @patch('collectors.igdb_collector.get_token_manager')
+    def test_unauthorized_query_retries_once_with_new_token(self, mock_get_manager):
+        manager = MagicMock()
+        manager.get_token.return_value = 'old_token'
+        manager.refresh.return_value = 'new_token'
+        mock_get_manager.return_value = manager
+
+        with patch.dict(os.environ, {'IGDB_CLIENT_ID': 'dummy_id', 'IGDB_CLIENT_SECRET': 'dummy_secret'}):
+            collector = IGDBCollector('2024-01-01', '2024-01-07')
+
+        expired = MagicMock(status_code=401)
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = [{'id': 1, 'name': 'Test Game', 'first_release_date': collector.start_date}]
+        collector.session = MagicMock()
+        collector.session.post.side_effect = [expired, ok]
+
+        games = collector.get_games()
+
+        self.assertEqual(games[0]['title'], 'Test Game')
+        manager.refresh.assert_called_once_with('old_token')
+        self.assertEqual(collector.headers['Authorization'], 'Bearer new_token')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import os
+import re
+import math
+import heapq
+import datetime
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'^(\d+|[ivx]{2,})$')
+
+def normalize_title(title):
+    """Lower-cases, strips accents and punctuation, and collapses whitespace."""
+    title = unicodedata.normalize('NFKD', title or '')
+    title = ''.join(c for c in title if not unicodedata.combining(c))
+    title = title.casefold().replace('&', ' and ')
+    title = _PUNCTUATION.sub(' ', title)
+    return _WHITESPACE.sub(' ', title).strip()
+
+def _numbers(title):
+    # Sequel numbers, years and roman numerals tell otherwise similar titles apart
+    return frozenset(token for token in title.split() if _NUMBER.match(token))
+
+
+class ReleaseDeduplicator:
+    """
+    Merges releases that are the same title under slightly different names or
+    dates, e.g. "Silent Hill 2" and "SILENT HILL 2" a day apart.
+
+    Instead of comparing every pair, each release is indexed under blocking
+    keys made of a few character n-grams of its normalized title plus its
+    media type and release day. A release is only fuzzy-scored against
+    earlier releases that share a key within date_tolerance days and enough
+    n-grams overall, which keeps matching close to linear in the catalog
+    size. Keys shared by more than max_block_size releases are too
+    unselective to be worth scanning and are skipped. Titles whose numbers
+    differ (sequels, years, roman numerals) are never merged, and neither are
+    releases of different types, e.g. the "Dune" game and the "Dune" movie.
+    """
+
+    def __init__(self, threshold=None, date_tolerance=1, ngram_size=3, block_keys=4,
+                 max_block_size=200, min_shared=0.5):
+        self.threshold = threshold if threshold is not None else int(os.getenv('DEDUPE_THRESHOLD', 90))
+        self.date_tolerance = date_tolerance
+        self.ngram_size = ngram_size
+        self.block_keys = block_keys
+        self.max_block_size = max_block_size
+        self.min_shared = min_shared
+        self.last_comparisons = 0
+
+    def deduplicate(self, releases):
+        """
+        Args:
+            releases (iterable): Release dictionaries.
+
+        Returns:
+            list: One merged release per matched group, in first-seen order.
+        """
+        releases = list(releases)
+        groups = self._group(
+            [release.get('title') for release in releases],
+            [release.get('type') for release in releases],
+            [self._day(release.get('release_date')) for release in releases]
+        )
+        return [self._merge([releases[i] for i in group]) for group in groups]
+
+    def deduplicate_table(self, table):
+        """
+        ReleaseTable version of deduplicate, returning a new table with one
+        merged row per matched group.
+        """
+        groups = self._group(table.titles, table.types, table.days)
+        popularity = table.popularity
+        # Most popular row first; NaN (missing) sorts as 0, and ties keep input order
+        groups = [sorted(group, key=lambda i: 0 if math.isnan(popularity[i]) else -popularity[i]) for group in groups]
+        result = table.take(group[0] for group in groups)
+        for position, group in enumerate(groups):
+            for i in group[1:]:
+                result.fill_missing(position, table, i)
+        return result
+
+    def _group(self, titles, types, days):
+        # Returns lists of positions that refer to the same release, in first-seen order
+        parent = list(range(len(titles)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        index = defaultdict(list)  # (ngram, type, day) -> release positions
+        normalized = []
+        grams = []
+        numbers = []
+        comparisons = 0
+        for i, (raw_title, media_type, day) in enumerate(zip(titles, types, days)):
+            title = normalize_title(raw_title)
+            title_grams = self._ngrams(title)
+            normalized.append(title)
+            grams.append(title_grams)
+            numbers.append(_numbers(title))
+
+            candidate_days = [day] if day is None else range(day - self.date_tolerance, day + self.date_tolerance + 1)
+            keys = self._block_keys(title_grams)
+            candidates = set()
+            for key in keys:
+                for candidate_day in candidate_days:
+                    block = index.get((key, media_type, candidate_day))
+                    if block and len(block) <= self.max_block_size:
+                        candidates.update(block)
+
+            for j in candidates:
+                if numbers[j] != numbers[i] or find(i) == find(j):
+                    continue
+                # Cheap n-gram overlap filter before the expensive fuzzy score
+                if len(title_grams & grams[j]) < self.min_shared * max(len(title_grams), len(grams[j])):
+                    continue
+                comparisons += 1
+                if normalized[j] == title or SequenceMatcher(None, normalized[j], title).ratio() * 100 >= self.threshold:
+                    parent[find(i)] = find(j)
+
+            for key in keys:
+                index[(key, media_type, day)].append(i)
+
+        self.last_comparisons = comparisons
+
+        groups = defaultdict(list)
+        for i in range(len(titles)):
+            groups[find(i)].append(i)
+        return list(groups.values())
+
+    def _ngrams(self, title):
+        compact = title.replace(' ', '')
+        if len(compact) <= self.ngram_size:
+            return {compact}
+        return {compact[i:i + self.ngram_size] for i in range(len(compact) - self.ngram_size + 1)}
+
+    def _block_keys(self, title_grams):
+        # The block_keys lowest-hashing n-grams (a min-hash sketch): similar
+        # titles very likely share one, while common n-grams rarely win
+        return heapq.nsmallest(self.block_keys, title_grams, key=hash)
+
+    def _day(self, release_date):
+        try:
+            return datetime.date.fromisoformat(release_date).toordinal()
+        except (TypeError, ValueError):
+            return None
+
+    def _merge(self, group):
+        if len(group) == 1:
+            return group[0]
+        # Keep the most popular record and fill its gaps from the others
+        group = sorted(group, key=lambda r: r.get('popularity') or 0, reverse=True)
+        merged = dict(group[0])
+        for release in group[1:]:
+            for key, value in release.items():
+                if merged.get(key) in (None, '', []):
+                    merged[key] = value
+        return merged
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from utils.metrics import get_metrics
+
+
+class ResponseCache:
+    """
+    On-disk response store backed by SQLite.
+
+    Entries are keyed by a hash of the method, full URL (query string
+    included) and request body. Entries older than the TTL are kept around for
+    conditional revalidation and offline fallback; once the table grows past
+    max_entries the least recently used rows are evicted.
+    """
+
+    def __init__(self, path, ttl=None, max_entries=None):
+        self.path = path
+        # Defaults to the snapshot TTL: a longer one would have snapshot rebuilds re-read the responses they replace
+        self.ttl = ttl if ttl is not None else int(os.getenv('HTTP_CACHE_TTL', os.getenv('SNAPSHOT_TTL', 900)))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('HTTP_CACHE_MAX_ENTRIES', 5000))
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stale': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at);
+        ''')
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, headers, content, stored_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+        status, headers, content, stored_at = row
+        return {'status': status, 'headers': json.loads(headers), 'content': content, 'stored_at': stored_at}
+
+    def set(self, key, status, headers, content):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, status, headers, content, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, status, json.dumps(dict(headers)), content, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key):
+        # A 304 means our copy is current again
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key))
+            self._conn.commit()
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def record(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+        get_metrics().inc('wakeupbabe_cache_lookups_total', cache='http', outcome=outcome)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+
+class CachingAdapter(BaseAdapter):
+    """
+    Transport adapter that answers GET and POST requests from a
+    ResponseCache and passes everything else to its delegate adapter. Fresh
+    entries never touch the network; stale entries are revalidated with
+    If-None-Match/If-Modified-Since when the upstream sent validators, and
+    are served as-is if the network is unreachable.
+    """
+
+    def __init__(self, cache, delegate=None):
+        super().__init__()
+        self.cache = cache
+        self.delegate = delegate or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        if request.method not in ('GET', 'POST'):
+            return self.delegate.send(request, **kwargs)
+
+        key = cache_key(request)
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record('hits')
+            return self._build_response(request, entry)
+
+        if entry is not None:
+            headers = CaseInsensitiveDict(entry['headers'])
+            if 'ETag' in headers:
+                request.headers['If-None-Match'] = headers['ETag']
+            if 'Last-Modified' in headers:
+                request.headers['If-Modified-Since'] = headers['Last-Modified']
+
+        try:
+            response = self.delegate.send(request, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if entry is None:
+                raise
+            logging.warning(f"Network unavailable, serving stale cached response for {request.method} {request.path_url.split('?')[0]}")
+            self.cache.record('stale')
+            return self._build_response(request, entry)
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(key)
+            self.cache.record('revalidated')
+            return self._build_response(request, entry)
+
+        self.cache.record('misses')
+        if response.status_code == 200:
+            self.cache.set(key, response.status_code, response.headers, response.content)
+        return response
+
+    def close(self):
+        self.delegate.close()
+
+    def _build_response(self, request, entry):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['content']
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = 'OK'
+        response.url = request.url
+        response.request = request
+        response.from_cache = True
+        return response
+
+
+def cache_key(request):
+    body = request.body or b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    digest = hashlib.sha256()
+    digest.update(request.method.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(request.url.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(body)
+    return digest.hexdigest()
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Returns the process-wide response cache, or None when HTTP_CACHE_PATH is
+    set to an empty string.
+    """
+    global _response_cache
+    path = os.getenv('HTTP_CACHE_PATH', '.http_cache.sqlite')
+    if not path:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None or _response_cache.path != path:
+            _response_cache = ResponseCache(path)
+        return _response_cache
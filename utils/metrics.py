@@ -0,0 +1,165 @@
+import os
+import time
+import threading
+
+# Seconds; covers cache hits through slow upstream pages and full rebuilds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Every metric the app records: name -> (type, help)
+METRICS = {
+    'wakeupbabe_http_request_seconds': ('histogram', 'Time to serve a page, by route.'),
+    'wakeupbabe_stage_seconds': ('histogram', 'Time spent in each pipeline stage.'),
+    'wakeupbabe_collector_seconds': ('histogram', 'Time for each collector call, including the OAuth token fetch.'),
+    'wakeupbabe_collector_failures_total': ('counter', 'Collector calls that failed or timed out.'),
+    'wakeupbabe_upstream_requests_total': ('counter', 'Upstream HTTP attempts by host and status, retries included.'),
+    'wakeupbabe_upstream_retries_total': ('counter', 'Upstream attempts retried after a 429 or 5xx.'),
+    'wakeupbabe_upstream_errors_total': ('counter', 'Upstream attempts that raised instead of returning a response.'),
+    'wakeupbabe_upstream_request_seconds': ('histogram', 'Upstream HTTP attempt latency by host.'),
+    'wakeupbabe_cache_lookups_total': ('counter', 'Cache lookups by cache and outcome.'),
+}
+
+
+class _NullTimer:
+    """Stands in for a timer when metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process counters and latency histograms, rendered in the Prometheus
+    text format.
+
+    When disabled (the default; set METRICS_ENABLED=1 to turn it on) every
+    call returns straight away without taking a lock or reading the clock,
+    so instrumented code costs next to nothing.
+    """
+
+    def __init__(self, enabled=None, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled if enabled is not None else os.getenv('METRICS_ENABLED', '0') == '1'
+        self.buckets = tuple(buckets)
+        self._counters = {}  # name -> {label tuple: value}
+        self._histograms = {}  # name -> {label tuple: [bucket counts..., sum, count]}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            row = series.get(key)
+            if row is None:
+                row = series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def timer(self, name, **labels):
+        """
+        Context manager that records the time spent inside it in histogram
+        name.
+
+            with metrics.timer('wakeupbabe_stage_seconds', stage='render'):
+                ...
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def value(self, name, **labels):
+        """Current value of a counter, or (sum, count) of a histogram, mainly for tests."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            if name in self._histograms:
+                row = self._histograms[name].get(key)
+                return (row[-2], row[-1]) if row else (0, 0)
+            return self._counters.get(name, {}).get(key, 0)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """Returns every recorded series in the Prometheus text exposition format."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(row) for key, row in series.items()} for name, series in self._histograms.items()}
+
+        lines = []
+        for name in sorted(set(counters) | set(histograms)):
+            metric_type, help_text = METRICS.get(name, ('histogram' if name in histograms else 'counter', ''))
+            if help_text:
+                lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            if name in counters:
+                for key, value in sorted(counters[name].items()):
+                    lines.append(f'{name}{_labels(key)} {_number(value)}')
+                continue
+            for key, row in sorted(histograms[name].items()):
+                # observe() counts a value in every bucket it fits, so these are already cumulative
+                for bound, count in zip(self.buckets, row):
+                    lines.append(f'{name}_bucket{_labels(key + (("le", _number(bound)),))} {count}')
+                lines.append(f'{name}_bucket{_labels(key + (("le", "+Inf"),))} {row[-1]}')
+                lines.append(f'{name}_sum{_labels(key)} {_number(row[-2])}')
+                lines.append(f'{name}_count{_labels(key)} {row[-1]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(key):
+    if not key:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in key)
+    return '{' + pairs + '}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Returns the process-wide metrics registry."""
+    global _metrics
+    if _metrics is not None:
+        # Hot path for instrumented code; the registry never changes once built
+        return _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
@@ -0,0 +1,166 @@
+import os
+import sys
+import hmac
+import time
+import logging
+import cProfile
+import hashlib
+import threading
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every interval seconds from a
+    background thread and counts identical stacks, in the collapsed format
+    flamegraph.pl and speedscope read ("outer;inner;leaf count").
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            stack = ';'.join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f'{stack} {count}\n')
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of individual requests.
+
+    With PROFILE_REQUESTS=1, one in every sample_every requests is
+    profiled. When PROFILE_SECRET is set, a request carrying a valid signed
+    token (see sign()) is profiled too. Only one request is profiled at a
+    time; others run normally meanwhile.
+
+    Output goes to output_dir: cProfile stats for pstats/snakeviz with
+    format 'pstats', or sampled stacks for flame graphs with 'collapsed'.
+    The oldest files are removed past max_files.
+    """
+
+    def __init__(self, enabled=None, sample_every=None, secret=None, output_dir=None, format=None,
+                 interval=None, max_files=None):
+        self.enabled = enabled if enabled is not None else os.getenv('PROFILE_REQUESTS', '0') == '1'
+        self.sample_every = max(sample_every if sample_every is not None else int(os.getenv('PROFILE_SAMPLE_EVERY', 100)), 1)
+        self.secret = secret if secret is not None else os.getenv('PROFILE_SECRET', '')
+        self.output_dir = output_dir or os.getenv('PROFILE_DIR', '.profiles')
+        self.format = format or os.getenv('PROFILE_FORMAT', 'pstats')
+        if self.format not in ('pstats', 'collapsed'):
+            raise ValueError(f"Unknown profile format: {self.format}")
+        self.interval = interval if interval is not None else float(os.getenv('PROFILE_INTERVAL_MS', 5)) / 1000
+        self.max_files = max_files if max_files is not None else int(os.getenv('PROFILE_MAX_FILES', 200))
+        self.last_output = None
+        self._requests = 0
+        self._profiled = 0
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+
+    def sign(self, path, ttl=300):
+        """Returns a token that lets requests to path be profiled for the next ttl seconds."""
+        if not self.secret:
+            raise ValueError('PROFILE_SECRET is not set')
+        expires = int(time.time() + ttl)
+        return f'{expires}.{self._signature(path, expires)}'
+
+    def verify(self, path, token):
+        if not self.secret or not token:
+            return False
+        expires, _, signature = token.partition('.')
+        try:
+            if int(expires) < time.time():
+                return False
+        except ValueError:
+            return False
+        return hmac.compare_digest(signature, self._signature(path, expires))
+
+    def run(self, name, fn, path=None, token=None):
+        """
+        Calls fn() and returns its result, profiling the call when this
+        request is sampled or token is valid for path.
+        """
+        if not self.enabled and not token:
+            return fn()
+        if not self._should_profile(path, token) or not self._busy.acquire(blocking=False):
+            return fn()
+        try:
+            return self._profile(name, fn)
+        finally:
+            self._busy.release()
+
+    def _should_profile(self, path, token):
+        if token:
+            if self.verify(path, token):
+                return True
+            logging.warning(f'Ignoring invalid or expired profiling token for {path}')
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._requests += 1
+            return self._requests % self.sample_every == 0
+
+    def _profile(self, name, fn):
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Called under _busy, so the sequence number is unique within the process
+        self._profiled += 1
+        base = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{os.getpid()}-{self._profiled}")
+        started = time.perf_counter()
+        if self.format == 'pstats':
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(fn)
+            finally:
+                path = f'{base}.prof'
+                profiler.dump_stats(path)
+                self._written(path, started)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            return fn()
+        finally:
+            sampler.stop()
+            path = f'{base}.collapsed'
+            sampler.write(path)
+            self._written(path, started)
+
+    def _written(self, path, started):
+        self.last_output = path
+        logging.info(f'Profiled request in {time.perf_counter() - started:.3f}s, wrote {path}')
+        try:
+            files = sorted(
+                (os.path.join(self.output_dir, f) for f in os.listdir(self.output_dir)),
+                key=os.path.getmtime
+            )
+            for old in files[:-self.max_files]:
+                os.remove(old)
+        except OSError as e:
+            logging.warning(f"Could not prune profiles in {self.output_dir}: {str(e)}")
+
+    def _signature(self, path, expires):
+        message = f'{path}:{expires}'.encode('utf-8')
+        return hmac.new(self.secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
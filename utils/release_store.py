@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import datetime
+import logging
+import sqlite3
+import threading
+
+
+class ReleaseStore:
+    """
+    Embedded SQLite store for collected releases.
+
+    Every collection run is upserted keyed by (source, source_id), so a
+    release keeps one row however often it is seen. Popularity is also
+    recorded once per release per day in popularity_history, which keeps the
+    time series compact while still showing how interest moves.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS releases (
+                source TEXT NOT NULL,
+                source_id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                title TEXT NOT NULL,
+                release_date TEXT NOT NULL,
+                popularity REAL,
+                rating REAL,
+                total_rating REAL,
+                platforms TEXT,
+                cover_url TEXT,
+                excitement_score REAL,
+                first_seen REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (source, source_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_releases_type ON releases (type);
+            CREATE INDEX IF NOT EXISTS idx_releases_release_date ON releases (release_date);
+            CREATE INDEX IF NOT EXISTS idx_releases_excitement_score ON releases (excitement_score);
+
+            CREATE TABLE IF NOT EXISTS popularity_history (
+                source TEXT NOT NULL,
+                source_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                popularity REAL NOT NULL,
+                PRIMARY KEY (source, source_id, day)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS synced_days (
+                source TEXT NOT NULL,
+                day TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (source, day)
+            ) WITHOUT ROWID;
+        ''')
+
+    def upsert_releases(self, releases, day=None):
+        """
+        Inserts or updates releases and records today's popularity for each.
+
+        Args:
+            releases (iterable): Release dictionaries as built by the collectors.
+            day (str): Snapshot day as YYYY-MM-DD, defaults to today.
+
+        Returns:
+            int: Number of releases written.
+        """
+        day = day or datetime.date.today().isoformat()
+        now = time.time()
+        rows = []
+        history = []
+        for release in releases:
+            if not release.get('release_date') or not release.get('title'):
+                continue
+            source, source_id = release_key(release)
+            rows.append((
+                source, source_id, release['type'], release['title'], release['release_date'],
+                release.get('popularity'), release.get('rating'), release.get('total_rating'),
+                json.dumps(release['platforms']) if release.get('platforms') is not None else None,
+                release.get('cover_url'), release.get('excitement_score'), now, now
+            ))
+            if release.get('popularity') is not None:
+                history.append((source, source_id, day, release['popularity']))
+
+        with self._lock:
+            self._conn.executemany('''
+                INSERT INTO releases (source, source_id, type, title, release_date, popularity, rating,
+                                      total_rating, platforms, cover_url, excitement_score, first_seen, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, source_id) DO UPDATE SET
+                    type = excluded.type,
+                    title = excluded.title,
+                    release_date = excluded.release_date,
+                    popularity = COALESCE(excluded.popularity, releases.popularity),
+                    rating = COALESCE(excluded.rating, releases.rating),
+                    total_rating = COALESCE(excluded.total_rating, releases.total_rating),
+                    platforms = COALESCE(excluded.platforms, releases.platforms),
+                    cover_url = COALESCE(excluded.cover_url, releases.cover_url),
+                    excitement_score = COALESCE(excluded.excitement_score, releases.excitement_score),
+                    updated_at = excluded.updated_at
+            ''', rows)
+            self._conn.executemany('''
+                INSERT INTO popularity_history (source, source_id, day, popularity) VALUES (?, ?, ?, ?)
+                ON CONFLICT (source, source_id, day) DO UPDATE SET popularity = excluded.popularity
+            ''', history)
+            self._conn.commit()
+        logging.info(f'Stored {len(rows)} releases')
+        return len(rows)
+
+    def get_window(self, start_date, end_date, media_type=None, min_score=None):
+        """Returns stored releases in a date window, highest score first."""
+        query = 'SELECT * FROM releases WHERE release_date >= ? AND release_date <= ?'
+        params = [start_date, end_date]
+        if media_type is not None:
+            query += ' AND type = ?'
+            params.append(media_type)
+        if min_score is not None:
+            query += ' AND excitement_score >= ?'
+            params.append(min_score)
+        query += ' ORDER BY excitement_score DESC'
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_release(row) for row in rows]
+
+    def get_popularity_history(self, source, source_id):
+        """Returns [(day, popularity), ...] for one release, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT day, popularity FROM popularity_history WHERE source = ? AND source_id = ? ORDER BY day',
+                (source, str(source_id))
+            ).fetchall()
+        return [(row['day'], row['popularity']) for row in rows]
+
+    def get_synced_days(self, source):
+        """Returns {day: synced_at} for every day already synced from a source."""
+        with self._lock:
+            rows = self._conn.execute('SELECT day, synced_at FROM synced_days WHERE source = ?', (source,)).fetchall()
+        return {row['day']: row['synced_at'] for row in rows}
+
+    def mark_synced(self, source, days, synced_at=None):
+        synced_at = synced_at or time.time()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO synced_days (source, day, synced_at) VALUES (?, ?, ?)',
+                [(source, day, synced_at) for day in days]
+            )
+            self._conn.commit()
+
+    def evict_synced_days(self, source, start_date, end_date):
+        """Forgets sync state for days that have slid out of [start_date, end_date]."""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM synced_days WHERE source = ? AND (day < ? OR day > ?)',
+                (source, start_date, end_date)
+            )
+            self._conn.commit()
+
+    def _to_release(self, row):
+        release = {
+            'id': row['source_id'],
+            'source': row['source'],
+            'title': row['title'],
+            'release_date': row['release_date'],
+            'type': row['type'],
+        }
+        # Only carry the fields the collector actually provided
+        for field in ('popularity', 'rating', 'total_rating', 'cover_url', 'excitement_score'):
+            if row[field] is not None:
+                release[field] = row[field]
+        if row['platforms'] is not None:
+            release['platforms'] = json.loads(row['platforms'])
+        if release['id'].isdigit():
+            release['id'] = int(release['id'])
+        return release
+
+
+def release_key(release):
+    """
+    Returns the (source, source_id) a release is stored under. TMDB movie and
+    TV ids overlap, so each gets its own source. Releases from older
+    collectors without a source field are attributed by media type.
+    """
+    source = release.get('source') or ('igdb' if release.get('type') == 'game' else f"tmdb_{release.get('type')}")
+    if release.get('id') is not None:
+        return source, str(release['id'])
+    return source, f"{release['title']}|{release['release_date']}"
+
+_release_store = None
+_release_store_lock = threading.Lock()
+
+def get_release_store():
+    """
+    Returns the process-wide release store, or None when RELEASE_STORE_PATH
+    is set to an empty string.
+    """
+    global _release_store
+    path = os.getenv('RELEASE_STORE_PATH', 'releases.sqlite')
+    if not path:
+        return None
+    with _release_store_lock:
+        if _release_store is None or _release_store.path != path:
+            _release_store = ReleaseStore(path)
+        return _release_store
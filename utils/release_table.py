@@ -0,0 +1,289 @@
+import math
+import datetime
+import threading
+from array import array
+from collections.abc import Mapping
+import numpy as np
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+MISSING = float('nan')
+
+
+class _Codes:
+    """Interns repeated strings (media types, sources) as small integer codes shared by every table."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._codes = {name: code for code, name in enumerate(self.names)}
+        self._lock = threading.Lock()
+
+    def code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(name)
+                if code is None:
+                    code = self._codes[name] = len(self.names)
+                    self.names.append(name)
+        return code
+
+MEDIA_TYPES = _Codes(['movie', 'tv', 'game'])
+SOURCES = _Codes(['tmdb_movie', 'tmdb_tv', 'igdb', None])
+
+
+def to_epoch_day(release_date):
+    return datetime.date.fromisoformat(release_date).toordinal() - EPOCH_ORDINAL
+
+def from_epoch_day(day):
+    return datetime.date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+class ReleaseTable:
+    """
+    Column-oriented release list.
+
+    Instead of one dict per release, each field is a column: media type and
+    source are interned one-byte codes, release dates are int epoch days,
+    and popularity, ratings and the excitement score are packed float arrays
+    with NaN for missing values. Only titles, ids, platforms and cover URLs
+    stay Python objects. Indexing or iterating yields ReleaseRow views that
+    read like the release dicts the collectors used to build, and to_dicts()
+    exports real dicts for templates and JSON.
+    """
+
+    FLOAT_COLUMNS = ('popularity', 'rating', 'total_rating', 'excitement_score')
+
+    def __init__(self):
+        self.ids = []
+        self.sources = array('B')
+        self.types = array('B')
+        self.titles = []
+        self.days = array('l')
+        self.popularity = array('d')
+        self.rating = array('d')
+        self.total_rating = array('d')
+        self.excitement_score = array('d')
+        self.platforms = []
+        self.cover_urls = []
+
+    @classmethod
+    def from_releases(cls, releases):
+        """Builds a table from release dicts (or rows of another table)."""
+        if isinstance(releases, ReleaseTable):
+            return releases
+        table = cls()
+        for release in releases:
+            table.append_release(release)
+        return table
+
+    @classmethod
+    def concat(cls, tables):
+        result = cls()
+        for table in tables:
+            result.extend(table)
+        return result
+
+    def append(self, id, source, media_type, title, release_date, popularity=None, rating=None,
+               total_rating=None, platforms=None, cover_url=None, excitement_score=None):
+        """
+        Appends one release and returns its index, or None when it has no
+        usable title or release date and was skipped.
+        """
+        if not title or not release_date:
+            return None
+        try:
+            day = to_epoch_day(release_date)
+        except ValueError:
+            return None
+
+        self.ids.append(id)
+        self.sources.append(SOURCES.code(source))
+        self.types.append(MEDIA_TYPES.code(media_type))
+        self.titles.append(title)
+        self.days.append(day)
+        self.popularity.append(MISSING if popularity is None else popularity)
+        self.rating.append(MISSING if rating is None else rating)
+        self.total_rating.append(MISSING if total_rating is None else total_rating)
+        self.excitement_score.append(MISSING if excitement_score is None else excitement_score)
+        self.platforms.append(tuple(platforms) if platforms is not None else None)
+        self.cover_urls.append(cover_url)
+        return len(self.titles) - 1
+
+    def append_release(self, release):
+        return self.append(
+            release.get('id'), release.get('source'), release.get('type'), release.get('title'),
+            release.get('release_date'), release.get('popularity'), release.get('rating'),
+            release.get('total_rating'), release.get('platforms'), release.get('cover_url'),
+            release.get('excitement_score')
+        )
+
+    def extend(self, other):
+        if not isinstance(other, ReleaseTable):
+            for release in other:
+                self.append_release(release)
+            return
+        self.ids.extend(other.ids)
+        self.sources.extend(other.sources)
+        self.types.extend(other.types)
+        self.titles.extend(other.titles)
+        self.days.extend(other.days)
+        for name in self.FLOAT_COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+        self.platforms.extend(other.platforms)
+        self.cover_urls.extend(other.cover_urls)
+
+    def take(self, indices):
+        """Returns a new table with the given rows, in the given order."""
+        result = ReleaseTable()
+        indices = [int(i) for i in indices]
+        result.ids = [self.ids[i] for i in indices]
+        result.sources = array('B', [self.sources[i] for i in indices])
+        result.types = array('B', [self.types[i] for i in indices])
+        result.titles = [self.titles[i] for i in indices]
+        result.days = array('l', [self.days[i] for i in indices])
+        for name in self.FLOAT_COLUMNS:
+            column = getattr(self, name)
+            setattr(result, name, array('d', [column[i] for i in indices]))
+        result.platforms = [self.platforms[i] for i in indices]
+        result.cover_urls = [self.cover_urls[i] for i in indices]
+        return result
+
+    def fill_missing(self, index, other, other_index):
+        """Fills the row's missing optional fields from a row of another table."""
+        for name in self.FLOAT_COLUMNS:
+            column = getattr(self, name)
+            if math.isnan(column[index]):
+                column[index] = getattr(other, name)[other_index]
+        for name in ('ids', 'platforms', 'cover_urls'):
+            column = getattr(self, name)
+            if column[index] is None:
+                column[index] = getattr(other, name)[other_index]
+
+    def column(self, name):
+        """Returns a float or int column as a NumPy array (a copy)."""
+        return np.array(getattr(self, name))
+
+    def set_scores(self, scores):
+        self.excitement_score = array('d', scores)
+
+    def top(self, score_threshold):
+        """Returns the rows scoring at least score_threshold, highest first."""
+        scores = self.column('excitement_score')
+        keep = np.flatnonzero(scores >= score_threshold)
+        # Stable sort keeps the input order among equal scores, like list.sort
+        order = keep[np.argsort(-scores[keep], kind='stable')]
+        return self.take(order)
+
+    def to_dicts(self):
+        """Returns every row as a release dict, the same as row.to_dict() but column by column."""
+        dates = {}
+        sources = SOURCES.names
+        media_types = MEDIA_TYPES.names
+        releases = []
+        columns = zip(self.ids, self.sources, self.titles, self.days, self.popularity, self.rating, self.total_rating,
+                      self.platforms, self.cover_urls, self.types, self.excitement_score)
+        for (release_id, source, title, day, popularity, rating, total_rating, platforms, cover_url, media_type,
+             excitement_score) in columns:
+            release_date = dates.get(day)
+            if release_date is None:
+                release_date = dates[day] = from_epoch_day(day)
+            # Same keys, in the same order, as _FIELDS; None and NaN mean absent
+            release = {'id': release_id}
+            if sources[source] is not None:
+                release['source'] = sources[source]
+            if title is not None:
+                release['title'] = title
+            release['release_date'] = release_date
+            if popularity == popularity:
+                release['popularity'] = popularity
+            if rating == rating:
+                release['rating'] = rating
+            if total_rating == total_rating:
+                release['total_rating'] = total_rating
+            if platforms is not None:
+                release['platforms'] = list(platforms)
+            if cover_url is not None:
+                release['cover_url'] = cover_url
+            release['type'] = media_types[media_type]
+            if excitement_score == excitement_score:
+                release['excitement_score'] = excitement_score
+            releases.append(release)
+        return releases
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('release index out of range')
+        return ReleaseRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield ReleaseRow(self, index)
+
+
+def _float(name):
+    def get(table, index):
+        value = getattr(table, name)[index]
+        return None if math.isnan(value) else value
+    return get
+
+def _platforms(table, index):
+    platforms = table.platforms[index]
+    return list(platforms) if platforms is not None else None
+
+# Field name -> reader; fields that read as None are treated as absent
+_FIELDS = {
+    'id': lambda table, index: table.ids[index],
+    'source': lambda table, index: SOURCES.names[table.sources[index]],
+    'title': lambda table, index: table.titles[index],
+    'release_date': lambda table, index: from_epoch_day(table.days[index]),
+    'popularity': _float('popularity'),
+    'rating': _float('rating'),
+    'total_rating': _float('total_rating'),
+    'platforms': _platforms,
+    'cover_url': lambda table, index: table.cover_urls[index],
+    'type': lambda table, index: MEDIA_TYPES.names[table.types[index]],
+    'excitement_score': _float('excitement_score'),
+}
+
+
+class ReleaseRow(Mapping):
+    """Read-only, dict-like view of one row of a ReleaseTable."""
+
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key):
+        reader = _FIELDS.get(key)
+        value = reader(self.table, self.index) if reader is not None else None
+        if value is None and key != 'id':
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for key, reader in _FIELDS.items():
+            if key == 'id' or reader(self.table, self.index) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __getattr__(self, name):
+        # Lets templates use release.title as with dicts
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f'ReleaseRow({self.to_dict()!r})'
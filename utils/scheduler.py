@@ -0,0 +1,134 @@
+import os
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from utils.rate_limit import RateLimiter
+from utils.metrics import get_metrics
+
+# Published upstream limits; anything else falls back to HTTP_DEFAULT_RATE
+HOST_RATES = {
+    'api.themoviedb.org': 40,
+    'api.igdb.com': 4,
+}
+HOST_MAX_IN_FLIGHT = {
+    'api.igdb.com': 8,
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def host_key(url):
+    """The scheduler's key for a URL: its hostname, plus the port when one is given."""
+    parts = urlsplit(url)
+    return f'{parts.hostname}:{parts.port}' if parts.port else parts.hostname
+
+def parse_host_aliases(value):
+    """Parses 'localhost:8765=api.themoviedb.org,localhost:8766=api.igdb.com' into a dict."""
+    aliases = {}
+    for item in value.split(','):
+        if '=' in item:
+            alias, host = item.split('=', 1)
+            aliases[alias.strip()] = host.strip()
+    return aliases
+
+
+class RequestScheduler:
+    """
+    Paces outgoing requests per host.
+
+    Each host gets its own token bucket and a cap on requests in flight.
+    Responses with a 429 or 5xx status are retried with jittered exponential
+    backoff, or after the upstream's Retry-After when it sends one.
+
+    host_aliases (or HTTP_HOST_ALIASES) maps a stand-in host to the upstream
+    it replaces, so it shares that upstream's limits.
+    """
+
+    def __init__(self, host_rates=None, host_max_in_flight=None, max_retries=None, backoff_base=None, max_backoff=60,
+                 host_aliases=None):
+        self.host_rates = host_rates if host_rates is not None else dict(HOST_RATES)
+        self.host_max_in_flight = host_max_in_flight if host_max_in_flight is not None else dict(HOST_MAX_IN_FLIGHT)
+        self.host_aliases = host_aliases if host_aliases is not None else parse_host_aliases(os.getenv('HTTP_HOST_ALIASES', ''))
+        self.default_rate = float(os.getenv('HTTP_DEFAULT_RATE', 10))
+        self.default_max_in_flight = int(os.getenv('HTTP_MAX_IN_FLIGHT', 8))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('HTTP_MAX_RETRIES', 3))
+        self.backoff_base = backoff_base if backoff_base is not None else float(os.getenv('HTTP_BACKOFF_BASE', 0.5))
+        self.max_backoff = max_backoff
+        self._limiters = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def send(self, host, send_fn):
+        """
+        Calls send_fn() under the host's rate and concurrency limits, retrying
+        throttled and failed responses. Returns the last response.
+        """
+        host = self.host_aliases.get(host, host)
+        limiter, slots = self._host_limits(host)
+        metrics = get_metrics()
+        attempt = 0
+        while True:
+            limiter.acquire()
+            with slots, metrics.timer('wakeupbabe_upstream_request_seconds', host=host):
+                try:
+                    response = send_fn()
+                except Exception:
+                    metrics.inc('wakeupbabe_upstream_errors_total', host=host)
+                    raise
+            metrics.inc('wakeupbabe_upstream_requests_total', host=host, status=response.status_code)
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+            metrics.inc('wakeupbabe_upstream_retries_total', host=host, status=response.status_code)
+
+            delay = self._retry_delay(response, attempt)
+            logging.warning(f"{host} returned {response.status_code}, retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _host_limits(self, host):
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = RateLimiter(rate=self.host_rates.get(host, self.default_rate))
+                self._slots[host] = threading.BoundedSemaphore(self.host_max_in_flight.get(host, self.default_max_in_flight))
+            return self._limiters[host], self._slots[host]
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0), self.max_backoff)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(delay, 0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        # Full jitter keeps parallel workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_base * (2 ** attempt), self.max_backoff))
+
+
+class SchedulingAdapter(HTTPAdapter):
+    """Transport adapter that routes every request through a RequestScheduler."""
+
+    def __init__(self, scheduler, **kwargs):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    def send(self, request, **kwargs):
+        host = host_key(request.url)
+        return self.scheduler.send(host, lambda: super(SchedulingAdapter, self).send(request, **kwargs))
+
+_request_scheduler = None
+_request_scheduler_lock = threading.Lock()
+
+def get_request_scheduler():
+    """Returns the scheduler shared by every collector in the process."""
+    global _request_scheduler
+    with _request_scheduler_lock:
+        if _request_scheduler is None:
+            _request_scheduler = RequestScheduler()
+        return _request_scheduler
@@ -0,0 +1,125 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; fall back to in-process coordination only
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.built_at = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Makes sure only one caller at a time rebuilds a given key.
+
+    Within a process, concurrent callers for the same key wait for the
+    in-flight call and share its result or exception. Across processes (e.g.
+    Gunicorn workers) a file lock in lock_dir acts as a lease: the holder
+    runs the work and writes the JSON result next to the lock, and a worker
+    that was queued behind it, or that finds a result younger than max_age,
+    reuses that file instead of calling the upstreams again. Results with a
+    to_dicts() method (e.g. ReleaseTable) are shared as that list; pass
+    decode to turn a shared result back into the original type. The shared
+    file keeps the time the result was built, which do_timed() returns and
+    max_age is measured against.
+    """
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir or os.getenv('SINGLE_FLIGHT_DIR', '.single_flight')
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, max_age=0, decode=None):
+        return self.do_timed(key, fn, max_age, decode)[1]
+
+    def do_timed(self, key, fn, max_age=0, decode=None):
+        """Like do, but returns (built_at, result), built_at being when whichever worker ran fn finished."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.built_at, call.result
+
+        try:
+            call.built_at, call.result = self._run_with_lease(key, fn, max_age, decode)
+            return call.built_at, call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run_with_lease(self, key, fn, max_age, decode):
+        if fcntl is None:
+            result = fn()
+            return time.time(), result
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', '_'.join(map(str, key)) if isinstance(key, tuple) else str(key))
+        lock_path = os.path.join(self.lock_dir, f'{name}.lock')
+        result_path = os.path.join(self.lock_dir, f'{name}.json')
+
+        waiting_since = time.time()
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                shared = self._read_result(result_path, min(waiting_since, time.time() - max_age))
+                if shared is not None:
+                    logging.info(f'Reusing result for {key} built by another worker')
+                    built_at, result = shared
+                    return built_at, decode(result) if decode is not None else result
+
+                result = fn()
+                built_at = time.time()
+                self._write_result(result_path, built_at, result)
+                return built_at, result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_result(self, path, newer_than):
+        try:
+            if os.path.getmtime(path) < newer_than:
+                return None
+            with open(path) as f:
+                shared = json.load(f)
+            # The file may have been touched since; its recorded build time is what counts
+            if shared['built_at'] < newer_than:
+                return None
+            return shared['built_at'], shared['result']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_result(self, path, built_at, result):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'built_at': built_at, 'result': result}, f, default=_encode)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            # Other workers will just build their own copy
+            logging.warning(f"Could not share result at {path}: {str(e)}")
+
+
+def _encode(value):
+    if hasattr(value, 'to_dicts'):
+        return value.to_dicts()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
@@ -0,0 +1,161 @@
+import os
+import time
+import logging
+import threading
+from utils.metrics import get_metrics
+
+
+class SnapshotCache:
+    """
+    Holds the merged, deduplicated and scored release list for each
+    (start_date, end_date) window in memory.
+
+    Fresh snapshots are served straight from memory. Snapshots older than the
+    TTL but still inside the stale window are served as-is while a background
+    thread rebuilds them (stale-while-revalidate). Only a cold or fully
+    expired window blocks the caller on the loader.
+
+    When a SingleFlight is given, rebuilds of the same window are coordinated
+    across threads and worker processes, and a snapshot another worker built
+    within the TTL is reused instead of calling the loader; decode converts
+    such a shared snapshot back into what the loader returns.
+
+    view, when given, derives what pages actually render (e.g. the filtered,
+    sorted rows) from a snapshot. It runs once whenever a snapshot is
+    stored, and get_view() returns its result without recomputing it.
+    """
+
+    def __init__(self, loader, ttl=None, stale_ttl=None, max_windows=8, single_flight=None, decode=None, view=None):
+        self.loader = loader
+        self.single_flight = single_flight
+        self.decode = decode
+        self.view = view
+        self.ttl = ttl if ttl is not None else int(os.getenv('SNAPSHOT_TTL', 900))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else int(os.getenv('SNAPSHOT_STALE_TTL', 3600))
+        self.max_windows = max_windows
+        self._snapshots = {}  # (start_date, end_date) -> (built_at, releases)
+        self._views = {}  # (start_date, end_date) -> (releases, view of those releases)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._warmer = None
+
+    def get(self, start_date, end_date):
+        key = (start_date, end_date)
+        metrics = get_metrics()
+        entry = self._snapshots.get(key)
+        if entry is None:
+            metrics.inc('wakeupbabe_cache_lookups_total', cache='snapshot', outcome='misses')
+            return self._rebuild(key, max_age=self.ttl)
+
+        built_at, releases = entry
+        age = time.time() - built_at
+        if age < self.ttl:
+            metrics.inc('wakeupbabe_cache_lookups_total', cache='snapshot', outcome='hits')
+            return releases
+        if age < self.ttl + self.stale_ttl:
+            metrics.inc('wakeupbabe_cache_lookups_total', cache='snapshot', outcome='stale')
+            self._refresh_in_background(key)
+            return releases
+        metrics.inc('wakeupbabe_cache_lookups_total', cache='snapshot', outcome='misses')
+        return self._rebuild(key, max_age=self.ttl)
+
+    def get_view(self, start_date, end_date):
+        """Returns view applied to the window's snapshot, or the snapshot itself without a view."""
+        key = (start_date, end_date)
+        releases = self.get(start_date, end_date)
+        if self.view is None:
+            return releases
+        cached = self._views.get(key)
+        if cached is not None and cached[0] is releases:
+            return cached[1]
+        # Only reached for snapshots stored without going through _rebuild
+        view = self.view(releases)
+        self._store_view(key, releases, view)
+        return view
+
+    def refresh(self, start_date, end_date):
+        """Rebuilds the snapshot for a window synchronously and returns it."""
+        return self._rebuild((start_date, end_date), max_age=0)
+
+    def _rebuild(self, key, max_age):
+        if self.single_flight is None:
+            releases = self._load(key)
+            built_at = time.time()
+        else:
+            # A snapshot shared by another worker keeps its own build time, so it goes stale on schedule
+            built_at, releases = self.single_flight.do_timed(key, lambda: self._load(key), max_age=max_age,
+                                                             decode=self.decode)
+        view = self.view(releases) if self.view is not None else None
+        with self._lock:
+            self._snapshots[key] = (built_at, releases)
+            if self.view is not None:
+                self._views[key] = (releases, view)
+            self._evict()
+        return releases
+
+    def _store_view(self, key, releases, view):
+        with self._lock:
+            # A rebuild may have replaced the snapshot meanwhile; don't overwrite its view
+            entry = self._snapshots.get(key)
+            if entry is not None and entry[1] is releases:
+                self._views[key] = (releases, view)
+
+    def _load(self, key):
+        logging.info(f'Refreshing release snapshot for {key[0]} to {key[1]}')
+        return self.loader(*key)
+
+    def invalidate(self, start_date=None, end_date=None):
+        with self._lock:
+            if start_date is None and end_date is None:
+                self._snapshots.clear()
+                self._views.clear()
+            else:
+                self._snapshots.pop((start_date, end_date), None)
+                self._views.pop((start_date, end_date), None)
+
+    def start_periodic_refresh(self, window_fn, interval):
+        """
+        Keeps the window returned by window_fn warm by rebuilding it every
+        interval seconds on a daemon thread, so page views never see a cold
+        cache after startup.
+        """
+        if self._warmer is not None:
+            return self._warmer
+
+        def run():
+            while True:
+                try:
+                    # Other workers' warmers may already have built this window
+                    self._rebuild(tuple(window_fn()), max_age=min(interval, self.ttl))
+                except Exception as e:
+                    logging.error(f"Periodic snapshot refresh failed: {str(e)}")
+                time.sleep(interval)
+
+        self._warmer = threading.Thread(target=run, name='snapshot-warmer', daemon=True)
+        self._warmer.start()
+        return self._warmer
+
+    def _refresh_in_background(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._rebuild(key, max_age=self.ttl)
+            except Exception as e:
+                # Keep serving the stale snapshot; the next request will retry
+                logging.error(f"Background snapshot refresh failed for {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name='snapshot-refresh', daemon=True).start()
+
+    def _evict(self):
+        # Old windows stop being requested once the day rolls over
+        while len(self._snapshots) > self.max_windows:
+            oldest = min(self._snapshots, key=lambda k: self._snapshots[k][0])
+            del self._snapshots[oldest]
+            self._views.pop(oldest, None)